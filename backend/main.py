@@ -11,13 +11,18 @@ from contextlib import asynccontextmanager
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 
-from backend.routers import auth, settings, threads, messages, streaming, prices, catalog, alerts, debug
+from backend.routers import auth, settings, threads, messages, streaming, prices, catalog, alerts, debug, jobs
 
 from core.agents.alert_service import api as alert_api
 from core.agents.price_optimizer.agent import PricingOptimizerAgent
 from core.agents.data_collector.agent import DataCollectorAgent
 from core.agents.data_collector.repo import DataRepo
 from core.agents.proposal_logger import ProposalLogger
+from core.agents.agent_sdk.mcp_client import prewarm_mcp_clients, shutdown_mcp_clients
+from core.agents.llm_provider_manager import close_async_clients
+from core.agents.data_collector.connectors.web_scraper import close_async_scraper
+from core.agents.llm_cache import get_response_cache
+from backend.routers.utils import compute_cost_usd
 
 
 @asynccontextmanager
@@ -25,6 +30,9 @@ async def lifespan(app: FastAPI):
     init_db()
     init_chat_db()
     cleanup_empty_threads()
+    get_response_cache().cost_fn = lambda provider, model, tin, tout: float(
+        compute_cost_usd(provider, model, tin, tout) or 0.0
+    )
     
     if os.environ.get("EXPORT_OPENAPI_ONLY", "0") in {"1", "true", "yes", "on"}:
         yield
@@ -96,6 +104,14 @@ async def lifespan(app: FastAPI):
             logger.error(f"Failed to start ProposalLogger: {e}", exc_info=True)
     else:
         logger.warning("ProposalLogger not initialized - skipping start")
+
+    use_mcp = os.environ.get("USE_MCP", "").strip() in {"1", "true", "yes", "on"}
+    if use_mcp:
+        try:
+            warmed = await prewarm_mcp_clients()
+            logger.info(f"Prewarmed MCP connection pools: {warmed}")
+        except Exception as e:
+            logger.warning(f"Failed to prewarm MCP connection pools: {e}")
     
     yield
     
@@ -104,6 +120,10 @@ async def lifespan(app: FastAPI):
         await data_collector.stop()
     if proposal_logger is not None:
         await proposal_logger.stop()
+    if use_mcp:
+        await shutdown_mcp_clients()
+    await close_async_clients()
+    await close_async_scraper()
 
 
 app = FastAPI(title="FluxPricer Auth + Chat API", lifespan=lifespan)
@@ -205,3 +225,4 @@ app.include_router(prices.router)
 app.include_router(catalog.router)
 app.include_router(alerts.router)
 app.include_router(debug.router)
+app.include_router(jobs.router)
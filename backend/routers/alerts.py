@@ -1,19 +1,71 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional, List, Dict, Any
+import asyncio
+import json
+import logging
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Dict, Any, Union
 from core.agents.alert_service import api as alert_api
+from core.agents.alert_service.stream import get_incident_stream
 from backend.deps import get_current_user_for_alerts
 
 router = APIRouter(prefix="/api/alerts", tags=["alerts"])
+logger = logging.getLogger(__name__)
+
+SSE_KEEPALIVE_S = 15.0
 
 
 @router.get("/incidents")
-async def get_incidents(status: Optional[str] = None, current_user: Dict[str, Any] = Depends(get_current_user_for_alerts)) -> List[Dict[str, Any]]:
+async def get_incidents(
+    status: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+    rule_id: Optional[str] = Query(None),
+    sku: Optional[str] = Query(None),
+    current_user: Dict[str, Any] = Depends(get_current_user_for_alerts),
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     owner_id = str(current_user["user_id"])
+    # Without limit/cursor keep the legacy full-list response.
+    if limit is None and cursor is None:
+        try:
+            incidents = await alert_api.list_incidents(status, owner_id, severity=severity, rule_id=rule_id, sku=sku)
+            return incidents
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
     try:
-        incidents = await alert_api.list_incidents(status, None)
-        return incidents
+        incidents, next_cursor = await alert_api.list_incidents_page(
+            status, owner_id, limit=limit or 50, cursor=cursor, severity=severity, rule_id=rule_id, sku=sku
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"incidents": incidents, "count": len(incidents), "next_cursor": next_cursor}
+
+
+@router.get("/incidents/stream")
+async def stream_incidents(current_user: Dict[str, Any] = Depends(get_current_user_for_alerts)):
+    """SSE: an ``incident`` event for every new or updated incident of this owner, ``ping`` keepalives."""
+    owner_id = str(current_user["user_id"])
+
+    async def _aiter():
+        try:
+            async with get_incident_stream().listen(owner_id) as queue:
+                yield "event: ready\n" + "data: {}\n\n"
+                while True:
+                    try:
+                        incident = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_S)
+                    except asyncio.TimeoutError:
+                        yield "event: ping\n" + "data: {}\n\n"
+                        continue
+                    yield "event: incident\n" + "data: " + json.dumps(incident, ensure_ascii=False, default=str) + "\n\n"
+        except Exception as e:
+            logger.error(f"Error in incident stream for {owner_id}: {e}")
+            err = {"error": "Internal streaming error"}
+            yield "event: error\n" + "data: " + json.dumps(err, ensure_ascii=False) + "\n\n"
+
+    return StreamingResponse(_aiter(), media_type="text/event-stream")
 
 
 @router.post("/incidents/{incident_id}/ack")
@@ -1,9 +1,15 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from backend.deps import get_current_user, get_repo
 from core.agents.data_collector.repo import DataRepo
+from core.agents.data_collector.catalog_import import detect_format, run_catalog_import
 import pandas as pd
+import asyncio
 import io
-from typing import Optional
+import json
+import os
+import tempfile
+from typing import List, Optional
 
 router = APIRouter(prefix="/api", tags=["catalog"])
 
@@ -15,14 +21,16 @@ async def upload_catalog(
     current_user = Depends(get_current_user),
     repo: DataRepo = Depends(get_repo),
 ):
-    if not file.filename.endswith((".csv", ".json")):
-        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a CSV or JSON file.")
+    if not file.filename.endswith((".csv", ".json", ".parquet")):
+        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a CSV, JSON or Parquet file.")
 
     contents = await file.read()
 
     try:
         if file.filename.endswith(".csv"):
             df = pd.read_csv(io.BytesIO(contents))
+        elif file.filename.endswith(".parquet"):
+            df = pd.read_parquet(io.BytesIO(contents))
         else:
             df = pd.read_json(io.BytesIO(contents))
     except Exception as e:
@@ -69,20 +77,148 @@ async def upload_catalog(
     }
 
 
+# Keep references to running import tasks so they are not garbage collected.
+_import_tasks: set = set()
+
+
+@router.post("/catalog/import", status_code=202)
+async def import_catalog(
+    file: UploadFile = File(...),
+    token: str = Query(...),
+    chunksize: int = Query(5000, ge=100, le=100000),
+    current_user = Depends(get_current_user),
+    repo: DataRepo = Depends(get_repo),
+):
+    """Start a chunked import for large catalogs and return a job id.
+
+    The upload is spooled to disk and parsed in the background; poll
+    ``GET /api/catalog/import/{job_id}`` for progress.
+    """
+    try:
+        fmt = detect_format(file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    owner_id = str(current_user["user_id"])
+    suffix = os.path.splitext(file.filename)[1]
+    fd, path = tempfile.mkstemp(prefix="catalog-import-", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                block = await file.read(1024 * 1024)
+                if not block:
+                    break
+                out.write(block)
+        job_id = await repo.create_catalog_import_job(owner_id, file.filename, fmt)
+    except Exception as e:
+        os.remove(path)
+        raise HTTPException(status_code=500, detail=f"Failed to stage upload: {str(e)}")
+
+    task = asyncio.create_task(run_catalog_import(repo, job_id, path, fmt, owner_id, chunksize=chunksize))
+    _import_tasks.add(task)
+    task.add_done_callback(_import_tasks.discard)
+
+    return {"success": True, "job_id": job_id, "status": "QUEUED", "filename": file.filename}
+
+
+@router.get("/catalog/import/{job_id}")
+async def get_import_job(
+    job_id: str,
+    token: str = Query(...),
+    current_user = Depends(get_current_user),
+    repo: DataRepo = Depends(get_repo),
+):
+    owner_id = str(current_user["user_id"])
+
+    try:
+        job = await repo.get_catalog_import_job(job_id, owner_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    return {"success": True, "job": job}
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()] or None
+
+
 @router.get("/catalog/products")
 async def get_products(
     token: str = Query(...),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated list of columns to return"),
     current_user = Depends(get_current_user),
     repo: DataRepo = Depends(get_repo),
 ):
     owner_id = str(current_user["user_id"])
+    field_list = _parse_fields(fields)
+
+    # Without limit/cursor/fields keep the legacy full-list response.
+    if limit is None and cursor is None and field_list is None:
+        try:
+            products = await repo.get_products_by_owner(owner_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        return {"success": True, "count": len(products), "products": products}
 
     try:
-        products = await repo.get_products_by_owner(owner_id)
+        products, next_cursor = await repo.get_products_page(
+            owner_id, limit=limit or 100, cursor=cursor, fields=field_list
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    return {"success": True, "count": len(products), "products": products}
+    return {
+        "success": True,
+        "count": len(products),
+        "products": products,
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/catalog/export")
+async def export_products(
+    token: str = Query(...),
+    fields: Optional[str] = Query(None, description="Comma-separated list of columns to return"),
+    current_user = Depends(get_current_user),
+    repo: DataRepo = Depends(get_repo),
+):
+    """Stream the owner's full catalog as NDJSON, one product per line."""
+    owner_id = str(current_user["user_id"])
+    field_list = _parse_fields(fields)
+
+    try:
+        products = repo.iter_products_by_owner(owner_id, fields=field_list)
+        # Prime the generator so projection errors surface as a 400 rather
+        # than a broken stream.
+        first = await products.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    async def _aiter():
+        if first is None:
+            return
+        yield json.dumps(first, ensure_ascii=False) + "\n"
+        async for row in products:
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        _aiter(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="catalog.ndjson"'},
+    )
 
 
 @router.get("/catalog/products/{sku}")
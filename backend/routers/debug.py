@@ -308,6 +308,12 @@ def get_database_stats():
     }
 
 
+@router.get("/llm-cache")
+def get_llm_cache_stats():
+    from core.agents.llm_cache import get_response_cache
+    return get_response_cache().snapshot()
+
+
 @router.delete("/threads/{thread_id}")
 def delete_thread(thread_id: int):
     try:
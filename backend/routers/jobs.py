@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from backend.deps import get_current_user, get_repo
+from core.agents.data_collector.repo import DataRepo
+from core.agents.data_collector.job_events import TERMINAL_STATUSES, wait_for_job
+import json
+import logging
+from typing import Optional
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+logger = logging.getLogger(__name__)
+
+MAX_WAIT_S = 120.0
+SSE_KEEPALIVE_S = 15.0
+
+
+async def _job_or_404(repo: DataRepo, job_id: str, owner_id: str) -> dict:
+    job = await repo.get_job(job_id, owner_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    repo: DataRepo = Depends(get_repo),
+):
+    owner_id = str(current_user["user_id"])
+    return {"ok": True, "job": await _job_or_404(repo, job_id, owner_id)}
+
+
+@router.get("/{job_id}/wait")
+async def wait_job(
+    job_id: str,
+    timeout: float = Query(30.0, gt=0, le=MAX_WAIT_S),
+    current_user: dict = Depends(get_current_user),
+    repo: DataRepo = Depends(get_repo),
+):
+    """Long-poll: returns as soon as the job finishes, or its current state after ``timeout`` seconds."""
+    owner_id = str(current_user["user_id"])
+    job = await _job_or_404(repo, job_id, owner_id)
+    if job.get("status") not in TERMINAL_STATUSES:
+        async def check() -> Optional[str]:
+            row = await repo.get_job(job_id)
+            return (row or {}).get("status")
+
+        await wait_for_job(job_id, timeout, check=check)
+        job = await _job_or_404(repo, job_id, owner_id)
+    return {"ok": True, "done": job.get("status") in TERMINAL_STATUSES, "job": job}
+
+
+@router.get("/{job_id}/events")
+async def job_events(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    repo: DataRepo = Depends(get_repo),
+):
+    """SSE: one ``status`` event now, ``ping`` keepalives, and a final ``done`` event."""
+    owner_id = str(current_user["user_id"])
+    job = await _job_or_404(repo, job_id, owner_id)
+
+    async def check() -> Optional[str]:
+        row = await repo.get_job(job_id)
+        return (row or {}).get("status")
+
+    async def _aiter():
+        current = job
+        yield "event: status\n" + "data: " + json.dumps(current, ensure_ascii=False) + "\n\n"
+        try:
+            while current.get("status") not in TERMINAL_STATUSES:
+                status = await wait_for_job(job_id, SSE_KEEPALIVE_S, check=check)
+                if status in TERMINAL_STATUSES:
+                    current = await repo.get_job(job_id) or {**current, "status": status}
+                    break
+                yield "event: ping\n" + "data: {}\n\n"
+            yield "event: done\n" + "data: " + json.dumps(current, ensure_ascii=False) + "\n\n"
+        except Exception as e:
+            logger.error(f"Error in job event stream for {job_id}: {e}")
+            err = {"error": "Internal streaming error"}
+            yield "event: error\n" + "data: " + json.dumps(err, ensure_ascii=False) + "\n\n"
+
+    return StreamingResponse(_aiter(), media_type="text/event-stream")
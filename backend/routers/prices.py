@@ -20,8 +20,9 @@ async def _fetch_products(repo: DataRepo, owner_id: str, sku_filter: Optional[st
             row = await repo.get_product_by_sku_and_owner(sku_filter, owner_id)
             rows = [row] if row else []
         else:
-            rows = await repo.get_products_by_owner(owner_id)
-            rows = rows[:50]
+            rows, _ = await repo.get_products_page(
+                owner_id, limit=50, fields=["sku", "current_price"]
+            )
         if not rows:
             logger.info(f"No products found for owner_id={owner_id}, sku_filter={sku_filter}")
             return {}
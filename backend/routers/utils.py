@@ -189,7 +189,7 @@ def generate_summary(thread_id: int, upto_message_id: int) -> Optional[str]:
         content = llm.chat([
             {"role": "system", "content": system},
             {"role": "user", "content": prompt},
-        ], max_tokens=220, temperature=0.2)
+        ], max_tokens=220, temperature=0.2, cache=True)
         return content
     except Exception:
         return None
@@ -332,7 +332,7 @@ def generate_thread_title(thread_id: int) -> Optional[str]:
         title = llm.chat([
             {"role": "system", "content": system},
             {"role": "user", "content": prompt},
-        ], max_tokens=4096, temperature=0.3)
+        ], max_tokens=4096, temperature=0.3, cache=True)
 
         logger.debug(f"LLM returned title: '{title}' (length={len(title)})")
         
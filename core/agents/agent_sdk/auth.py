@@ -5,6 +5,8 @@ import time
 import os
 from typing import Set, Optional, Dict, Any
 import functools
+import threading
+from collections import OrderedDict
 
 # Import logging system - simplified approach for compatibility
 import logging
@@ -46,7 +48,9 @@ class AuthMetrics:
             "expired_tokens": 0,
             "invalid_tokens": 0,
             "service_tokens": {},
-            "scope_requests": {}
+            "scope_requests": {},
+            "token_cache_hits": 0,
+            "token_cache_misses": 0
         }
     
     def token_created(self, scopes: Set[str], service: Optional[str] = None):
@@ -67,12 +71,59 @@ class AuthMetrics:
         elif error_type == "insufficient_scope":
             self._metrics["scope_denials"] += 1
     
+    def token_cache(self, hit: bool):
+        self._metrics["token_cache_hits" if hit else "token_cache_misses"] += 1
+    
     def get_metrics(self) -> Dict[str, Any]:
         return self._metrics.copy()
 
 # Global metrics instance
 _metrics = AuthMetrics()
 
+class _VerifiedTokenCache:
+    """Bounded LRU of tokens whose signature and payload were already verified.
+    
+    Keyed by the token's SHA-256 digest. Each entry remembers the secret it was
+    verified under, so rotating MCP_AUTH_SECRET invalidates it, and is dropped
+    once the token's exp (plus clock skew) has passed.
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, key: bytes, secret: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["secret"] != secret or now > entry["exp"] + 5:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, key: bytes, entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_token_cache = _VerifiedTokenCache(int(os.getenv("MCP_TOKEN_CACHE_SIZE", "1024")))
+
 # Default scopes for different service types
 DEFAULT_SCOPES = {
     "alert_service": {"read", "write", "create_rule", "subscribe"},
@@ -92,6 +143,14 @@ def _get_auth_config():
 
 AUTH_SECRET, TOKEN_EXPIRY_SECONDS, METRICS_ENABLED = _get_auth_config()
 
+
+def reload_auth_config() -> None:
+    """Re-read the auth settings (e.g. after rotating MCP_AUTH_SECRET); the token
+    paths use the module-level values so they never touch config per call."""
+    global AUTH_SECRET, TOKEN_EXPIRY_SECONDS, METRICS_ENABLED
+    AUTH_SECRET, TOKEN_EXPIRY_SECONDS, METRICS_ENABLED = _get_auth_config()
+    clear_token_cache()
+
 class AuthError(Exception):
     """Base exception for authentication/authorization failures."""
     pass
@@ -119,8 +178,7 @@ def create_token(scopes: Set[str], expiry_seconds: Optional[int] = None, correla
     Returns:
         Token string in legacy format: iat:scope1,scope2.signature
     """
-    # Get current config values (may have changed)
-    auth_secret, default_expiry, _ = _get_auth_config()
+    auth_secret, default_expiry = AUTH_SECRET, TOKEN_EXPIRY_SECONDS
     
     if not auth_secret:
         raise AuthError("AUTH_SECRET not configured. Set MCP_AUTH_SECRET environment variable.")
@@ -181,15 +239,22 @@ def verify_capability(token: str, required_scope: str, correlation_id: Optional[
         _metrics.auth_failure("invalid")
         raise InvalidTokenError("No token provided")
     
+    auth_secret, default_expiry = AUTH_SECRET, TOKEN_EXPIRY_SECONDS
+    if not auth_secret:
+        raise AuthError("AUTH_SECRET not configured. Set MCP_AUTH_SECRET environment variable.")
+    
+    # Fast path: token already verified under this secret and not yet expired
+    cache_key = _VerifiedTokenCache.key(token)
+    cached = _token_cache.get(cache_key, auth_secret, time.time())
+    if cached is not None:
+        _metrics.token_cache(hit=True)
+        return _check_scope(cached, required_scope, correlation_id)
+    _metrics.token_cache(hit=False)
+    
     try:
         # Parse token - support both old and new formats
         payload, signature = token.rsplit(".", 1)
         
-        # Get current auth secret
-        auth_secret, default_expiry, _ = _get_auth_config()
-        if not auth_secret:
-            raise AuthError("AUTH_SECRET not configured. Set MCP_AUTH_SECRET environment variable.")
-        
         # Verify signature first
         expected_sig = hmac.new(
             auth_secret.encode(),
@@ -233,17 +298,9 @@ def verify_capability(token: str, required_scope: str, correlation_id: Optional[
             _metrics.auth_failure("expired")
             raise TokenExpiredError("Token has expired")
         
-        # Check scope
-        granted_scopes = set(scope_str.split(",")) if scope_str else set()
-        if required_scope not in granted_scopes:
-            log_structured("warning", "Token verification failed: insufficient scope", 
-                           required_scope=required_scope,
-                           granted_scopes=list(granted_scopes),
-                           correlation_id=correlation_id)
-            _metrics.auth_failure("insufficient_scope")
-            raise InsufficientScopeError(f"Token lacks required scope: {required_scope}")
+        granted_scopes = frozenset(scope_str.split(",")) if scope_str else frozenset()
         
-        # Log successful verification and update metrics
+        # Log successful verification (only on first sight of a token)
         token_age = now - iat
         log_structured("info", "Token verification successful", 
                        required_scope=required_scope,
@@ -252,16 +309,14 @@ def verify_capability(token: str, required_scope: str, correlation_id: Optional[
                        token_format=token_format,
                        correlation_id=correlation_id)
         
-        _metrics.token_verified(required_scope)
-        
-        return {
-            "timestamp": iat,
-            "expiry": exp,
+        verified = {
+            "iat": iat,
+            "exp": exp,
             "scopes": granted_scopes,
-            "valid": True,
             "format": token_format,
-            "correlation_id": correlation_id
+            "secret": auth_secret
         }
+        _token_cache.put(cache_key, verified)
         
     except (ValueError, IndexError) as e:
         log_structured("error", "Token verification failed: malformed token", 
@@ -270,6 +325,30 @@ def verify_capability(token: str, required_scope: str, correlation_id: Optional[
                        correlation_id=correlation_id)
         _metrics.auth_failure("invalid")
         raise InvalidTokenError(f"Malformed token: {e}") from e
+    
+    return _check_scope(verified, required_scope, correlation_id)
+
+def _check_scope(verified: Dict[str, Any], required_scope: str, correlation_id: str) -> dict:
+    """Check scope on a token whose signature and expiry were already verified."""
+    granted_scopes = verified["scopes"]
+    if required_scope not in granted_scopes:
+        log_structured("warning", "Token verification failed: insufficient scope", 
+                       required_scope=required_scope,
+                       granted_scopes=list(granted_scopes),
+                       correlation_id=correlation_id)
+        _metrics.auth_failure("insufficient_scope")
+        raise InsufficientScopeError(f"Token lacks required scope: {required_scope}")
+    
+    _metrics.token_verified(required_scope)
+    
+    return {
+        "timestamp": verified["iat"],
+        "expiry": verified["exp"],
+        "scopes": set(granted_scopes),
+        "valid": True,
+        "format": verified["format"],
+        "correlation_id": correlation_id
+    }
 
 def require_scope(scope: str):
     """Decorator to require a specific scope for MCP tool access.
@@ -369,6 +448,10 @@ def reset_auth_metrics():
     """Reset authentication metrics (useful for testing)."""
     _metrics.reset()
 
+def clear_token_cache():
+    """Drop all cached token verifications (useful for testing)."""
+    _token_cache.clear()
+
 # Dev/testing utilities
 def create_dev_token(scopes: str) -> str:
     """Create a token for development/testing.
@@ -0,0 +1,150 @@
+"""
+Batched tool invocation shared by MCP servers and the local client fallbacks.
+
+A batch is a list of ``{"tool": name, "arguments": {...}}`` calls executed in
+order within a single MCP round trip. One failing call does not abort the
+batch: every call gets its own entry in ``results`` (same order as the
+request) and the envelope reports how many succeeded.
+
+An argument value may reference an earlier call's result, so dependent steps
+fit in one batch::
+
+    [{"tool": "get_product_info", "arguments": {"sku": "A1"}},
+     {"tool": "get_market_intelligence",
+      "arguments": {"product_title": {"$ref": "0.title"}}}]
+
+``{"$ref": "<index>.<key>[.<key>...]", "default": ...}`` resolves against the
+result of call ``index``; if the path is missing and no default is given, the
+referencing call fails with ``unresolved_reference`` instead of running.
+"""
+from __future__ import annotations
+
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional
+
+logger = logging.getLogger("mcp.batch")
+
+MAX_BATCH_CALLS = 50
+
+_MISSING = object()
+
+
+class UnresolvedReference(Exception):
+    pass
+
+
+def _lookup(results: List[Any], ref: str) -> Any:
+    head, _, rest = str(ref).partition(".")
+    idx = int(head)
+    if idx < 0 or idx >= len(results):
+        return _MISSING
+    value = results[idx]
+    for key in rest.split(".") if rest else []:
+        if isinstance(value, Mapping) and key in value:
+            value = value[key]
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return _MISSING
+    return value
+
+
+def resolve_refs(value: Any, results: List[Any]) -> Any:
+    """Replace ``{"$ref": ...}`` markers in ``value`` with earlier results."""
+    if isinstance(value, dict):
+        if "$ref" in value:
+            try:
+                found = _lookup(results, value["$ref"])
+            except (TypeError, ValueError):
+                found = _MISSING
+            if found is _MISSING:
+                if "default" in value:
+                    return value["default"]
+                raise UnresolvedReference(str(value["$ref"]))
+            return found
+        return {k: resolve_refs(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_refs(v, results) for v in value]
+    return value
+
+
+def tool_map(obj: Any, names: Iterable[str]) -> Dict[str, Callable[..., Awaitable[Any]]]:
+    """Build a batch tool table from the named async methods of ``obj``."""
+    return {name: getattr(obj, name) for name in names if callable(getattr(obj, name, None))}
+
+
+def _signature(fn: Callable[..., Any]) -> Optional[inspect.Signature]:
+    try:
+        return inspect.signature(fn)
+    except (TypeError, ValueError):
+        return None
+
+
+def _call_ok(result: Any) -> bool:
+    return not (isinstance(result, Mapping) and result.get("ok") is False)
+
+
+async def run_batch(
+    tools: Mapping[str, Callable[..., Awaitable[Any]]],
+    calls: List[Dict[str, Any]],
+    capability_token: str = "",
+    max_calls: int = MAX_BATCH_CALLS,
+) -> Dict[str, Any]:
+    """Run ``calls`` in order against ``tools``; never raises for a single call.
+
+    ``capability_token`` is passed to every tool that takes one and whose
+    arguments do not already carry a token, so each call keeps its own scope
+    check.
+    """
+    if not isinstance(calls, list) or not calls:
+        return {"ok": False, "error": "validation_error", "message": "calls must be a non-empty list"}
+    if len(calls) > max_calls:
+        return {"ok": False, "error": "validation_error", "message": f"batch exceeds {max_calls} calls"}
+
+    raw_results: List[Any] = []
+    entries: List[Dict[str, Any]] = []
+    for index, call in enumerate(calls):
+        name = str((call or {}).get("tool") or "") if isinstance(call, Mapping) else ""
+        fn = tools.get(name)
+        result: Any
+        if fn is None:
+            result = {"ok": False, "error": "unknown_tool", "tool": name}
+        else:
+            try:
+                arguments = resolve_refs(dict(call.get("arguments") or {}), raw_results)
+                sig = _signature(fn)
+                if capability_token and "capability_token" not in arguments and sig and "capability_token" in sig.parameters:
+                    arguments["capability_token"] = capability_token
+                if sig is not None:
+                    sig.bind(**arguments)
+            except UnresolvedReference as e:
+                result = {"ok": False, "error": "unresolved_reference", "ref": str(e)}
+            except TypeError as e:
+                result = {"ok": False, "error": "validation_error", "message": str(e)}
+            else:
+                try:
+                    result = await fn(**arguments)
+                except Exception as e:
+                    logger.warning(f"Batch call {index} ({name}) failed: {e}")
+                    result = {"ok": False, "error": "internal_error", "message": str(e)}
+        raw_results.append(result)
+        entries.append({"index": index, "tool": name, "ok": _call_ok(result), "result": result})
+
+    succeeded = sum(1 for e in entries if e["ok"])
+    return {
+        "ok": succeeded == len(entries),
+        "partial": 0 < succeeded < len(entries),
+        "succeeded": succeeded,
+        "failed": len(entries) - succeeded,
+        "results": entries,
+    }
+
+
+def batch_result(batch: Mapping[str, Any], index: int) -> Dict[str, Any]:
+    """Result dict of call ``index`` (an error dict if the batch itself failed)."""
+    results: Optional[List[Dict[str, Any]]] = batch.get("results") if isinstance(batch, Mapping) else None
+    if not results or index >= len(results):
+        return {"ok": False, "error": (batch or {}).get("error", "batch_failed")}
+    result = results[index].get("result")
+    return result if isinstance(result, dict) else {"ok": True, "data": result}
@@ -0,0 +1,178 @@
+"""
+Bounded TTL idempotency store.
+
+Keys live in fixed-width time buckets; when the oldest bucket falls out of the
+TTL window it is dropped whole, so memory is bounded by the number of keys
+seen within one TTL. A small SQLite table (``idempotency_keys``) backs the
+in-memory view, so duplicates are still caught after a restart. Expired rows
+are purged whenever a bucket is evicted. Async callers use ``acheck_and_add``,
+which answers in-memory duplicates directly and runs any SQLite work in a
+worker thread.
+
+Used by the data collector (fetch request ids), the governance agent and the
+proposal logger (proposal ids), each under its own namespace.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set, Union
+
+logger = logging.getLogger("idempotency")
+
+
+def _default_db_path() -> Path:
+    return Path(__file__).resolve().parents[3] / "app" / "data.db"
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        namespace: str,
+        ttl_s: float = 24 * 3600,
+        bucket_s: Optional[float] = None,
+        db_path: Union[str, Path, None] = None,
+        persist: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.namespace = namespace
+        self.ttl_s = float(ttl_s)
+        self.bucket_s = float(bucket_s) if bucket_s else max(1.0, self.ttl_s / 60)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[int, Set[str]]" = OrderedDict()
+        self._index: Dict[str, int] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_path: Optional[Path] = None
+        if persist:
+            self._db_path = Path(db_path) if db_path is not None else _default_db_path()
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Open the backing table on first use; falls back to memory-only on error."""
+        if self._conn is None and self._db_path is not None:
+            try:
+                self._db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self._db_path.as_posix(), timeout=5.0, check_same_thread=False)
+                conn.execute("PRAGMA busy_timeout=5000")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS idempotency_keys (
+                      namespace TEXT NOT NULL,
+                      key TEXT NOT NULL,
+                      expires_at REAL NOT NULL,
+                      PRIMARY KEY (namespace, key)
+                    )
+                    """
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires ON idempotency_keys(expires_at)"
+                )
+                conn.commit()
+                self._conn = conn
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Idempotency store '{self.namespace}' running memory-only: {e}")
+                self._db_path = None
+        return self._conn
+
+    def _bucket_id(self, now: float) -> int:
+        return int(now // self.bucket_s)
+
+    def _evict(self, now: float) -> None:
+        oldest_live = self._bucket_id(now - self.ttl_s)
+        evicted = False
+        while self._buckets:
+            bid = next(iter(self._buckets))
+            if bid >= oldest_live:
+                break
+            for key in self._buckets.pop(bid):
+                if self._index.get(key) == bid:
+                    del self._index[key]
+            evicted = True
+        conn = self._db() if evicted else None
+        if conn is not None:
+            try:
+                conn.execute(
+                    "DELETE FROM idempotency_keys WHERE namespace=? AND expires_at<=?",
+                    (self.namespace, now),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Idempotency purge failed: {e}")
+
+    def _remember(self, key: str, now: float) -> None:
+        bid = self._bucket_id(now)
+        self._buckets.setdefault(bid, set()).add(key)
+        self._index[key] = bid
+
+    def seen(self, key: str) -> bool:
+        """Return True if ``key`` was recorded within the TTL (does not record it)."""
+        now = self._clock()
+        with self._lock:
+            self._evict(now)
+            if key in self._index:
+                return True
+            conn = self._db()
+            if conn is None:
+                return False
+            try:
+                row = conn.execute(
+                    "SELECT 1 FROM idempotency_keys WHERE namespace=? AND key=? AND expires_at>?",
+                    (self.namespace, key, now),
+                ).fetchone()
+            except sqlite3.Error:
+                return False
+            return row is not None
+
+    def check_and_add(self, key: str) -> bool:
+        """Record ``key``; returns True if it is new, False if it is a duplicate."""
+        key = str(key)
+        now = self._clock()
+        with self._lock:
+            self._evict(now)
+            if key in self._index:
+                return False
+            conn = self._db()
+            if conn is not None:
+                try:
+                    # Inserts a new key or revives an expired one; a live duplicate changes nothing
+                    cur = conn.execute(
+                        """
+                        INSERT INTO idempotency_keys (namespace, key, expires_at)
+                        VALUES (?,?,?)
+                        ON CONFLICT(namespace, key) DO UPDATE SET expires_at=excluded.expires_at
+                        WHERE idempotency_keys.expires_at<=?
+                        """,
+                        (self.namespace, key, now + self.ttl_s, now),
+                    )
+                    conn.commit()
+                    if cur.rowcount == 0:
+                        self._remember(key, now)
+                        return False
+                except sqlite3.Error as e:
+                    logger.debug(f"Idempotency write failed, using memory only: {e}")
+            self._remember(key, now)
+            return True
+
+    async def acheck_and_add(self, key: str) -> bool:
+        """``check_and_add`` for code running on the event loop."""
+        key = str(key)
+        bid = self._index.get(key)
+        if bid is not None and bid >= self._bucket_id(self._clock() - self.ttl_s):
+            return False
+        return await asyncio.to_thread(self.check_and_add, key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._db_path = None
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import importlib
+import importlib.util
 import os
+import sys
 import time
 import uuid
 
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from core.agents.agent_sdk.batch import run_batch, tool_map
 
 
 
@@ -29,110 +34,345 @@ class _LocalDataCollectorTools:
     async def import_product_catalog(self, rows: list) -> Dict[str, Any]:
         return await self._dc.import_product_catalog(rows)
 
+    async def call_batch(self, calls: list) -> Dict[str, Any]:
+        return await self._dc.batch_call(calls)
+
+
+class _PooledConnection:
+    __slots__ = ("read", "write", "created_at", "cm")
+
+    def __init__(self, read: Any, write: Any, cm: Any = None) -> None:
+        self.read = read
+        self.write = write
+        self.created_at = time.time()
+        # Keep the stdio_client context alive for as long as the streams are used
+        self.cm = cm
+
+
+async def _stdio_connect(command: str, args: list[str]) -> _PooledConnection:
+    from mcp.client.stdio import stdio_client, StdioServerParameters
+    server_params = StdioServerParameters(command=command, args=args)
+    cm = stdio_client(server_params)
+    read, write = await cm.__aenter__()
+    return _PooledConnection(read, write, cm)
+
+
+def _stream_alive(conn: _PooledConnection) -> bool:
+    """Cheap liveness probe: both memory streams still have a peer on the other side."""
+    for stream in (conn.read, conn.write):
+        if getattr(stream, "_closed", False):
+            return False
+        stats = getattr(stream, "statistics", None)
+        if callable(stats):
+            try:
+                st = stats()
+            except Exception:
+                return False
+            if getattr(st, "open_receive_streams", 1) == 0 or getattr(st, "open_send_streams", 1) == 0:
+                return False
+    return True
+
 
 class _MCPConnectionPool:
-    """Connection pool with lifecycle management for MCP stdio connections."""
-    
-    def __init__(self, max_connections: int = 3, connection_ttl: float = 300.0):
+    """Connection pool with lifecycle management for MCP stdio connections.
+
+    A semaphore bounds checked-out connections and queues waiters in FIFO
+    order. Idle connections are probed before reuse and dropped when dead or
+    older than ``connection_ttl``. With ``min_idle`` set, ``prewarm`` spawns
+    connections ahead of time and the pool tops itself back up in the
+    background, so server subprocess spawns stay off the request path.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 3,
+        connection_ttl: float = 300.0,
+        min_idle: Optional[int] = None,
+        connect_timeout: float = 10.0,
+        command: Optional[str] = None,
+        args: Optional[list[str]] = None,
+        connect: Optional[Callable[[str, list[str]], Awaitable[_PooledConnection]]] = None,
+        probe: Callable[[_PooledConnection], bool] = _stream_alive,
+    ):
         self.max_connections = max_connections
         self.connection_ttl = connection_ttl
-        self._pool: list[tuple[Any, Any, float]] = []  # (read, write, created_at)
-        self._in_use: set[tuple[Any, Any]] = set()
-        self._lock = asyncio.Lock()
-        
+        if min_idle is None:
+            min_idle = int(os.getenv("MCP_POOL_MIN_IDLE", "1") or 0)
+        self.min_idle = max(0, min(int(min_idle), max_connections))
+        self.connect_timeout = connect_timeout
+        self.command = command
+        self.args = args
+        self._connect = connect or _stdio_connect
+        self._probe = probe
+        self._sem = asyncio.Semaphore(max_connections)
+        self._idle: list[_PooledConnection] = []
+        self._in_use: Dict[tuple[Any, Any], _PooledConnection] = {}
+        self._refill_task: Optional[asyncio.Task] = None
+        # Connections being spawned right now, by get_connection or _refill
+        self._creating = 0
+        self._closed = False
+        self.metrics: Dict[str, float] = {
+            "acquired": 0,
+            "reused": 0,
+            "creates": 0,
+            "create_failures": 0,
+            "evictions": 0,
+            "probe_failures": 0,
+            "waits": 0,
+            "wait_time_s": 0.0,
+        }
+
+    async def _create(self) -> _PooledConnection:
+        if self.command is None:
+            raise RuntimeError("MCP connection pool has no server command configured")
+        self._creating += 1
+        try:
+            conn = await asyncio.wait_for(self._connect(self.command, list(self.args or [])), timeout=self.connect_timeout)
+        except Exception:
+            self.metrics["create_failures"] += 1
+            raise
+        finally:
+            self._creating -= 1
+        self.metrics["creates"] += 1
+        return conn
+
+    async def _close(self, conn: _PooledConnection) -> None:
+        try:
+            await conn.write.aclose()
+        except Exception:
+            pass
+
+    def _usable(self, conn: _PooledConnection) -> bool:
+        if time.time() - conn.created_at >= self.connection_ttl:
+            return False
+        try:
+            ok = self._probe(conn)
+        except Exception:
+            ok = False
+        if not ok:
+            self.metrics["probe_failures"] += 1
+        return ok
+
+    def _schedule_refill(self) -> None:
+        if self._closed or self.min_idle <= 0 or len(self._idle) >= self.min_idle:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self) -> None:
+        while not self._closed and len(self._idle) < self.min_idle and (
+            len(self._idle) + len(self._in_use) + self._creating < self.max_connections
+        ):
+            try:
+                conn = await self._create()
+            except Exception:
+                return
+            if self._closed:
+                await self._close(conn)
+                return
+            self._idle.append(conn)
+
+    async def prewarm(self, command: Optional[str] = None, args: Optional[list[str]] = None) -> int:
+        """Spawn connections up to ``min_idle``; returns how many are idle afterwards."""
+        if command is not None:
+            self.command, self.args = command, args
+        await self._refill()
+        return len(self._idle)
+
     async def get_connection(self, command: str, args: list[str]) -> tuple[Any, Any]:
-        """Get connection from pool or create new one."""
-        async with self._lock:
-            now = time.time()
-            
-            # Remove expired connections
-            self._pool = [(r, w, t) for r, w, t in self._pool if now - t < self.connection_ttl]
-            
-            # Try to reuse existing connection
-            if self._pool:
-                read, write, created_at = self._pool.pop(0)
-                self._in_use.add((read, write))
-                return read, write
-            
-            # Create new connection if under limit
-            if len(self._in_use) < self.max_connections:
-                try:
-                    from mcp.client.stdio import stdio_client, StdioServerParameters
-                    server_params = StdioServerParameters(command=command, args=args)
-                    
-                    # Create connection with timeout
-                    read, write = await asyncio.wait_for(
-                        stdio_client(server_params).__aenter__(), timeout=10.0
-                    )
-                    self._in_use.add((read, write))
-                    return read, write
-                except Exception:
-                    raise
-            
-            # If at limit, wait briefly and retry
-            await asyncio.sleep(0.1)
-            return await self.get_connection(command, args)
-    
+        """Get connection from pool or create new one, waiting FIFO when exhausted."""
+        if self.command is None:
+            self.command, self.args = command, args
+        if self._sem.locked():
+            self.metrics["waits"] += 1
+        t0 = time.perf_counter()
+        await self._sem.acquire()
+        self.metrics["wait_time_s"] += time.perf_counter() - t0
+        try:
+            conn: Optional[_PooledConnection] = None
+            while self._idle:
+                candidate = self._idle.pop()
+                if self._usable(candidate):
+                    conn = candidate
+                    self.metrics["reused"] += 1
+                    break
+                self.metrics["evictions"] += 1
+                await self._close(candidate)
+            if conn is None:
+                conn = await self._create()
+        except BaseException:
+            self._sem.release()
+            raise
+        self._in_use[(conn.read, conn.write)] = conn
+        self.metrics["acquired"] += 1
+        self._schedule_refill()
+        return conn.read, conn.write
+
     async def return_connection(self, read: Any, write: Any, reusable: bool = True) -> None:
         """Return connection to pool or close it."""
-        async with self._lock:
-            conn_pair = (read, write)
-            self._in_use.discard(conn_pair)
-            
-            if reusable and len(self._pool) < self.max_connections:
-                self._pool.append((read, write, time.time()))
+        conn = self._in_use.pop((read, write), None)
+        try:
+            if conn is None:
+                return
+            if reusable and not self._closed and time.time() - conn.created_at < self.connection_ttl:
+                self._idle.append(conn)
             else:
-                # Close connection
-                try:
-                    await write.aclose()
-                except Exception:
-                    pass
+                self.metrics["evictions"] += 1
+                await self._close(conn)
+        finally:
+            if conn is not None:
+                self._sem.release()
+        self._schedule_refill()
+
+    def stats(self) -> Dict[str, Any]:
+        acquired = self.metrics["acquired"] or 1
+        return {
+            **self.metrics,
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+            "creating": self._creating,
+            "max_connections": self.max_connections,
+            "min_idle": self.min_idle,
+            "avg_wait_ms": round(self.metrics["wait_time_s"] * 1000.0 / acquired, 3),
+        }
 
     async def close_all(self) -> None:
         """Close all connections in pool."""
-        async with self._lock:
-            # Close pooled connections
-            for read, write, _ in self._pool:
-                try:
-                    await write.aclose()
-                except Exception:
-                    pass
-            
-            # Close in-use connections (best effort)
-            for read, write in self._in_use:
-                try:
-                    await write.aclose()
-                except Exception:
-                    pass
-            
-            self._pool.clear()
-            self._in_use.clear()
+        self._closed = True
+        if self._refill_task is not None and not self._refill_task.done():
+            self._refill_task.cancel()
+            await asyncio.gather(self._refill_task, return_exceptions=True)
+        # Close pooled connections, then in-use connections (best effort)
+        for conn in self._idle + list(self._in_use.values()):
+            await self._close(conn)
+        self._idle.clear()
+        self._in_use.clear()
+
+
+def _server_module_from_args(args: list[str]) -> Optional[str]:
+    """Module name from ``python -m <module>`` style server args, if any."""
+    if "-m" in args:
+        idx = args.index("-m")
+        if idx + 1 < len(args):
+            return args[idx + 1]
+    return None
+
+
+def _module_available(name: str) -> bool:
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class _InProcessTransport:
+    """Dispatches MCP tool calls to a co-located server module by direct function call.
+
+    The server's tool functions still run their own capability checks and
+    return the same dicts they would over stdio; only spawning, framing and
+    JSON (de)serialization are skipped. Results carry the same ``_mcp_meta``
+    envelope as the stdio path, marked ``transport="inprocess"``.
+    """
+
+    def __init__(self, module_name: str) -> None:
+        self.module_name = module_name
+        self._tools: Optional[Dict[str, Callable[..., Awaitable[Any]]]] = None
+
+    def _load(self) -> Dict[str, Callable[..., Awaitable[Any]]]:
+        if self._tools is None:
+            module = importlib.import_module(self.module_name)
+            server = getattr(module, "mcp", None)
+            registered = getattr(getattr(server, "_tool_manager", None), "_tools", None)
+            if registered is not None:
+                self._tools = {name: tool.fn for name, tool in registered.items()}
+            else:
+                # Fallback FastMCP shim keeps plain functions
+                self._tools = dict(getattr(server, "_tools", {}) or {})
+        return self._tools
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any], timeout: float = 30.0) -> Tuple[bool, Dict[str, Any]]:
+        meta = {"tool": tool_name, "attempt": 1, "timestamp": time.time(), "transport": "inprocess"}
+        try:
+            fn = self._load().get(tool_name)
+        except Exception as e:
+            return False, {"ok": False, "error": f"mcp_client_runtime_error: {e}", "error_code": "import_error", "_mcp_meta": meta}
+        if fn is None:
+            return False, {"ok": False, "error": f"mcp_client_runtime_error: unknown tool {tool_name}", "error_code": "unknown_tool", "_mcp_meta": meta}
+        try:
+            data = await asyncio.wait_for(fn(**arguments), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False, {"ok": False, "error": f"mcp_client_runtime_error: timeout_after_{timeout}s", "error_code": "timeout", "_mcp_meta": meta}
+        except Exception as e:
+            return False, {"ok": False, "error": f"mcp_client_runtime_error: {e}", "error_code": "runtime_error", "_mcp_meta": meta}
+        if isinstance(data, dict):
+            data = dict(data)
+            data.setdefault("_mcp_meta", meta)
+            return True, data
+        return True, {"ok": True, "data": data, "_mcp_meta": meta}
+
+
+def _select_transport(command: str, args: list[str], transport: Optional[str] = None) -> Optional[_InProcessTransport]:
+    """Pick the in-process transport per ``MCP_TRANSPORT`` (stdio|auto|inprocess).
+
+    ``stdio`` is the default. ``auto`` goes in-process when the server is
+    launched as ``python -m <module>`` and that module is importable here.
+    """
+    mode = (transport or os.getenv("MCP_TRANSPORT") or "stdio").strip().lower()
+    if mode == "stdio":
+        return None
+    module = _server_module_from_args(args)
+    if module is None or not _module_available(module):
+        return None
+    if mode == "inprocess" or (mode == "auto" and os.path.basename(command).startswith("python")):
+        return _InProcessTransport(module)
+    return None
 
 
 class _MCPDataCollectorTools:
     """MCP-backed tools using stdio transport with connection pooling.
 
+    When the server module is co-located (see ``_select_transport``), calls are
+    dispatched in-process instead of over a stdio subprocess.
+
     Requires the `mcp` package. If missing or any error occurs, callers should fall back to _LocalDataCollectorTools.
     """
     
     _pools: Dict[str, _MCPConnectionPool] = {}
     _pools_lock = asyncio.Lock()
 
-    def __init__(self, command: Optional[str] = None, args: Optional[list[str]] = None) -> None:
+    def __init__(self, command: Optional[str] = None, args: Optional[list[str]] = None, transport: Optional[str] = None) -> None:
         self.command = command or os.getenv("MCP_DC_CMD") or "python"
         default_args = ["-u", "-m", "core.agents.data_collector.mcp_server"]
         self.args = args if args is not None else (os.getenv("MCP_DC_ARGS", "").split() if os.getenv("MCP_DC_ARGS") else default_args)
         
         # Pool key based on command + args
         self._pool_key = f"{self.command}:{':'.join(self.args)}"
+        self._inprocess = _select_transport(self.command, self.args, transport)
+
+    @property
+    def transport(self) -> str:
+        return "inprocess" if self._inprocess is not None else "stdio"
 
     async def _get_pool(self) -> _MCPConnectionPool:
         """Get or create connection pool for this service."""
         async with self._pools_lock:
             if self._pool_key not in self._pools:
-                self._pools[self._pool_key] = _MCPConnectionPool()
+                self._pools[self._pool_key] = _MCPConnectionPool(command=self.command, args=self.args)
             return self._pools[self._pool_key]
 
+    async def prewarm(self) -> int:
+        """Spawn the pool's ``min_idle`` server connections ahead of the first call."""
+        if self._inprocess is not None:
+            return 0
+        pool = await self._get_pool()
+        return await pool.prewarm()
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Dict[str, Any]]:
+        return {key: pool.stats() for key, pool in cls._pools.items()}
+
     @classmethod
     async def cleanup_all_pools(cls) -> None:
         """Cleanup all connection pools. Call during shutdown."""
@@ -144,6 +384,9 @@ class _MCPDataCollectorTools:
     async def _call_tool(self, tool_name: str, arguments: Dict[str, Any], timeout: float = 30.0, retries: int = 3) -> Tuple[bool, Dict[str, Any]]:
         """Call MCP tool with connection pooling, timeout, retries, and exponential backoff."""
         import random
+
+        if self._inprocess is not None:
+            return await self._inprocess.call(tool_name, arguments, timeout=timeout)
         
         try:
             from mcp.client.session import ClientSession  # type: ignore
@@ -269,15 +512,20 @@ class _MCPDataCollectorTools:
         ok, res = await self._call_tool("import_product_catalog", {"rows": rows})
         return res if ok else res
 
+    async def call_batch(self, calls: list, timeout: float = 60.0) -> Dict[str, Any]:
+        """Send ``calls`` ([{"tool", "arguments"}, ...]) to the server's batch_call tool in one round trip."""
+        ok, res = await self._call_tool("batch_call", {"calls": calls}, timeout=timeout)
+        return res
+
 
 class DataCollectorTools:
     """Facade over data-collector functions, MCP-enabled via USE_MCP toggle."""
 
-    def __init__(self, use_mcp: bool | None = None) -> None:
+    def __init__(self, use_mcp: bool | None = None, transport: Optional[str] = None) -> None:
         if use_mcp is None:
             use_mcp = str(os.getenv("USE_MCP", "")).strip() in {"1", "true", "yes", "on"}
         self._use_mcp = bool(use_mcp)
-        self._mcp_impl: Optional[_MCPDataCollectorTools] = _MCPDataCollectorTools() if self._use_mcp else None
+        self._mcp_impl: Optional[_MCPDataCollectorTools] = _MCPDataCollectorTools(transport=transport) if self._use_mcp else None
         self._local_impl = _LocalDataCollectorTools()
 
     def using_mcp(self) -> bool:
@@ -311,9 +559,29 @@ class DataCollectorTools:
                 return res
         return await self._local_impl.import_product_catalog(*args, **kwargs)
 
+    async def call_batch(self, calls: list) -> Dict[str, Any]:
+        """Run several tool calls in one round trip; see ``agent_sdk.batch`` for the format."""
+        if self.using_mcp():
+            res = await self._mcp_impl.call_batch(calls)  # type: ignore[union-attr]
+            if res and (res.get("ok") is not False or res.get("partial")):
+                return res
+        return await self._local_impl.call_batch(calls)
+
+
+def get_data_collector_client(use_mcp: bool | None = None, transport: Optional[str] = None) -> DataCollectorTools:
+    """``transport`` overrides ``MCP_TRANSPORT`` (stdio|auto|inprocess) for the MCP path."""
+    return DataCollectorTools(use_mcp=use_mcp, transport=transport)
 
-def get_data_collector_client(use_mcp: bool | None = None) -> DataCollectorTools:
-    return DataCollectorTools(use_mcp=use_mcp)
+
+async def prewarm_mcp_clients() -> Dict[str, int]:
+    """Prewarm the data collector and price optimizer pools. Call during application startup."""
+    warmed: Dict[str, int] = {}
+    for impl in (_MCPDataCollectorTools(), _MCPPriceOptimizerTools()._internal):
+        try:
+            warmed[impl._pool_key] = await impl.prewarm()
+        except Exception:
+            warmed[impl._pool_key] = 0
+    return warmed
 
 
 async def shutdown_mcp_clients() -> None:
@@ -350,6 +618,17 @@ def _schedule_cleanup():
 _schedule_cleanup()
 
 
+PRICE_OPTIMIZER_BATCH_TOOLS = (
+    "get_product_info",
+    "get_market_intelligence",
+    "run_pricing_algorithm",
+    "validate_price",
+    "publish_price_proposal",
+    "check_market_data_freshness",
+    "start_market_data_collection",
+)
+
+
 class _LocalPriceOptimizerTools:
     """Fallback that calls local price optimizer Tools implementation."""
 
@@ -394,6 +673,9 @@ class _LocalPriceOptimizerTools:
     async def start_market_data_collection(self, sku: str) -> Dict[str, Any]:
         return await self._impl.start_market_data_collection(sku)
 
+    async def call_batch(self, calls: list) -> Dict[str, Any]:
+        return await run_batch(tool_map(self, PRICE_OPTIMIZER_BATCH_TOOLS), calls)
+
 
 class _MCPPriceOptimizerTools:
     """MCP-backed price optimizer tools that delegate to a price optimizer MCP server.
@@ -401,12 +683,12 @@ class _MCPPriceOptimizerTools:
     Reuses the existing _MCPDataCollectorTools pooling/call infrastructure by calling its internal _call_tool.
     """
 
-    def __init__(self, command: Optional[str] = None, args: Optional[list[str]] = None, app_db: str | None = None, market_db: str | None = None) -> None:
+    def __init__(self, command: Optional[str] = None, args: Optional[list[str]] = None, app_db: str | None = None, market_db: str | None = None, transport: Optional[str] = None) -> None:
         self.command = command or os.getenv("MCP_PO_CMD") or "python"
         default_args = ["-u", "-m", "core.agents.price_optimizer.mcp_server"]
         self.args = args if args is not None else (os.getenv("MCP_PO_ARGS", "").split() if os.getenv("MCP_PO_ARGS") else default_args)
         # Instantiate an internal MCP utility for making calls (we reuse the DataCollector impl internals)
-        self._internal = _MCPDataCollectorTools(command=self.command, args=self.args)
+        self._internal = _MCPDataCollectorTools(command=self.command, args=self.args, transport=transport)
         self._app_db = app_db
         self._market_db = market_db
 
@@ -414,6 +696,9 @@ class _MCPPriceOptimizerTools:
         ok, res = await self._internal._call_tool(tool_name, arguments)
         return res
 
+    async def call_batch(self, calls: list) -> Dict[str, Any]:
+        return await self._internal.call_batch(calls)
+
     async def get_product_info(self, sku: str) -> Dict[str, Any]:
         # Price optimizer MCP may not expose this; delegate to optimize_price legacy or return a not_implemented pattern
         # Try calling a legacy optimize_price if present (some MCP servers expose it)
@@ -507,14 +792,14 @@ class _MCPPriceOptimizerTools:
 class PriceOptimizerTools:
     """Facade over price optimizer functions, optionally MCP-enabled via USE_MCP."""
 
-    def __init__(self, use_mcp: bool | None = None, app_db: str | None = None, market_db: str | None = None) -> None:
+    def __init__(self, use_mcp: bool | None = None, app_db: str | None = None, market_db: str | None = None, transport: Optional[str] = None) -> None:
         if use_mcp is None:
             use_mcp = str(os.getenv("USE_MCP", "")).strip() in {"1", "true", "yes", "on"}
         self._use_mcp = bool(use_mcp)
         self._mcp_impl: Optional[_MCPPriceOptimizerTools] = None
         try:
             if self._use_mcp:
-                self._mcp_impl = _MCPPriceOptimizerTools(app_db=app_db, market_db=market_db)
+                self._mcp_impl = _MCPPriceOptimizerTools(app_db=app_db, market_db=market_db, transport=transport)
         except Exception:
             self._mcp_impl = None
         self._local_impl = _LocalPriceOptimizerTools(app_db=app_db, market_db=market_db)
@@ -571,7 +856,19 @@ class PriceOptimizerTools:
                 return res
         return await self._local_impl.start_market_data_collection(*args, **kwargs)
 
+    async def call_batch(self, calls: list) -> Dict[str, Any]:
+        """Run several tool calls in one round trip; see ``agent_sdk.batch`` for the format.
+
+        Falls back to running the batch locally when the MCP server has no batch_call tool.
+        """
+        if self.using_mcp():
+            res = await self._mcp_impl.call_batch(calls)  # type: ignore[union-attr]
+            if res and (res.get("ok") is not False or res.get("partial")):
+                return res
+        return await self._local_impl.call_batch(calls)
+
 
-def get_price_optimizer_client(use_mcp: bool | None = None, app_db: str | None = None, market_db: str | None = None) -> PriceOptimizerTools:
-    return PriceOptimizerTools(use_mcp=use_mcp, app_db=app_db, market_db=market_db)
+def get_price_optimizer_client(use_mcp: bool | None = None, app_db: str | None = None, market_db: str | None = None, transport: Optional[str] = None) -> PriceOptimizerTools:
+    """``transport`` overrides ``MCP_TRANSPORT`` (stdio|auto|inprocess) for the MCP path."""
+    return PriceOptimizerTools(use_mcp=use_mcp, app_db=app_db, market_db=market_db, transport=transport)
 
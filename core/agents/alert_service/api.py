@@ -1,9 +1,11 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
 from .repo import Repo
 from .engine import AlertEngine
 from .schemas import RuleSpec
 from .config import load_runtime_defaults, merge_defaults_db, for_ui
+from core.agents.agent_sdk.bus_factory import get_bus
+from core.agents.agent_sdk.protocol import Topic
 
 # Singletons for this process
 _repo = Repo()
@@ -33,15 +35,40 @@ async def reload_rules() -> None:
         await _engine._load_rules()     # type: ignore[attr-defined]
 
 # ---------- Incidents ----------
-async def list_incidents(status: Optional[str] = None, owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
-    return await _repo.list_incidents(status, owner_id)
+async def list_incidents(
+    status: Optional[str] = None,
+    owner_id: Optional[str] = None,
+    severity: Optional[str] = None,
+    rule_id: Optional[str] = None,
+    sku: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    return await _repo.list_incidents(status, owner_id, severity, rule_id, sku)
+
+async def list_incidents_page(
+    status: Optional[str] = None,
+    owner_id: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    severity: Optional[str] = None,
+    rule_id: Optional[str] = None,
+    sku: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    return await _repo.list_incidents_page(status, owner_id, limit, cursor, severity, rule_id, sku)
+
+async def _publish_update(incident_id: str) -> None:
+    """Push the updated incident to alert.event so incident streams see status changes."""
+    incident = await _repo.get_incident(incident_id)
+    if incident:
+        await get_bus().publish(Topic.ALERT.value, incident)
 
 async def ack_incident(incident_id: str, owner_id: Optional[str] = None) -> Dict[str, Any]:
     await _repo.set_status(incident_id, "ACKED", owner_id)
+    await _publish_update(incident_id)
     return {"ok": True, "id": incident_id, "status": "ACKED"}
 
 async def resolve_incident(incident_id: str, owner_id: Optional[str] = None) -> Dict[str, Any]:
     await _repo.set_status(incident_id, "RESOLVED", owner_id)
+    await _publish_update(incident_id)
     return {"ok": True, "id": incident_id, "status": "RESOLVED"}
 
 # ---------- Rules ----------
@@ -0,0 +1,297 @@
+"""
+Compiled rule predicates and the per-source rule index used by AlertEngine.
+
+``RuleSpec.where`` is parsed once into a whitelisted AST (comparisons, boolean
+logic, arithmetic, field names and a few numeric builtins) and compiled to a
+code object; evaluating it is a single ``eval`` over the event's fields with no
+builtins in scope. Field names may be bare (``margin < 0.05``) or qualified with
+the event alias (``pp.margin < 0.05``).
+
+The same expression is also compiled in a vectorized form that operates on
+numpy columns, so a batch of ticks is evaluated per rule in one pass instead of
+once per tick. A field missing from an event makes the predicate false for that
+event in both forms.
+"""
+from __future__ import annotations
+
+import ast
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("alert_engine")
+
+ALIASES = frozenset({"tick", "pp", "event"})
+
+def _vmin(*args: Any) -> Any:
+    return np.minimum.reduce(np.broadcast_arrays(*args))
+
+
+def _vmax(*args: Any) -> Any:
+    return np.maximum.reduce(np.broadcast_arrays(*args))
+
+
+_SCALAR_FUNCS: Dict[str, Callable[..., Any]] = {"abs": abs, "min": min, "max": max, "round": round}
+# Never pass numpy ufuncs extra positional args: the third one is ``out=``
+_VECTOR_FUNCS: Dict[str, Callable[..., Any]] = {
+    "abs": np.abs,
+    "min": _vmin,
+    "max": _vmax,
+    "round": np.round,
+}
+# Accepted positional argument counts (min, max); None means unbounded
+_ARITY: Dict[str, Tuple[int, Optional[int]]] = {"abs": (1, 1), "min": (2, None), "max": (2, None), "round": (1, 2)}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.Is, ast.IsNot, ast.Name, ast.Load, ast.Constant, ast.Attribute, ast.Call,
+    ast.Tuple, ast.List,
+)
+
+
+class UnsafeExpression(ValueError):
+    pass
+
+
+class _Qualify(ast.NodeTransformer):
+    """Validate the tree and rewrite ``alias.field`` to a bare ``field`` name."""
+
+    def __init__(self) -> None:
+        self.fields: set = set()
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        if not isinstance(node, _ALLOWED_NODES):
+            raise UnsafeExpression(f"unsupported syntax: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if isinstance(node.value, ast.Name) and node.value.id in ALIASES and not node.attr.startswith("_"):
+            self.fields.add(node.attr)
+            return ast.copy_location(ast.Name(id=node.attr, ctx=ast.Load()), node)
+        raise UnsafeExpression("attribute access is limited to <alias>.<field>")
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if not (isinstance(node.func, ast.Name) and node.func.id in _SCALAR_FUNCS) or node.keywords:
+            raise UnsafeExpression("only abs/min/max/round may be called")
+        lo, hi = _ARITY[node.func.id]
+        if len(node.args) < lo or (hi is not None and len(node.args) > hi) or any(isinstance(a, ast.Starred) for a in node.args):
+            raise UnsafeExpression(f"wrong number of arguments for {node.func.id}()")
+        node.args = [self.visit(a) for a in node.args]
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id.startswith("_"):
+            raise UnsafeExpression(f"invalid name: {node.id}")
+        if node.id not in _SCALAR_FUNCS and node.id not in ("True", "False", "None"):
+            self.fields.add(node.id)
+        return node
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite boolean logic into elementwise numpy operators, and division
+    into guarded calls (see ``_division_guards``)."""
+
+    _DIVISION = {ast.Div: "_div", ast.FloorDiv: "_floordiv", ast.Mod: "_mod"}
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        name = self._DIVISION.get(type(node.op))
+        if name is None:
+            return node
+        call = ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return ast.copy_location(call, node)
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        out = node.values[0]
+        for value in node.values[1:]:
+            out = ast.BinOp(left=out, op=op, right=value)
+        return ast.copy_location(out, node)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.copy_location(ast.UnaryOp(op=ast.Invert(), operand=node.operand), node)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        self.generic_visit(node)
+        parts: List[ast.AST] = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                part: ast.AST = ast.Call(
+                    func=ast.Name(id="_isin", ctx=ast.Load()), args=[left, right], keywords=[]
+                )
+                if isinstance(op, ast.NotIn):
+                    part = ast.UnaryOp(op=ast.Invert(), operand=part)
+            elif isinstance(op, (ast.Is, ast.IsNot)):
+                raise UnsafeExpression("'is' comparisons are not vectorizable")
+            else:
+                part = ast.Compare(left=left, ops=[op], comparators=[right])
+            parts.append(part)
+            left = right
+        out = parts[0]
+        for part in parts[1:]:
+            out = ast.BinOp(left=out, op=ast.BitAnd(), right=part)
+        return ast.copy_location(out, node)
+
+
+def _isin(values: Any, options: Sequence[Any]) -> Any:
+    return np.isin(values, list(options))
+
+
+def _scalar(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _division_guards(undefined: np.ndarray) -> Dict[str, Callable[..., Any]]:
+    """Division helpers that flag rows with a zero divisor in ``undefined``.
+
+    The scalar predicate raises ZeroDivisionError for such rows and so never
+    fires; flagged rows are masked out of the vectorized result to match,
+    whatever the rest of the expression does with the inf/nan.
+    """
+
+    def guarded(op: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+        def apply(a: Any, b: Any) -> Any:
+            zero = np.asarray(b == 0, dtype=bool)
+            if zero.any():
+                undefined[np.broadcast_to(zero, undefined.shape)] = True
+                b = np.where(zero, 1, b)
+            return op(a, b)
+
+        return apply
+
+    return {"_div": guarded(np.true_divide), "_floordiv": guarded(np.floor_divide), "_mod": guarded(np.mod)}
+
+
+@dataclass(frozen=True)
+class CompiledWhere:
+    expr: str
+    fields: FrozenSet[str]
+    _code: Any = field(repr=False)
+    _vector_code: Any = field(default=None, repr=False)
+
+    def __call__(self, values: Mapping[str, Any]) -> bool:
+        """Evaluate against one event's fields; missing fields or type errors are false."""
+        if any(values.get(k) is None for k in self.fields):
+            return False
+        scope = dict(_SCALAR_FUNCS)
+        scope.update((k, values[k]) for k in self.fields)
+        try:
+            return bool(eval(self._code, {"__builtins__": {}}, scope))
+        except Exception:
+            return False
+
+    def evaluate_columns(self, columns: Mapping[str, np.ndarray], present: Mapping[str, np.ndarray], n: int) -> np.ndarray:
+        """Evaluate against ``n`` rows of numpy columns (see ``columns_for``)."""
+        mask = np.ones(n, dtype=bool)
+        for k in self.fields:
+            mask &= present[k]
+        if self._vector_code is not None:
+            undefined = np.zeros(n, dtype=bool)
+            scope: Dict[str, Any] = dict(_VECTOR_FUNCS)
+            scope["_isin"] = _isin
+            scope.update(_division_guards(undefined))
+            scope.update((k, columns[k]) for k in self.fields)
+            try:
+                with np.errstate(all="ignore"):
+                    result = eval(self._vector_code, {"__builtins__": {}}, scope)
+                return np.broadcast_to(np.asarray(result, dtype=bool), (n,)) & mask & ~undefined
+            except Exception:
+                pass
+        # Per-row fallback for expressions numpy can't evaluate (mixed types, 'is', ...)
+        # .item() so rows hold Python scalars and division by zero raises as it does for events
+        rows = [{k: _scalar(columns[k][i]) for k in self.fields} for i in range(n)]
+        return np.fromiter((mask[i] and self(rows[i]) for i in range(n)), dtype=bool, count=n)
+
+
+@lru_cache(maxsize=4096)
+def compile_where(expr: str) -> CompiledWhere:
+    """Parse and compile a ``where`` expression; raises UnsafeExpression or SyntaxError."""
+    tree = ast.parse(expr.strip(), mode="eval")
+    qualify = _Qualify()
+    tree = ast.fix_missing_locations(qualify.visit(tree))
+    code = compile(tree, "<where>", "eval")
+    try:
+        vector_tree = ast.fix_missing_locations(_Vectorize().visit(tree))
+        vector_code = compile(vector_tree, "<where:vector>", "eval")
+    except UnsafeExpression:
+        vector_code = None
+    return CompiledWhere(expr=expr, fields=frozenset(qualify.fields), _code=code, _vector_code=vector_code)
+
+
+def try_compile_where(expr: Optional[str]) -> Optional[CompiledWhere]:
+    if not expr:
+        return None
+    try:
+        return compile_where(expr)
+    except (UnsafeExpression, SyntaxError) as e:
+        logger.warning(f"Cannot compile where '{expr}': {e}")
+        return None
+
+
+def columns_for(
+    rows: Sequence[Mapping[str, Any]], fields: Iterable[str]
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """Columnize ``fields`` across ``rows``, with a per-field mask of rows that carry it.
+
+    Numeric columns are float arrays with NaN for gaps; anything else is an
+    object array.
+    """
+    n = len(rows)
+    columns: Dict[str, np.ndarray] = {}
+    present: Dict[str, np.ndarray] = {}
+    for name in fields:
+        values = [r.get(name) for r in rows]
+        present[name] = np.fromiter((v is not None for v in values), dtype=bool, count=n)
+        try:
+            columns[name] = np.array([np.nan if v is None else v for v in values], dtype=float)
+        except (TypeError, ValueError):
+            columns[name] = np.array(values, dtype=object)
+    return columns, present
+
+
+def normalize_source(source: Optional[str]) -> str:
+    return (source or "").strip().upper()
+
+
+@dataclass
+class IndexedRule:
+    id: str
+    rule: Any
+    where: Optional[CompiledWhere]
+
+    @property
+    def stateless(self) -> bool:
+        """True if the compiled predicate alone decides whether the rule fires."""
+        spec = self.rule.spec
+        return self.where is not None and not spec.detector and not spec.hold_for
+
+
+class RuleIndex:
+    """Rules grouped by normalized source topic, with compiled predicates."""
+
+    def __init__(self) -> None:
+        self._by_source: Dict[str, List[IndexedRule]] = {}
+
+    def clear(self) -> None:
+        self._by_source.clear()
+
+    def add(self, rule_id: str, rule: Any) -> IndexedRule:
+        entry = IndexedRule(rule_id, rule, try_compile_where(rule.spec.where))
+        self._by_source.setdefault(normalize_source(rule.spec.source), []).append(entry)
+        return entry
+
+    def for_source(self, source: str) -> List[IndexedRule]:
+        return self._by_source.get(normalize_source(source), [])
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._by_source.values())
@@ -0,0 +1,440 @@
+"""
+Outbound notification dispatcher for alert incidents.
+
+``AlertEngine`` hands each correlated incident to ``Dispatcher.enqueue`` and
+moves on; delivery happens on per-channel background workers:
+
+* every channel has its own bounded queue, worker and concurrency limit, so a
+  slow SMTP server never holds up webhooks (or the next evaluation);
+* a worker drains up to ``max_batch`` deliveries (waiting at most
+  ``flush_interval_s`` after the first), groups them by target, and sends one
+  digest email per recipient list / one bulk POST per webhook URL;
+* failed sends are retried with exponential backoff and full jitter;
+  non-retryable failures (4xx, permanent SMTP errors) stop immediately;
+* every delivery is recorded through ``Repo.record_delivery`` with its final
+  status, attempt count and batch size (one transaction per batch).
+
+Channels without a configured transport fall back to the legacy per-incident
+sink ``send(incident, rule)`` on the same queue/retry machinery.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger("alert_dispatch")
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class DeliveryError(Exception):
+    def __init__(self, message: str, retryable: bool = True, response: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+        self.response = response or {}
+
+
+@dataclass
+class Delivery:
+    incident: Any
+    rule: Any
+    channel: str
+    target: Hashable = None
+    enqueued_at: float = field(default=0.0)
+
+    @property
+    def incident_id(self) -> str:
+        return str(_field(self.incident, "id", ""))
+
+
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    if isinstance(obj, Mapping):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def incident_payload(incident: Any) -> Dict[str, Any]:
+    fn = getattr(incident, "model_dump", None)
+    if callable(fn):
+        return fn(mode="json")
+    data = dict(incident) if isinstance(incident, Mapping) else dict(getattr(incident, "__dict__", {}))
+    return {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in data.items()}
+
+
+def _summary_line(incident: Any) -> str:
+    sev = str(_field(incident, "severity", "info")).upper()
+    return f"[{sev}] {_field(incident, 'title', '')} (sku={_field(incident, 'sku', '?')}, id={_field(incident, 'id', '?')})"
+
+
+# ---------- Transports ----------
+
+class HttpClient:
+    """Shared ``aiohttp`` session for webhook-style channels, created per loop on first use."""
+
+    def __init__(self, timeout_s: float = 10.0, limit: int = 32) -> None:
+        self.timeout_s = timeout_s
+        self.limit = limit
+        self._session = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _ensure_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._loop is loop and not self._session.closed:
+            return self._session
+        import aiohttp
+
+        self._loop = loop
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.limit),
+            timeout=aiohttp.ClientTimeout(total=self.timeout_s),
+        )
+        return self._session
+
+    async def post_json(self, url: str, payload: Any) -> Dict[str, Any]:
+        import aiohttp
+
+        session = await self._ensure_session()
+        try:
+            async with session.post(url, json=payload) as resp:
+                body = (await resp.text())[:500]
+                if resp.status >= 400:
+                    raise DeliveryError(
+                        f"HTTP {resp.status}",
+                        retryable=resp.status in RETRY_STATUSES,
+                        response={"status": resp.status, "body": body},
+                    )
+                return {"status": resp.status, "body": body}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise DeliveryError(f"{type(e).__name__}: {e}") from e
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class WebhookChannel:
+    """One bulk POST of ``{"incidents": [...]}`` per webhook URL."""
+
+    name = "webhook"
+
+    def __init__(self, http: HttpClient, default_url: Optional[str] = None) -> None:
+        self.http = http
+        self.default_url = default_url
+
+    def target(self, incident: Any, rule: Any) -> Optional[str]:
+        notify = getattr(getattr(rule, "spec", None), "notify", None)
+        return getattr(notify, "webhook_url", None) or self.default_url
+
+    async def send_batch(self, target: str, deliveries: Sequence[Delivery]) -> Dict[str, Any]:
+        incidents = [incident_payload(d.incident) for d in deliveries]
+        return await self.http.post_json(target, {"incidents": incidents, "count": len(incidents)})
+
+
+class SlackChannel:
+    """One Slack incoming-webhook message per batch."""
+
+    name = "slack"
+
+    def __init__(self, http: HttpClient, webhook_url: str) -> None:
+        self.http = http
+        self.webhook_url = webhook_url
+
+    def target(self, incident: Any, rule: Any) -> Optional[str]:
+        return self.webhook_url
+
+    async def send_batch(self, target: str, deliveries: Sequence[Delivery]) -> Dict[str, Any]:
+        lines = [_summary_line(d.incident) for d in deliveries]
+        header = f"{len(lines)} alert incidents" if len(lines) > 1 else "Alert incident"
+        return await self.http.post_json(target, {"text": f"*{header}*\n" + "\n".join(lines)})
+
+
+class EmailChannel:
+    """One digest email per recipient list over ``aiosmtplib``."""
+
+    name = "email"
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        sender: str = "alerts@localhost",
+        default_to: Sequence[str] = (),
+        start_tls: Optional[bool] = None,
+        timeout_s: float = 15.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.default_to = tuple(default_to)
+        self.start_tls = start_tls
+        self.timeout_s = timeout_s
+
+    def target(self, incident: Any, rule: Any) -> Optional[Tuple[str, ...]]:
+        notify = getattr(getattr(rule, "spec", None), "notify", None)
+        to = tuple(sorted(getattr(notify, "email_to", None) or self.default_to))
+        return to or None
+
+    def build_message(self, to: Sequence[str], deliveries: Sequence[Delivery]) -> EmailMessage:
+        msg = EmailMessage()
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(to)
+        if len(deliveries) == 1:
+            msg["Subject"] = _summary_line(deliveries[0].incident)
+        else:
+            msg["Subject"] = f"[Alerts] {len(deliveries)} incidents"
+        body = [_summary_line(d.incident) for d in deliveries]
+        msg.set_content("\n".join(body) + "\n")
+        return msg
+
+    async def send_batch(self, target: Tuple[str, ...], deliveries: Sequence[Delivery]) -> Dict[str, Any]:
+        import aiosmtplib
+
+        msg = self.build_message(target, deliveries)
+        try:
+            errors, response = await aiosmtplib.send(
+                msg,
+                hostname=self.host,
+                port=self.port,
+                username=self.username,
+                password=self.password,
+                start_tls=self.start_tls,
+                timeout=self.timeout_s,
+            )
+        except aiosmtplib.SMTPResponseException as e:
+            raise DeliveryError(f"SMTP {e.code}: {e.message}", retryable=e.code < 500) from e
+        except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+            raise DeliveryError(f"{type(e).__name__}: {e}") from e
+        return {"response": response, "refused": {k: str(v) for k, v in (errors or {}).items()}}
+
+
+class SinkChannel:
+    """Adapter for legacy sinks exposing ``send(incident, rule)``; sends one incident at a time."""
+
+    def __init__(self, name: str, sink: Any) -> None:
+        self.name = name
+        self.sink = sink
+
+    def target(self, incident: Any, rule: Any) -> Optional[str]:
+        return self.name
+
+    async def send_batch(self, target: str, deliveries: Sequence[Delivery]) -> Dict[str, Any]:
+        for d in deliveries:
+            await self.sink.send(d.incident, d.rule)
+        return {"sent": len(deliveries)}
+
+
+# ---------- Dispatcher ----------
+
+class Dispatcher:
+    def __init__(
+        self,
+        repo: Any,
+        channels: Dict[str, Any],
+        max_batch: int = 50,
+        flush_interval_s: float = 1.0,
+        max_attempts: int = 4,
+        backoff_s: float = 0.5,
+        max_backoff_s: float = 30.0,
+        concurrency: int = 4,
+        queue_size: int = 10000,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        http: Optional[HttpClient] = None,
+    ) -> None:
+        self.repo = repo
+        self.channels = channels
+        self.max_batch = max_batch
+        self.flush_interval_s = flush_interval_s
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self._sleep = sleep
+        self._http = http
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._sems: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: set = set()
+        self.stats: Dict[str, int] = {
+            "enqueued": 0,
+            "dropped": 0,
+            "no_target": 0,
+            "batches": 0,
+            "sent": 0,
+            "failed": 0,
+            "retries": 0,
+        }
+
+    @classmethod
+    def from_settings(cls, repo: Any, sinks: Mapping[str, Any], settings: Optional[Mapping[str, Any]] = None) -> "Dispatcher":
+        """Build batching transports where channel settings allow, legacy sinks otherwise.
+
+        Settings are read per channel from ``settings[channel][key]`` or the flat
+        ``settings[f"{channel}_{key}"]``.
+        """
+        settings = settings or {}
+
+        def opt(channel: str, key: str, default: Any = None) -> Any:
+            section = settings.get(channel)
+            if isinstance(section, Mapping) and section.get(key) not in (None, ""):
+                return section[key]
+            value = settings.get(f"{channel}_{key}")
+            return default if value in (None, "") else value
+
+        http = HttpClient(timeout_s=float(os.getenv("ALERT_DISPATCH_HTTP_TIMEOUT", "10")))
+        channels: Dict[str, Any] = {name: SinkChannel(name, sink) for name, sink in sinks.items()}
+        channels["webhook"] = WebhookChannel(http, default_url=opt("webhook", "url"))
+        if opt("slack", "webhook_url"):
+            channels["slack"] = SlackChannel(http, opt("slack", "webhook_url"))
+        if opt("email", "smtp_host"):
+            to = opt("email", "to", ())
+            channels["email"] = EmailChannel(
+                host=opt("email", "smtp_host"),
+                port=int(opt("email", "smtp_port", 587)),
+                username=opt("email", "smtp_user"),
+                password=opt("email", "smtp_password"),
+                sender=opt("email", "from", "alerts@localhost"),
+                default_to=[to] if isinstance(to, str) else to,
+                start_tls=opt("email", "starttls"),
+            )
+        return cls(
+            repo,
+            channels,
+            max_batch=int(os.getenv("ALERT_DISPATCH_MAX_BATCH", "50")),
+            flush_interval_s=float(os.getenv("ALERT_DISPATCH_FLUSH_S", "1.0")),
+            max_attempts=int(os.getenv("ALERT_DISPATCH_MAX_ATTEMPTS", "4")),
+            concurrency=int(os.getenv("ALERT_DISPATCH_CONCURRENCY", "4")),
+            http=http,
+        )
+
+    def _queue(self, name: str) -> asyncio.Queue:
+        q = self._queues.get(name)
+        if q is None:
+            q = self._queues[name] = asyncio.Queue(maxsize=self.queue_size)
+            self._sems[name] = asyncio.Semaphore(self.concurrency)
+        worker = self._workers.get(name)
+        if worker is None or worker.done():
+            self._workers[name] = asyncio.get_running_loop().create_task(self._worker(name))
+        return q
+
+    def enqueue(self, incident: Any, rule: Any) -> int:
+        """Queue ``incident`` on each of the rule's channels; never waits on I/O."""
+        queued = 0
+        names = getattr(getattr(getattr(rule, "spec", None), "notify", None), "channels", None) or []
+        loop_time = asyncio.get_running_loop().time()
+        for name in names:
+            channel = self.channels.get(name)
+            if channel is None:
+                continue
+            target = channel.target(incident, rule)
+            if target is None:
+                self.stats["no_target"] += 1
+                continue
+            try:
+                self._queue(name).put_nowait(Delivery(incident, rule, name, target, loop_time))
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                logger.warning(f"Dispatch queue for {name} is full; dropping incident {_field(incident, 'id')}")
+                continue
+            self.stats["enqueued"] += 1
+            queued += 1
+        return queued
+
+    async def _worker(self, name: str) -> None:
+        q = self._queues[name]
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await q.get()]
+            deadline = loop.time() + self.flush_interval_s
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(q.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: Dict[Hashable, List[Delivery]] = {}
+            for d in batch:
+                groups.setdefault(d.target, []).append(d)
+            for target, group in groups.items():
+                await self._sems[name].acquire()
+                task = loop.create_task(self._send_group(name, target, group))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+            for _ in batch:
+                q.task_done()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff_s, self.backoff_s * (2 ** (attempt - 1))))
+
+    async def _send_group(self, name: str, target: Hashable, group: List[Delivery]) -> None:
+        channel = self.channels[name]
+        attempt = 0
+        status = "failed"
+        response: Dict[str, Any] = {}
+        try:
+            while True:
+                attempt += 1
+                try:
+                    response = dict(await channel.send_batch(target, group) or {})
+                    status = "sent"
+                    break
+                except Exception as e:
+                    retryable = e.retryable if isinstance(e, DeliveryError) else True
+                    response = {"error": str(e), **(e.response if isinstance(e, DeliveryError) else {})}
+                    if not retryable or attempt >= self.max_attempts:
+                        logger.warning(f"{name} delivery of {len(group)} incidents failed after {attempt} attempts: {e}")
+                        break
+                    self.stats["retries"] += 1
+                    await self._sleep(self._backoff(attempt))
+        finally:
+            self._sems[name].release()
+
+        self.stats["batches"] += 1
+        self.stats[status] += len(group)
+        await self._record(name, target, group, status, attempt, response)
+
+    async def _record(
+        self, name: str, target: Hashable, group: List[Delivery], status: str, attempts: int, response: Dict[str, Any]
+    ) -> None:
+        record = getattr(self.repo, "record_delivery", None)
+        if record is None:
+            return
+        meta = {**response, "attempts": attempts, "batch_size": len(group), "target": str(target)}
+        transaction = getattr(self.repo, "transaction", None)
+        try:
+            async with (transaction() if transaction is not None else contextlib.AsyncExitStack()):
+                for d in group:
+                    await record(f"dlv_{uuid.uuid4().hex[:12]}", d.incident_id, name, status, meta)
+        except Exception as e:
+            logger.warning(f"Failed to record {name} deliveries: {e}")
+
+    async def flush(self) -> None:
+        """Wait until everything enqueued so far has been sent (or given up on)."""
+        for q in list(self._queues.values()):
+            await q.join()
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    async def close(self) -> None:
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), *self._inflight, return_exceptions=True)
+        self._workers.clear()
+        if self._http is not None:
+            await self._http.close()
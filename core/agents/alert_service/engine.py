@@ -1,18 +1,25 @@
+import asyncio
 import json
 import logging
+import os
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from types import SimpleNamespace
 import aiosqlite
 
 from .repo import Repo
 from .rules import RuleRuntime
+from .compiled import RuleIndex, IndexedRule, columns_for
+from .triage import TriageQueue, proposal_margin
 from .detectors import DetectorRegistry
 from .schemas import Alert
 from .sinks import get_sinks
+from .config import load_runtime_defaults, merge_defaults_db
+from .dispatch import Dispatcher, incident_payload
 from .tools import Tools, get_llm_tools, execute_tool_call
 from core.agents.agent_sdk.protocol import Topic
 from core.agents.agent_sdk.bus_factory import get_bus
+from core.agents.data_collector.owner_cache import get_owner_lookup
 
 bus = get_bus()
 
@@ -34,10 +41,19 @@ class AlertEngine:
         self.repo = repo
         self.detectors = DetectorRegistry()
         self._rules: Dict[str, RuleRuntime] = {}
+        self._index = RuleIndex()
         self.sinks = get_sinks(repo)
+        self.dispatcher = Dispatcher.from_settings(repo, self.sinks)
         self.tools = Tools(repo)
         self.llm = None
         self.logger = logging.getLogger("alert_engine")
+        self.owners = get_owner_lookup()
+        self.triage = TriageQueue(self._triage_batch)
+        # Ticks arriving within the window are evaluated together via evaluate_batch
+        self.tick_batch_window_s = float(os.getenv("ALERT_TICK_BATCH_WINDOW_S", "0.05"))
+        self.tick_batch_size = int(os.getenv("ALERT_TICK_BATCH_SIZE", "256"))
+        self._tick_buffer: List[Any] = []
+        self._tick_flusher: Optional[asyncio.Task] = None
         
         try:
             from core.agents.llm_client import get_llm_client
@@ -52,6 +68,13 @@ class AlertEngine:
     async def start(self):
         await self.repo.init()
         await self._load_rules()
+        preloaded = await self.owners.preload()
+        self.logger.info(f"Preloaded {preloaded} SKU owners")
+        try:
+            settings = merge_defaults_db(load_runtime_defaults(), await self.repo.get_channel_settings())
+            self.dispatcher = Dispatcher.from_settings(self.repo, self.sinks, settings)
+        except Exception as e:
+            self.logger.warning(f"Channel settings unavailable, using per-incident sinks: {e}")
 
         bus.subscribe(Topic.MARKET_TICK.value, self.on_tick)
         bus.subscribe(Topic.PRICE_PROPOSAL.value, self.on_pp)
@@ -69,15 +92,59 @@ class AlertEngine:
 
     async def _load_rules(self):
         self._rules.clear()
+        self._index.clear()
         for rr in await self.repo.list_rules():
             self._rules[rr.id] = RuleRuntime(rr.spec)
+            self._index.add(rr.id, self._rules[rr.id])
 
     async def on_tick(self, tick):
-        await self._evaluate("MARKET_TICK", tick, alias="tick")
+        if self.tick_batch_window_s <= 0:
+            await self._evaluate("MARKET_TICK", tick, alias="tick")
+            return
+        self._tick_buffer.append(tick)
+        if len(self._tick_buffer) >= self.tick_batch_size:
+            await self.flush_ticks()
+        elif self._tick_flusher is None or self._tick_flusher.done():
+            self._tick_flusher = asyncio.get_running_loop().create_task(self._flush_ticks_later())
+
+    async def _flush_ticks_later(self):
+        await asyncio.sleep(self.tick_batch_window_s)
+        await self.flush_ticks()
+
+    async def flush_ticks(self):
+        """Evaluate all buffered ticks in one ``evaluate_batch`` pass."""
+        batch, self._tick_buffer = self._tick_buffer, []
+        if not batch:
+            return
+        try:
+            await self.evaluate_batch("MARKET_TICK", batch, alias="tick")
+        except Exception as e:
+            self.logger.error(f"Evaluating {len(batch)} buffered ticks failed: {e}")
 
     async def on_pp(self, pp):
-        await self._evaluate_with_llm("PRICE_PROPOSAL", pp)
         await self._evaluate("PRICE_PROPOSAL", pp, alias="pp")
+        if self.llm and self.llm.is_available():
+            event = self._to_dict(pp)
+            if event.get("margin") is None:
+                event["margin"] = proposal_margin(event, await self._catalog_cost(event))
+            self.triage.submit(event)
+
+    async def _catalog_cost(self, event: Dict[str, Any]) -> Optional[float]:
+        sku = event.get("sku") or event.get("product_id")
+        if not sku:
+            return None
+        owner_id = await self.owners.get(str(sku))
+        try:
+            async with aiosqlite.connect(self.owners.db_path.as_posix()) as db:
+                cur = await db.execute(
+                    "SELECT cost FROM product_catalog WHERE sku=? AND (? IS NULL OR owner_id=?) LIMIT 1",
+                    (str(sku), owner_id, owner_id),
+                )
+                row = await cur.fetchone()
+        except Exception as e:
+            self.logger.debug(f"Cost lookup for {sku} failed: {e}")
+            return None
+        return row[0] if row else None
 
     @staticmethod
     def _to_dict(obj: Any) -> Dict[str, Any]:
@@ -101,120 +168,157 @@ class AlertEngine:
                 pass
         return getattr(obj, "__dict__", {}) or {}
 
-    async def _evaluate_with_llm(self, source: str, payload: Any):
+    async def _triage_batch(self, events: List[Dict[str, Any]], source: str = "PRICE_PROPOSAL"):
+        """Run one LLM tool-calling session covering a batch of borderline events.
+
+        The LLM call is awaited on this loop, and so are the tool coroutines,
+        so they share the engine's repo connections.
+        """
         if not self.llm or not self.llm.is_available():
             return
 
-        try:
-            payload_dict = self._to_dict(payload)
-            
-            def json_serializer(obj):
-                if isinstance(obj, datetime):
-                    return obj.isoformat()
-                raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-            
-            event_summary = json.dumps(payload_dict, indent=2, default=json_serializer)
-            
-            prompt = f"""A new {source} event has just been published. You need to analyze it and determine if an alert should be created.
-
-Event Data:
+        def json_serializer(obj):
+            if isinstance(obj, datetime):
+                return obj.isoformat()
+            raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+        event_summary = json.dumps(events, indent=2, default=json_serializer)
+
+        prompt = f"""{len(events)} new {source} event(s) have been published. Analyze each one and determine whether it needs an alert.
+
+Events:
 ```json
 {event_summary}
 ```
 
-Based on your analysis, determine if this event represents an anomaly that requires an alert. Remember:
+Based on your analysis, determine which events represent anomalies that require an alert. Remember:
 - Margins below 5% are concerning
 - Margins below 3% are CRITICAL
 - You should err on the side of creating alerts
+- Create at most one alert per SKU and include the SKU in the alert details
 
 Use your tools to investigate and take action."""
 
-            messages = [
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
-            ]
-            
-            tools_schema = get_llm_tools()
-            
-            
-            async def create_alert_async(name: str, description: str, severity: str, details: dict):
-                return await execute_tool_call("create_alert", {
-                    "name": name, "description": description, 
-                    "severity": severity, "details": details
-                }, self.tools)
-            
-            async def list_alerts_async(status: str = None):
-                return await execute_tool_call("list_alerts", {"status": status}, self.tools)
-            
-            async def list_rules_async():
-                return await execute_tool_call("list_rules", {}, self.tools)
-            
-            functions_map = {
-                "create_alert": create_alert_async,
-                "list_alerts": list_alerts_async,
-                "list_rules": list_rules_async
-            }
-            
-            try:
-                result = self.llm.chat_with_tools(
-                    messages=messages, 
-                    tools=tools_schema,
-                    functions_map=functions_map,
-                    max_rounds=3,
-                    max_tokens=1000
-                )
-                
-                self.logger.info(f"LLM response: {result}")
-                    
-            except Exception as e:
-                self.logger.error(f"LLM tool call failed: {e}")
-                
-        except Exception as e:
-            self.logger.error(f"LLM evaluation failed: {e}")
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+        async def create_alert(name: str, description: str, severity: str, details: dict):
+            return await execute_tool_call("create_alert", {
+                "name": name, "description": description,
+                "severity": severity, "details": details
+            }, self.tools)
+
+        async def list_alerts(status: str = None):
+            return await execute_tool_call("list_alerts", {"status": status}, self.tools)
+
+        async def list_rules():
+            return await execute_tool_call("list_rules", {}, self.tools)
+
+        functions_map = {
+            "create_alert": create_alert,
+            "list_alerts": list_alerts,
+            "list_rules": list_rules
+        }
+
+        result = await self.llm.achat_with_tools(
+            messages=messages,
+            tools=get_llm_tools(),
+            functions_map=functions_map,
+            max_rounds=3,
+            max_tokens=1000 + 200 * len(events),
+        )
+        self.logger.info(f"LLM triage of {len(events)} events: {result}")
+
+    @classmethod
+    def _fields(cls, payload: Any) -> Dict[str, Any]:
+        return payload if isinstance(payload, dict) else cls._to_dict(payload)
 
     async def _evaluate(self, source: str, payload: Any, alias: str):
         now = datetime.now(timezone.utc)
-        for rid, rule in self._rules.items():
-            if (rule.spec.source or "").strip().upper() != source.strip().upper():
-                continue
-            fired = await rule.evaluate(payload, now, self.detectors, alias=alias)
-            if not fired:
-                continue
+        fields = None
+        fired: List[Tuple[IndexedRule, Any]] = []
+        for entry in self._index.for_source(source):
+            if entry.stateless:
+                if fields is None:
+                    fields = self._fields(payload)
+                hit = entry.where(fields)
+            else:
+                hit = await entry.rule.evaluate(payload, now, self.detectors, alias=alias)
+            if hit:
+                fired.append((entry, payload))
+        await self._fire(fired, now)
+
+    async def evaluate_batch(self, source: str, payloads: Sequence[Any], alias: str = "tick"):
+        """Evaluate a batch of events; stateless where-rules run vectorized over field columns."""
+        if not payloads:
+            return
+        now = datetime.now(timezone.utc)
+        entries = self._index.for_source(source)
+        stateless = [e for e in entries if e.stateless]
+        # Rule position -> boolean hit mask over the batch
+        masks: Dict[int, Any] = {}
+        if stateless:
+            rows = [self._fields(p) for p in payloads]
+            columns, present = columns_for(rows, set().union(*(e.where.fields for e in stateless)))
+            for pos, entry in enumerate(entries):
+                if entry.stateless:
+                    masks[pos] = entry.where.evaluate_columns(columns, present, len(rows))
+        fired: List[Tuple[IndexedRule, Any]] = []
+        for i, payload in enumerate(payloads):
+            for pos, entry in enumerate(entries):
+                if entry.stateless:
+                    hit = bool(masks[pos][i])
+                else:
+                    hit = await entry.rule.evaluate(payload, now, self.detectors, alias=alias)
+                if hit:
+                    fired.append((entry, payload))
+        await self._fire(fired, now)
 
+    async def _fire(self, fired: List[Tuple[IndexedRule, Any]], now: datetime):
+        """Correlate everything fired in one pass in a single transaction, then deliver."""
+        if not fired:
+            return
+        alerts = []
+        for entry, payload in fired:
             sku = getattr(payload, "sku", "UNKNOWN")
-            payload_dict = self._to_dict(payload)
-            
             owner_id = await self._get_owner_id_for_sku(sku)
-
-            alert = Alert(
+            alerts.append(Alert(
                 id=f"a_{int(now.timestamp()*1000)}",
-                rule_id=rid,
+                rule_id=entry.id,
                 sku=sku,
-                title=f"{rid} on {sku}",
-                payload=payload_dict,
-                severity=rule.spec.severity,
+                title=f"{entry.id} on {sku}",
+                payload=self._to_dict(payload),
+                severity=entry.rule.spec.severity,
                 ts=now,
-                fingerprint=f"{rid}:{sku}",
+                fingerprint=f"{entry.id}:{sku}",
                 owner_id=owner_id,
-            )
+            ))
+
+        incidents = []
+        async with self.repo.transaction():
+            for (entry, _), alert in zip(fired, alerts):
+                inc = await self._correlate(alert, entry.rule)
+                if inc:
+                    incidents.append((inc, entry.rule, alert))
 
-            inc = await self._correlate(alert, rule)
-            if not inc:
-                continue
+        for inc, rule, alert in incidents:
+            await self._publish_incident(inc, alert)
             await self._deliver(inc, rule)
-    
-    async def _get_owner_id_for_sku(self, sku: str) -> Optional[str]:
+
+    async def _publish_incident(self, incident, alert) -> None:
+        """Announce the incident on alert.event so incident streams see new incidents too."""
+        payload = incident_payload(incident)
+        if payload.get("owner_id") is None:
+            payload["owner_id"] = alert.owner_id
         try:
-            async with aiosqlite.connect("app/data.db") as db:
-                cur = await db.execute(
-                    "SELECT owner_id FROM product_catalog WHERE sku=? LIMIT 1",
-                    (sku,),
-                )
-                row = await cur.fetchone()
-                return str(row[0]) if row else None
+            await bus.publish(Topic.ALERT.value, payload)
         except Exception as e:
-            self.logger.warning(f"Failed to fetch owner_id for SKU {sku}: {e}")
-            return None
+            self.logger.warning(f"Failed to publish incident {payload.get('id')}: {e}")
+    
+    async def _get_owner_id_for_sku(self, sku: str) -> Optional[str]:
+        return await self.owners.get(sku)
 
     async def _correlate(self, alert, rule):
         from .correlate import Correlator
@@ -226,9 +330,4 @@ Use your tools to investigate and take action."""
             return None
 
     async def _deliver(self, incident, rule):
-        channels = getattr(rule.spec.notify, "channels", None) or []
-        for ch in channels:
-            sink = self.sinks.get(ch)
-            if not sink:
-                continue
-            await sink.send(incident, rule)
+        self.dispatcher.enqueue(incident, rule)
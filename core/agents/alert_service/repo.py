@@ -1,16 +1,126 @@
 # core/agents/alert_service/repo.py
 
-import aiosqlite, json
+import aiosqlite, asyncio, json, logging, os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
+from core.agents.data_collector.repo import decode_cursor, encode_cursor
 from .schemas import RuleSpec, RuleRecord, Alert, Incident
+from .throttle import ThrottleWindow, parse_duration, to_epoch
+
+logger = logging.getLogger("alert_repo")
+
+
+class _ConnectionPool:
+    """Small LIFO pool of long-lived aiosqlite connections.
+
+    Reusing connections keeps sqlite's per-connection statement cache warm, so
+    the fixed SQL strings below are prepared once per connection rather than on
+    every call.
+    """
+
+    def __init__(self, path: str, size: int) -> None:
+        self.path = path
+        self.size = size
+        self._idle: List[aiosqlite.Connection] = []
+        self._sem = asyncio.Semaphore(size)
+
+    async def _open(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.path, cached_statements=256)
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("PRAGMA synchronous=NORMAL")
+        await db.execute("PRAGMA busy_timeout=5000")
+        return db
+
+    async def acquire(self) -> aiosqlite.Connection:
+        await self._sem.acquire()
+        try:
+            return self._idle.pop() if self._idle else await self._open()
+        except BaseException:
+            self._sem.release()
+            raise
+
+    async def release(self, db: aiosqlite.Connection, reusable: bool = True) -> None:
+        try:
+            if reusable:
+                self._idle.append(db)
+            else:
+                await db.close()
+        finally:
+            self._sem.release()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for db in idle:
+            await db.close()
+
 
 class Repo:
-    def __init__(self, path: str = "app/alert.db") -> None:
+    def __init__(self, path: str = "app/alert.db", pool_size: Optional[int] = None) -> None:
         self.path = path
+        self.pool_size = pool_size or int(os.getenv("ALERT_DB_POOL_SIZE", "4"))
+        self._pool: Optional[_ConnectionPool] = None
+        self._tx: ContextVar[Optional[aiosqlite.Connection]] = ContextVar(f"alert_repo_tx_{id(self)}", default=None)
+        self.throttle = ThrottleWindow(
+            horizon_s=float(os.getenv("ALERT_THROTTLE_HORIZON_S", "86400")),
+            flush_batch=int(os.getenv("ALERT_TOUCH_FLUSH_BATCH", "64")),
+            flush_interval_s=float(os.getenv("ALERT_TOUCH_FLUSH_INTERVAL_S", "1.0")),
+        )
+        self._flusher: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def _db(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Pooled connection; commits on exit unless running inside ``transaction()``."""
+        tx = self._tx.get()
+        if tx is not None:
+            yield tx
+            return
+        if self._pool is None:
+            self._pool = _ConnectionPool(self.path, self.pool_size)
+        db = await self._pool.acquire()
+        reusable = True
+        try:
+            yield db
+            await db.commit()
+        except BaseException:
+            try:
+                await db.rollback()
+            except Exception:
+                reusable = False
+            raise
+        finally:
+            await self._pool.release(db, reusable)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Run every repo call in this context on one connection and commit once at the end."""
+        if self._tx.get() is not None:
+            yield
+            return
+        async with self._db() as db:
+            token = self._tx.set(db)
+            try:
+                yield
+                await self.flush_touches()
+            finally:
+                self._tx.reset(token)
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush_touches()
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
 
     async def init(self) -> None:
-        async with aiosqlite.connect(self.path) as db:
+        async with self._db() as db:
             await db.executescript("""
             CREATE TABLE IF NOT EXISTS rules (
               id TEXT PRIMARY KEY,
@@ -43,12 +153,65 @@ class Repo:
               key TEXT PRIMARY KEY,
               value TEXT
             );
+            CREATE INDEX IF NOT EXISTS ix_incidents_owner_status_last_seen
+              ON incidents(owner_id, status, last_seen DESC);
+            CREATE INDEX IF NOT EXISTS ix_incidents_status_last_seen
+              ON incidents(status, last_seen DESC);
+            CREATE INDEX IF NOT EXISTS ix_incidents_last_seen
+              ON incidents(last_seen DESC);
+            CREATE INDEX IF NOT EXISTS ix_deliveries_incident
+              ON deliveries(incident_id, ts);
             """)
-            await db.commit()
+        await self.warm_throttle()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_touches_periodically())
+
+    async def _flush_touches_periodically(self) -> None:
+        """Write back buffered touches even when no further touch arrives to trigger it."""
+        while True:
+            await asyncio.sleep(self.throttle.flush_interval_s)
+            if self.throttle.should_flush():
+                await self.flush_touches()
+
+    async def warm_throttle(self) -> int:
+        """Load fingerprints seen within the throttle horizon into memory."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.throttle.horizon_s)
+        async with self._db() as db:
+            cur = await db.execute(
+                "SELECT fingerprint, last_seen FROM incidents WHERE last_seen >= ?",
+                (cutoff.isoformat(),),
+            )
+            rows = await cur.fetchall()
+        for fingerprint, last_seen in rows:
+            if fingerprint and last_seen:
+                self.throttle.record(fingerprint, to_epoch(last_seen))
+        self.throttle.warm = True
+        return len(rows)
+
+    async def flush_touches(self) -> int:
+        """Write buffered last_seen bumps back to ``incidents`` in one batch."""
+        updates = self.throttle.drain()
+        if not updates:
+            return 0
+        try:
+            async with self._db() as db:
+                # A newer last_seen written since the touch (new alert, status change) wins;
+                # last_seen is always a UTC isoformat() string, so it compares as text
+                await db.executemany(
+                    "UPDATE incidents SET last_seen=? WHERE fingerprint=? "
+                    "AND (last_seen IS NULL OR last_seen < ?)",
+                    [(ts_iso, fingerprint, ts_iso) for ts_iso, fingerprint in updates],
+                )
+        except Exception as e:
+            logger.warning(f"Failed to flush {len(updates)} incident touches: {e}")
+            for ts_iso, fingerprint in updates:
+                self.throttle.touch(fingerprint, ts_iso)
+            return 0
+        return len(updates)
 
     # ---------- Rules ----------
     async def list_rules(self) -> List[RuleRecord]:
-        async with aiosqlite.connect(self.path) as db:
+        async with self._db() as db:
             cur = await db.execute("SELECT id, version, spec_json FROM rules WHERE enabled=1")
             rows = await cur.fetchall()
             return [
@@ -57,7 +220,7 @@ class Repo:
             ]
 
     async def upsert_rule(self, spec: RuleSpec) -> None:
-        async with aiosqlite.connect(self.path) as db:
+        async with self._db() as db:
             v = 1
             # If RuleSpec is a pydantic/dataclass, adjust serializer as needed
             spec_json = json.dumps((getattr(spec, "model_dump", None) or getattr(spec, "dict", None) or (lambda: spec.__dict__))())
@@ -65,25 +228,24 @@ class Repo:
                 "INSERT OR REPLACE INTO rules (id, version, spec_json, enabled) VALUES (?,?,?,?)",
                 (spec.id, v, spec_json, 1 if getattr(spec, "enabled", True) else 0),
             )
-            await db.commit()
 
 
     # ---------- Incidents ----------
     async def find_or_create_incident(self, alert: Alert) -> Incident:
         """Correlate by fingerprint, update last_seen or create new incident."""
-        async with aiosqlite.connect(self.path) as db:
+        async with self._db() as db:
             cur = await db.execute(
                 "SELECT id, status, first_seen, last_seen, owner_id FROM incidents WHERE fingerprint=?",
                 (alert.fingerprint,),
             )
             row = await cur.fetchone()
             ts_iso = alert.ts.isoformat()
+            self.throttle.record(alert.fingerprint, alert.ts.timestamp())
             if row:
                 await db.execute(
                     "UPDATE incidents SET last_seen=?, severity=?, title=? WHERE id=?",
                     (ts_iso, alert.severity, alert.title, row[0]),
                 )
-                await db.commit()
                 return Incident(
                     id=row[0],
                     rule_id=alert.rule_id,
@@ -97,17 +259,22 @@ class Repo:
                     owner_id=row[4],
                 )
 
-            inc_id = f"inc_{int(alert.ts.timestamp()*1000)}"
-            await db.execute(
-                """
-                INSERT INTO incidents
-                  (id, rule_id, sku, status, first_seen, last_seen, severity, title, group_key, fingerprint, owner_id)
-                VALUES (?,?,?,?,?,?,?,?,?,?,?)
-                """,
-                (inc_id, alert.rule_id, alert.sku, "OPEN", ts_iso, ts_iso,
-                 alert.severity, alert.title, alert.sku, alert.fingerprint, alert.owner_id),
-            )
-            await db.commit()
+            # Alerts fired in the same pass share a timestamp; suffix the id on collision
+            base_id = inc_id = f"inc_{int(alert.ts.timestamp()*1000)}"
+            for n in range(1, 1000):
+                cur = await db.execute(
+                    """
+                    INSERT INTO incidents
+                      (id, rule_id, sku, status, first_seen, last_seen, severity, title, group_key, fingerprint, owner_id)
+                    VALUES (?,?,?,?,?,?,?,?,?,?,?)
+                    ON CONFLICT(id) DO NOTHING
+                    """,
+                    (inc_id, alert.rule_id, alert.sku, "OPEN", ts_iso, ts_iso,
+                     alert.severity, alert.title, alert.sku, alert.fingerprint, alert.owner_id),
+                )
+                if cur.rowcount:
+                    break
+                inc_id = f"{base_id}_{n}"
             return Incident(
                 id=inc_id,
                 rule_id=alert.rule_id,
@@ -121,12 +288,17 @@ class Repo:
                 owner_id=alert.owner_id,
             )
 
+    async def upsert_incidents(self, alerts: List[Alert]) -> List[Incident]:
+        """Correlate a batch of alerts in a single transaction."""
+        async with self.transaction():
+            return [await self.find_or_create_incident(a) for a in alerts]
+
     async def is_throttled(self, fingerprint: str, dur: str) -> bool:
         """Return True if an incident with this fingerprint was seen within duration (e.g., '5m','1h','30s')."""
-        unit = dur[-1]
-        n = int(dur[:-1])
-        delta = {"m": timedelta(minutes=n), "h": timedelta(hours=n), "s": timedelta(seconds=n)}[unit]
-        async with aiosqlite.connect(self.path) as db:
+        delta = parse_duration(dur)
+        if self.throttle.covers(delta):
+            return self.throttle.is_throttled(fingerprint, delta)
+        async with self._db() as db:
             cur = await db.execute("SELECT last_seen FROM incidents WHERE fingerprint=?", (fingerprint,))
             row = await cur.fetchone()
             if not row:
@@ -138,72 +310,152 @@ class Repo:
                 last = last.replace(tzinfo=timezone.utc)
             return (now - last) < delta
 
-    async def list_incidents(self, status: Optional[str], owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _incident_filters(
+        status: Optional[str],
+        owner_id: Optional[str],
+        severity: Optional[str] = None,
+        rule_id: Optional[str] = None,
+        sku: Optional[str] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        conditions: List[str] = []
+        args: List[Any] = []
+        for column, value in (("status", status), ("owner_id", owner_id), ("severity", severity),
+                              ("rule_id", rule_id), ("sku", sku)):
+            if value:
+                conditions.append(f"{column}=?")
+                args.append(value)
+        return conditions, args
+
+    @staticmethod
+    def _incident_row(r) -> Dict[str, Any]:
+        return dict(
+            id=r[0],
+            rule_id=r[1],
+            sku=r[2],
+            status=r[3],
+            first_seen=r[4],
+            last_seen=r[5],
+            severity=r[6],
+            title=r[7],
+        )
+
+    async def list_incidents(
+        self,
+        status: Optional[str],
+        owner_id: Optional[str] = None,
+        severity: Optional[str] = None,
+        rule_id: Optional[str] = None,
+        sku: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         q = """
         SELECT id, rule_id, sku, status, first_seen, last_seen, severity, title
         FROM incidents
         """
-        args: list[Any] = []
-        conditions = []
-        
-        if status:
-            conditions.append("status=?")
-            args.append(status)
-        
-        if owner_id:
-            conditions.append("owner_id=?")
-            args.append(owner_id)
-        
+        conditions, args = self._incident_filters(status, owner_id, severity, rule_id, sku)
         if conditions:
             q += " WHERE " + " AND ".join(conditions)
         
         q += " ORDER BY last_seen DESC"
 
-        async with aiosqlite.connect(self.path) as db:
+        await self.flush_touches()
+        async with self._db() as db:
             cur = await db.execute(q, args)
             rows = await cur.fetchall()
-            return [
-                dict(
-                    id=r[0],
-                    rule_id=r[1],
-                    sku=r[2],
-                    status=r[3],
-                    first_seen=r[4],
-                    last_seen=r[5],
-                    severity=r[6],
-                    title=r[7],
-                )
-                for r in rows
-            ]
+            return [self._incident_row(r) for r in rows]
+
+    async def list_incidents_page(
+        self,
+        status: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        severity: Optional[str] = None,
+        rule_id: Optional[str] = None,
+        sku: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return one page of incidents, most recently seen first.
+
+        Pages are keyed on (last_seen, id); returns ``(rows, next_cursor)`` with
+        ``next_cursor`` None on the last page. Raises ValueError for a bad cursor.
+        """
+        limit = max(1, int(limit))
+        conditions, args = self._incident_filters(status, owner_id, severity, rule_id, sku)
+        if cursor:
+            after_last_seen, after_id = decode_cursor(cursor)
+            conditions.append("(last_seen < ? OR (last_seen = ? AND id < ?))")
+            args.extend([after_last_seen, after_last_seen, after_id])
+        q = """
+        SELECT id, rule_id, sku, status, first_seen, last_seen, severity, title
+        FROM incidents
+        """
+        if conditions:
+            q += " WHERE " + " AND ".join(conditions)
+        q += " ORDER BY last_seen DESC, id DESC LIMIT ?"
+        args.append(limit + 1)
+
+        await self.flush_touches()
+        async with self._db() as db:
+            cur = await db.execute(q, args)
+            rows = [self._incident_row(r) for r in await cur.fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["last_seen"], rows[-1]["id"])
+        return rows, next_cursor
+
+    async def get_incident(self, inc_id: str) -> Optional[Dict[str, Any]]:
+        await self.flush_touches()
+        async with self._db() as db:
+            cur = await db.execute(
+                "SELECT id, rule_id, sku, status, first_seen, last_seen, severity, title, owner_id "
+                "FROM incidents WHERE id=?",
+                (inc_id,),
+            )
+            r = await cur.fetchone()
+        if not r:
+            return None
+        return {**self._incident_row(r), "owner_id": r[8]}
 
     async def set_status(self, inc_id: str, status: str, owner_id: Optional[str] = None) -> None:
-        async with aiosqlite.connect(self.path) as db:
+        await self.flush_touches()
+        async with self._db() as db:
             if owner_id:
                 cur = await db.execute("SELECT owner_id FROM incidents WHERE id=?", (inc_id,))
                 row = await cur.fetchone()
                 if not row or str(row[0]) != str(owner_id):
                     raise ValueError("Incident not found or access denied")
             
-            await db.execute(
-                "UPDATE incidents SET status=?, last_seen=? WHERE id=?",
-                (status, datetime.now(timezone.utc).isoformat(), inc_id),
+            now = datetime.now(timezone.utc)
+            cur = await db.execute(
+                "UPDATE incidents SET status=?, last_seen=? WHERE id=? RETURNING fingerprint",
+                (status, now.isoformat(), inc_id),
             )
-            await db.commit()
+            row = await cur.fetchone()
+            if row and row[0]:
+                self.throttle.record(row[0], now.timestamp())
 
     async def touch_incident(self, fingerprint: str) -> None:
-        """Update last_seen for a throttled incident by fingerprint."""
-        async with aiosqlite.connect(self.path) as db:
-            await db.execute(
-                "UPDATE incidents SET last_seen=? WHERE fingerprint=?",
-                (datetime.now(timezone.utc).isoformat(), fingerprint),
-            )
-            await db.commit()
+        """Update last_seen for a throttled incident by fingerprint.
+
+        Once the throttle window is warm the bump is buffered and written back
+        in batches (see ``flush_touches``).
+        """
+        ts_iso = datetime.now(timezone.utc).isoformat()
+        if self.throttle.warm:
+            self.throttle.touch(fingerprint, ts_iso)
+            if self.throttle.should_flush() and self._tx.get() is None:
+                await self.flush_touches()
+            return
+        async with self._db() as db:
+            await db.execute("UPDATE incidents SET last_seen=? WHERE fingerprint=?", (ts_iso, fingerprint))
 
 
     # ---------- Deliveries (optional helpers) ----------
     async def record_delivery(self, delivery_id: str, incident_id: str, channel: str,
                               status: str, response_json: Dict[str, Any] | None = None) -> None:
-        async with aiosqlite.connect(self.path) as db:
+        async with self._db() as db:
             await db.execute(
                 "INSERT OR REPLACE INTO deliveries (id, incident_id, channel, ts, status, response_json) "
                 "VALUES (?,?,?,?,?,?)",
@@ -216,7 +468,6 @@ class Repo:
                     json.dumps(response_json or {}),
                 ),
             )
-            await db.commit()
 
     # ---------- Channel settings ----------
     async def get_channel_settings(self) -> Optional[dict]:
@@ -224,17 +475,16 @@ class Repo:
         Returns a dict of channel overrides persisted by the UI, or None if not set.
         This gets merged over secrets/env by merge_defaults_db().
         """
-        async with aiosqlite.connect(self.path) as db:
+        async with self._db() as db:
             cur = await db.execute("SELECT value FROM settings WHERE key='channels'")
             row = await cur.fetchone()
             return json.loads(row[0]) if row else None
 
     async def save_channel_settings(self, cfg: dict) -> None:
-        async with aiosqlite.connect(self.path) as db:
+        async with self._db() as db:
             val = json.dumps(cfg)
             # upsert by primary key
             await db.execute(
                 "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
                 ("channels", val),
             )
-            await db.commit()
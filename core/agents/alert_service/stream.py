@@ -0,0 +1,78 @@
+"""
+Per-owner fan-out of incident updates from the ``alert.event`` topic.
+
+One bus subscription feeds every connected SSE client. Each listener gets a
+bounded queue of incident dicts for its owner (plus unowned incidents); when a
+slow client falls behind, its oldest pending updates are dropped rather than
+buffered without limit. Non-incident messages on the topic (e.g. the engine's
+"ready" notice) are ignored.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+from core.agents.agent_sdk.bus_factory import get_bus
+from core.agents.agent_sdk.protocol import Topic
+
+from .dispatch import incident_payload
+
+logger = logging.getLogger("alert_stream")
+
+
+class IncidentStream:
+    def __init__(self, max_queue: int = 256) -> None:
+        self.max_queue = max_queue
+        self._listeners: Set[Tuple[Optional[str], asyncio.Queue]] = set()
+        self._subscribed = False
+
+    def subscribe_bus(self) -> None:
+        if not self._subscribed:
+            get_bus().subscribe(Topic.ALERT.value, self.publish)
+            self._subscribed = True
+
+    def publish(self, message: Any) -> int:
+        """Push an incident update to every matching listener; returns how many received it."""
+        try:
+            incident = incident_payload(message)
+        except Exception:
+            return 0
+        if not incident.get("id"):
+            return 0
+        owner = incident.get("owner_id")
+        owner = str(owner) if owner is not None else None
+        delivered = 0
+        for listener_owner, queue in list(self._listeners):
+            if owner is not None and listener_owner is not None and owner != listener_owner:
+                continue
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(incident)
+            delivered += 1
+        return delivered
+
+    def listener_count(self) -> int:
+        return len(self._listeners)
+
+    @asynccontextmanager
+    async def listen(self, owner_id: Optional[str]) -> AsyncIterator[asyncio.Queue]:
+        """Queue of incident dicts for ``owner_id`` (all owners if None) until the context exits."""
+        self.subscribe_bus()
+        entry = (str(owner_id) if owner_id is not None else None, asyncio.Queue(maxsize=self.max_queue))
+        self._listeners.add(entry)
+        try:
+            yield entry[1]
+        finally:
+            self._listeners.discard(entry)
+
+
+_stream: Optional[IncidentStream] = None
+
+
+def get_incident_stream() -> IncidentStream:
+    global _stream
+    if _stream is None:
+        _stream = IncidentStream()
+    return _stream
@@ -0,0 +1,103 @@
+"""
+In-memory throttle window for alert correlation.
+
+Maps incident fingerprint -> last_seen (epoch seconds) for every incident seen
+within ``horizon_s``. A min-heap of (last_seen, fingerprint) lets expired
+entries be dropped lazily without scanning the map. ``Repo`` warms the window
+from ``incidents`` at startup and keeps it current on every write, so throttle
+checks for a noisy fingerprint never touch SQLite; ``last_seen`` bumps for
+throttled alerts are buffered here and written back in batches.
+"""
+from __future__ import annotations
+
+import heapq
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@lru_cache(maxsize=256)
+def parse_duration(dur: str) -> timedelta:
+    """Parse throttle strings like '30s', '15m', '1h', '2d'."""
+    dur = dur.strip()
+    return timedelta(seconds=int(dur[:-1]) * _UNITS[dur[-1]])
+
+
+def to_epoch(ts: str) -> float:
+    dt = datetime.fromisoformat(ts)
+    # Normalize naive timestamps to UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class ThrottleWindow:
+    def __init__(
+        self,
+        horizon_s: float = 86400,
+        flush_batch: int = 64,
+        flush_interval_s: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.horizon_s = float(horizon_s)
+        self.flush_batch = flush_batch
+        self.flush_interval_s = flush_interval_s
+        self.warm = False
+        self._clock = clock
+        self._last_seen: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._pending: Dict[str, str] = {}
+        self._last_flush = clock()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.horizon_s
+        while self._heap and self._heap[0][0] < cutoff:
+            ts, fp = heapq.heappop(self._heap)
+            if self._last_seen.get(fp) == ts:
+                del self._last_seen[fp]
+
+    def record(self, fingerprint: str, ts: float) -> None:
+        if ts < self._last_seen.get(fingerprint, float("-inf")):
+            return
+        self._last_seen[fingerprint] = ts
+        heapq.heappush(self._heap, (ts, fingerprint))
+        # Superseded heap entries are skipped on pop; rebuild if they pile up
+        if len(self._heap) > 4 * len(self._last_seen) + 1024:
+            self._heap = [(t, f) for f, t in self._last_seen.items()]
+            heapq.heapify(self._heap)
+
+    def covers(self, delta: timedelta) -> bool:
+        """True if the window can answer a throttle check of this length on its own."""
+        return self.warm and delta.total_seconds() <= self.horizon_s
+
+    def is_throttled(self, fingerprint: str, delta: timedelta) -> bool:
+        now = self._clock()
+        self._expire(now)
+        last = self._last_seen.get(fingerprint)
+        return last is not None and (now - last) < delta.total_seconds()
+
+    def last_seen(self, fingerprint: str) -> Optional[float]:
+        return self._last_seen.get(fingerprint)
+
+    def touch(self, fingerprint: str, ts_iso: str) -> None:
+        """Record a last_seen bump to be written back on the next flush."""
+        self.record(fingerprint, to_epoch(ts_iso))
+        self._pending[fingerprint] = ts_iso
+
+    def should_flush(self) -> bool:
+        return bool(self._pending) and (
+            len(self._pending) >= self.flush_batch
+            or self._clock() - self._last_flush >= self.flush_interval_s
+        )
+
+    def drain(self) -> List[Tuple[str, str]]:
+        """Pending (last_seen, fingerprint) updates, clearing the buffer."""
+        pending, self._pending = self._pending, {}
+        self._last_flush = self._clock()
+        return [(ts, fp) for fp, ts in pending.items()]
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
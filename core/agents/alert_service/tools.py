@@ -4,22 +4,12 @@ from .repo import Repo
 from .schemas import RuleSpec, Alert
 from pydantic import ValidationError
 import logging
-import aiosqlite
+from core.agents.data_collector.owner_cache import get_owner_lookup
 
 logger = logging.getLogger("alert_tools")
 
 async def _get_owner_id_for_sku(sku: str) -> Optional[str]:
-    try:
-        async with aiosqlite.connect("app/data.db") as db:
-            cur = await db.execute(
-                "SELECT owner_id FROM product_catalog WHERE sku=? LIMIT 1",
-                (sku,),
-            )
-            row = await cur.fetchone()
-            return str(row[0]) if row else None
-    except Exception as e:
-        logger.warning(f"Failed to fetch owner_id for SKU {sku}: {e}")
-        return None
+    return await get_owner_lookup().get(sku)
 
 class Tools:
     def __init__(self, repo: Repo): self.repo = repo
@@ -51,12 +41,7 @@ class Tools:
     async def list_alerts(self, status: str = None, rule_id: str = None, limit: int = 100):
         """List alerts with filtering - maps to incidents table."""
         try:
-            incidents = await self.repo.list_incidents(status)
-            
-            if rule_id:
-                incidents = [inc for inc in incidents if inc.get("rule_id") == rule_id]
-            
-            incidents = incidents[:limit]
+            incidents, _ = await self.repo.list_incidents_page(status, limit=limit, rule_id=rule_id)
             
             return {"ok": True, "alerts": incidents, "count": len(incidents)}
         except Exception as e:
@@ -0,0 +1,150 @@
+"""
+Background LLM triage for alert evaluation.
+
+Rule-based alerts fire inline; the LLM only ever sees events queued here:
+
+- a deterministic pre-filter skips clearly healthy margins (above
+  ``margin_high``), which need no triage. ``margin_low`` defaults to -inf so
+  loss-making proposals always reach the LLM; raise it only when a rule covers
+  them. Bus proposals carry prices, not a
+  margin, so the engine fills it in from catalog cost (``proposal_margin``);
+  events whose margin cannot be worked out are passed through;
+- events are coalesced per SKU within ``window_s`` (the latest event wins);
+- each flush hands up to ``max_batch`` events to the handler as one batch, so
+  a single prompt covers many proposals;
+- at most ``concurrency`` batches are in flight. While all slots are busy new
+  events keep coalescing, and the oldest SKUs are dropped past ``max_pending``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger("alert_triage")
+
+TriageHandler = Callable[[List[Dict[str, Any]]], Awaitable[Any]]
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+def proposal_margin(event: Dict[str, Any], cost: Any) -> Optional[float]:
+    """Margin of the event's proposed price over ``cost``, or None if either is unknown."""
+    try:
+        price = float(event.get("proposed_price", event.get("new_price")))
+        cost = float(cost)
+    except (TypeError, ValueError):
+        return None
+    if price <= 0:
+        return None
+    return (price - cost) / price
+
+
+class TriageQueue:
+    def __init__(
+        self,
+        handler: TriageHandler,
+        window_s: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        margin_low: Optional[float] = None,
+        margin_high: Optional[float] = None,
+        max_pending: int = 1000,
+    ) -> None:
+        self.handler = handler
+        self.window_s = window_s if window_s is not None else _env_float("ALERT_TRIAGE_WINDOW_S", "2.0")
+        self.max_batch = max_batch or int(os.getenv("ALERT_TRIAGE_MAX_BATCH", "20"))
+        self.concurrency = concurrency or int(os.getenv("ALERT_TRIAGE_CONCURRENCY", "2"))
+        self.margin_low = margin_low if margin_low is not None else _env_float("ALERT_TRIAGE_MARGIN_LOW", "-inf")
+        self.margin_high = margin_high if margin_high is not None else _env_float("ALERT_TRIAGE_MARGIN_HIGH", "0.08")
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self.stats = {
+            "submitted": 0,
+            "filtered": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "batches": 0,
+            "triaged": 0,
+            "errors": 0,
+        }
+
+    def prefilter(self, event: Dict[str, Any]) -> bool:
+        """True if the event is borderline enough (or too unknown) to be worth an LLM look."""
+        if event.get("margin") is None:
+            return True
+        try:
+            margin = float(event.get("margin"))
+        except (TypeError, ValueError):
+            return True
+        return self.margin_low <= margin <= self.margin_high
+
+    def submit(self, event: Dict[str, Any]) -> bool:
+        """Queue ``event`` for triage without waiting; returns False if it was filtered out."""
+        self.stats["submitted"] += 1
+        if not self.prefilter(event):
+            self.stats["filtered"] += 1
+            return False
+        sku = str(event.get("sku") or event.get("product_id") or "UNKNOWN")
+        if sku in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending[sku] = event
+        self._pending.move_to_end(sku)
+        while len(self._pending) > self.max_pending:
+            self._pending.popitem(last=False)
+            self.stats["dropped"] += 1
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        return True
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def _flush_loop(self) -> None:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.concurrency)
+        while self._pending:
+            await asyncio.sleep(self.window_s)
+            while self._pending:
+                await self._sem.acquire()
+                batch = [self._pending.popitem(last=False)[1] for _ in range(min(self.max_batch, len(self._pending)))]
+                if not batch:
+                    self._sem.release()
+                    break
+                task = asyncio.get_running_loop().create_task(self._run(batch))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await self.handler(batch)
+            self.stats["batches"] += 1
+            self.stats["triaged"] += len(batch)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"LLM triage of {len(batch)} events failed: {e}")
+        finally:
+            self._sem.release()
+
+    async def drain(self) -> None:
+        """Wait until everything queued so far has been triaged."""
+        while (self._flusher and not self._flusher.done()) or self._inflight:
+            if self._flusher and not self._flusher.done():
+                await self._flusher
+            if self._inflight:
+                await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    async def close(self) -> None:
+        self._pending.clear()
+        if self._flusher and not self._flusher.done():
+            self._flusher.cancel()
+        for task in list(self._inflight):
+            task.cancel()
+        await asyncio.gather(*([self._flusher] if self._flusher else []), *self._inflight, return_exceptions=True)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import json
 from typing import Any, Dict, List, Optional, Callable
 from .chat_executor import ChatExecutor
+from .llm_provider_manager import async_client_for
 
 
 class BaseChatHandler:
@@ -64,30 +66,47 @@ class BaseChatHandler:
                     max_tokens=max_tokens,
                     temperature=temperature,
                 )
-                if not resp or not resp.choices:
-                    raise RuntimeError("Empty response from LLM")
+                return self._chat_content(resp, provider), idx
+            except Exception as exc:
+                last_error = exc
+                error_type = type(exc).__name__
+                self._log.warning("Provider %s failed for %s (%s): %s", provider["name"], operation_name, error_type, exc)
+                continue
 
-                choice = resp.choices[0]
-                raw_content = choice.message.content
-                finish_reason = getattr(choice, "finish_reason", None)
+        error_msg = f"All LLM providers failed for {operation_name}. Last error: {last_error or 'no provider succeeded'}"
+        self._log.error(error_msg)
+        raise RuntimeError(error_msg)
+
+    async def aexecute_chat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        operation_name: str
+    ) -> tuple[str, int]:
+        if not self._providers:
+            raise RuntimeError("LLM client unavailable (missing key or package)")
 
+        last_error: Optional[Exception] = None
+        for idx in self.provider_indices():
+            provider = self._providers[idx]
+            try:
                 self._log.debug(
-                    "Raw response content: %r (type=%s, finish_reason=%s)",
-                    raw_content,
-                    type(raw_content).__name__,
-                    finish_reason
+                    "Sending async %s | provider=%s model=%s msgs=%d max_tokens=%d temp=%.2f",
+                    operation_name,
+                    provider["name"],
+                    provider["model"],
+                    len(messages),
+                    max_tokens,
+                    temperature,
                 )
-
-                content = (raw_content or "").strip()
-                if not content:
-                    self._log.warning(
-                        "LLM returned empty content for provider %s (finish_reason=%s)",
-                        provider["name"],
-                        finish_reason
-                    )
-
-                self.capture_usage(resp, provider["name"], provider["model"])
-                return content, idx
+                resp = await async_client_for(provider).chat.completions.create(
+                    model=provider["model"],
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                )
+                return self._chat_content(resp, provider), idx
             except Exception as exc:
                 last_error = exc
                 error_type = type(exc).__name__
@@ -98,6 +117,73 @@ class BaseChatHandler:
         self._log.error(error_msg)
         raise RuntimeError(error_msg)
 
+    def _chat_content(self, resp: Any, provider: Dict[str, Any]) -> str:
+        if not resp or not resp.choices:
+            raise RuntimeError("Empty response from LLM")
+
+        choice = resp.choices[0]
+        raw_content = choice.message.content
+        finish_reason = getattr(choice, "finish_reason", None)
+
+        self._log.debug(
+            "Raw response content: %r (type=%s, finish_reason=%s)",
+            raw_content,
+            type(raw_content).__name__,
+            finish_reason
+        )
+
+        content = (raw_content or "").strip()
+        if not content:
+            self._log.warning(
+                "LLM returned empty content for provider %s (finish_reason=%s)",
+                provider["name"],
+                finish_reason
+            )
+
+        self.capture_usage(resp, provider["name"], provider["model"])
+        return content
+
+    @staticmethod
+    def assistant_message(content: Optional[str], tool_calls: List[Any]) -> Dict[str, Any]:
+        assistant_msg: Dict[str, Any] = {"role": "assistant"}
+        if content is not None:
+            assistant_msg["content"] = content
+        if tool_calls:
+            normalized_calls = []
+            for tc in tool_calls:
+                try:
+                    normalized_calls.append({
+                        "id": tc.id,
+                        "type": getattr(tc, "type", "function"),
+                        "function": {
+                            "name": tc.function.name,
+                            "arguments": tc.function.arguments,
+                        },
+                    })
+                except Exception:
+                    normalized_calls.append(json.loads(json.dumps(tc)))
+            assistant_msg["tool_calls"] = normalized_calls
+        return assistant_msg
+
+    @staticmethod
+    def tool_call_args(tool_calls: List[Dict[str, Any]]) -> List[tuple[Optional[str], str]]:
+        return [
+            ((tc.get("function") or {}).get("name"), (tc.get("function") or {}).get("arguments") or "{}")
+            for tc in tool_calls
+        ]
+
+    def tool_messages(self, tool_calls: List[Dict[str, Any]], results: List[Any]) -> List[Dict[str, Any]]:
+        """Tool result messages, one per call and in the same order as `tool_calls`."""
+        return [
+            {
+                "role": "tool",
+                "tool_call_id": tc.get("id") or "tool_call",
+                "name": (tc.get("function") or {}).get("name"),
+                "content": self.executor.serialize_tool_result(result),
+            }
+            for tc, result in zip(tool_calls, results)
+        ]
+
     def execute_chat_with_tools(
         self,
         messages: List[Dict[str, Any]],
@@ -143,50 +229,87 @@ class BaseChatHandler:
                     content = getattr(msg, "content", None)
                     tool_calls = getattr(msg, "tool_calls", None) or []
 
-                    assistant_msg = {"role": "assistant"}
-                    if content is not None:
-                        assistant_msg["content"] = content
-                    if tool_calls:
-                        normalized_calls = []
-                        for tc in tool_calls:
-                            try:
-                                normalized_calls.append({
-                                    "id": tc.id,
-                                    "type": getattr(tc, "type", "function"),
-                                    "function": {
-                                        "name": tc.function.name,
-                                        "arguments": tc.function.arguments,
-                                    },
-                                })
-                            except Exception:
-                                normalized_calls.append(json.loads(json.dumps(tc)))
-                        assistant_msg["tool_calls"] = normalized_calls
-
+                    assistant_msg = self.assistant_message(content, tool_calls)
                     local_msgs.append(assistant_msg)
 
                     if not tool_calls:
                         return (content or "").strip(), idx, tools_used
 
-                    for tc in assistant_msg["tool_calls"]:
-                        fn_name = tc.get("function", {}).get("name")
-                        raw_args = tc.get("function", {}).get("arguments") or "{}"
-                        call_id = tc.get("id") or "tool_call"
+                    calls = self.tool_call_args(assistant_msg["tool_calls"])
+                    results = self.executor.execute_tool_calls(calls, functions_map, tools_used, trace_id)
+                    local_msgs.extend(self.tool_messages(assistant_msg["tool_calls"], results))
 
-                        result = self.executor.execute_tool_call(fn_name, raw_args, functions_map, tools_used, trace_id)
-                        content_str = self.executor.serialize_tool_result(result)
+                return (assistant_msg.get("content") or "").strip(), idx, tools_used
+            except Exception as exc:
+                last_error = exc
+                error_type = type(exc).__name__
+                self._log.warning("Provider %s failed for tool call (%s): %s", provider["name"], error_type, exc)
+                continue
 
-                        local_msgs.append({
-                            "role": "tool",
-                            "tool_call_id": call_id,
-                            "name": fn_name,
-                            "content": content_str,
-                        })
+        error_msg = f"All LLM providers failed for tool calling. Last error: {last_error or 'no provider succeeded'}"
+        self._log.error(error_msg)
+        raise RuntimeError(error_msg)
+
+    async def aexecute_chat_with_tools(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: List[Dict[str, Any]],
+        functions_map: Dict[str, Callable[..., Any]],
+        tool_choice: Optional[str],
+        max_rounds: int,
+        max_tokens: int,
+        temperature: float,
+        trace_id: Optional[str],
+    ) -> tuple[str, int, List[str]]:
+        if not self._providers:
+            raise RuntimeError("LLM client unavailable (missing key or package)")
+
+        last_error: Optional[Exception] = None
+        for idx in self.provider_indices():
+            provider = self._providers[idx]
+            try:
+                client = async_client_for(provider)
+                local_msgs: List[Dict[str, Any]] = list(messages)
+                assistant_msg: Dict[str, Any] = {}
+                tools_used: List[str] = []
+                for round_i in range(max_rounds):
+                    self._log.debug(
+                        "Async tool round %d | provider=%s model=%s msgs=%d tools=%d",
+                        round_i + 1,
+                        provider["name"],
+                        provider["model"],
+                        len(local_msgs),
+                        len(tools),
+                    )
+                    resp = await client.chat.completions.create(
+                        model=provider["model"],
+                        messages=local_msgs,
+                        tools=tools,
+                        **({"tool_choice": tool_choice} if tool_choice else {}),
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                    )
+                    self.capture_usage(resp, provider["name"], provider["model"])
+
+                    msg = resp.choices[0].message
+                    content = getattr(msg, "content", None)
+                    tool_calls = getattr(msg, "tool_calls", None) or []
+
+                    assistant_msg = self.assistant_message(content, tool_calls)
+                    local_msgs.append(assistant_msg)
+
+                    if not tool_calls:
+                        return (content or "").strip(), idx, tools_used
+
+                    calls = self.tool_call_args(assistant_msg["tool_calls"])
+                    results = await self.executor.aexecute_tool_calls(calls, functions_map, tools_used, trace_id)
+                    local_msgs.extend(self.tool_messages(assistant_msg["tool_calls"], results))
 
                 return (assistant_msg.get("content") or "").strip(), idx, tools_used
             except Exception as exc:
                 last_error = exc
                 error_type = type(exc).__name__
-                self._log.warning("Provider %s failed for tool call (%s): %s", provider["name"], error_type, exc)
+                self._log.warning("Provider %s failed for async tool call (%s): %s", provider["name"], error_type, exc)
                 continue
 
         error_msg = f"All LLM providers failed for tool calling. Last error: {last_error or 'no provider succeeded'}"
@@ -1,22 +1,93 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Callable, Optional
+from typing import Any, Dict, List, Callable, Optional, Tuple
+import asyncio
+import contextvars
+import inspect
 import json
-from datetime import datetime
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+_tool_pool: Optional[ThreadPoolExecutor] = None
+_bridge_loop: Optional[asyncio.AbstractEventLoop] = None
+_init_lock = threading.Lock()
+
+
+def _shared_pool() -> ThreadPoolExecutor:
+    """Bounded pool shared by every sync tool call (LLM_TOOL_THREADS workers)."""
+    global _tool_pool
+    if _tool_pool is None:
+        with _init_lock:
+            if _tool_pool is None:
+                _tool_pool = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("LLM_TOOL_THREADS", "8")),
+                    thread_name_prefix="llm-tool",
+                )
+    return _tool_pool
+
+
+def _shared_loop() -> asyncio.AbstractEventLoop:
+    """Long-lived background loop for coroutine tools reached from the sync chat path."""
+    global _bridge_loop
+    if _bridge_loop is None:
+        with _init_lock:
+            if _bridge_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-tool-loop", daemon=True).start()
+                _bridge_loop = loop
+    return _bridge_loop
+
+
+class ToolLatency:
+    """Per-tool call counts and latency, shared by all executors."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: Optional[str], duration_ms: float, ok: bool) -> None:
+        with self._lock:
+            s = self._stats.setdefault(name or "<unknown>", {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+            s["calls"] += 1
+            s["errors"] += 0 if ok else 1
+            s["total_ms"] += duration_ms
+            s["max_ms"] = max(s["max_ms"], duration_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: {**s, "avg_ms": round(s["total_ms"] / s["calls"], 3)}
+                for name, s in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+tool_latency = ToolLatency()
+
+
+def _round_concurrency() -> int:
+    return max(1, int(os.getenv("LLM_TOOL_CONCURRENCY", "4")))
+
+
+def _invoke(fn: Callable[..., Any], args: Any) -> Any:
+    try:
+        return fn(**args)
+    except TypeError:
+        return fn(args)
 
 
 class ChatExecutor:
     def __init__(self, log):
         self._log = log
 
-    def execute_tool_call(
-        self,
-        fn_name: Optional[str],
-        raw_args: str,
-        functions_map: Dict[str, Callable[..., Any]],
-        tools_used: List[str],
-        trace_id: Optional[str] = None,
-    ) -> Any:
+    @staticmethod
+    def _prepare(fn_name: Optional[str], raw_args: str, tools_used: List[str]) -> Any:
         try:
             if fn_name and fn_name not in tools_used:
                 tools_used.append(fn_name)
@@ -24,52 +95,136 @@ class ChatExecutor:
             pass
 
         try:
-            args = json.loads(raw_args) if isinstance(raw_args, str) else (raw_args or {})
+            return json.loads(raw_args) if isinstance(raw_args, str) else (raw_args or {})
         except Exception:
-            args = {}
+            return {}
+
+    def _finish(self, fn_name: Optional[str], started: float, error_occurred: bool, trace_id: Optional[str]) -> None:
+        duration_ms = (time.perf_counter() - started) * 1000
+        tool_latency.record(fn_name, duration_ms, not error_occurred)
+        try:
+            if trace_id:
+                status = "failed" if error_occurred else "completed"
+                self._log.debug(f"Tool call {status}: {fn_name} duration={int(duration_ms)}ms")
+        except Exception:
+            pass
 
-        tool_start_time = datetime.now()
+    def execute_tool_call(
+        self,
+        fn_name: Optional[str],
+        raw_args: str,
+        functions_map: Dict[str, Callable[..., Any]],
+        tools_used: List[str],
+        trace_id: Optional[str] = None,
+    ) -> Any:
+        args = self._prepare(fn_name, raw_args, tools_used)
+
+        tool_start_time = time.perf_counter()
         result: Any
         error_occurred = False
 
         if fn_name in functions_map:
             try:
-                result = functions_map[fn_name](**args)
-            except TypeError:
-                result = functions_map[fn_name](args)
+                result = _invoke(functions_map[fn_name], args)
+                if hasattr(result, '__await__'):
+                    result = asyncio.run_coroutine_threadsafe(result, _shared_loop()).result()
             except Exception as tool_exc:
                 result = {"error": str(tool_exc)}
                 error_occurred = True
-
-            if hasattr(result, '__await__'):
-                import asyncio
-                from concurrent.futures import ThreadPoolExecutor
-
-                def run_in_new_loop():
-                    new_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(new_loop)
-                    try:
-                        return new_loop.run_until_complete(result)
-                    finally:
-                        new_loop.close()
-
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(run_in_new_loop)
-                    result = future.result()
         else:
             result = {"error": f"unknown tool: {fn_name}"}
             error_occurred = True
 
-        try:
-            if trace_id:
-                duration_ms = int((datetime.now() - tool_start_time).total_seconds() * 1000)
-                status = "failed" if error_occurred else "completed"
-                self._log.debug(f"Tool call {status}: {fn_name} duration={duration_ms}ms")
-        except Exception:
-            pass
+        self._finish(fn_name, tool_start_time, error_occurred, trace_id)
+        return result
+
+    async def aexecute_tool_call(
+        self,
+        fn_name: Optional[str],
+        raw_args: str,
+        functions_map: Dict[str, Callable[..., Any]],
+        tools_used: List[str],
+        trace_id: Optional[str] = None,
+    ) -> Any:
+        """Async `execute_tool_call`: coroutine tools run on the caller's loop,
+        sync tools in the shared thread pool."""
+        args = self._prepare(fn_name, raw_args, tools_used)
+
+        tool_start_time = time.perf_counter()
+        result: Any
+        error_occurred = False
 
+        if fn_name in functions_map:
+            fn = functions_map[fn_name]
+            try:
+                if inspect.iscoroutinefunction(fn):
+                    result = _invoke(fn, args)
+                else:
+                    loop = asyncio.get_running_loop()
+                    # Carry contextvars (e.g. the chat's owner_id) into the worker thread
+                    ctx = contextvars.copy_context()
+                    result = await loop.run_in_executor(_shared_pool(), ctx.run, _invoke, fn, args)
+                if hasattr(result, '__await__'):
+                    result = await result
+            except Exception as tool_exc:
+                result = {"error": str(tool_exc)}
+                error_occurred = True
+        else:
+            result = {"error": f"unknown tool: {fn_name}"}
+            error_occurred = True
+
+        self._finish(fn_name, tool_start_time, error_occurred, trace_id)
         return result
 
+    def execute_tool_calls(
+        self,
+        calls: List[Tuple[Optional[str], str]],
+        functions_map: Dict[str, Callable[..., Any]],
+        tools_used: List[str],
+        trace_id: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Any]:
+        """Run one round's (fn_name, raw_args) calls concurrently; results keep call order."""
+        limit = max_concurrency or _round_concurrency()
+        for fn_name, _ in calls:
+            if fn_name and fn_name not in tools_used:
+                tools_used.append(fn_name)
+        if len(calls) <= 1 or limit <= 1:
+            return [self.execute_tool_call(fn, args, functions_map, tools_used, trace_id) for fn, args in calls]
+
+        slots = threading.Semaphore(limit)
+        futures = []
+        for fn_name, raw_args in calls:
+            slots.acquire()
+            # One context copy per call: tools see the caller's owner_id without sharing mutations
+            future = _shared_pool().submit(
+                contextvars.copy_context().run,
+                self.execute_tool_call, fn_name, raw_args, functions_map, tools_used, trace_id,
+            )
+            future.add_done_callback(lambda _f: slots.release())
+            futures.append(future)
+        return [f.result() for f in futures]
+
+    async def aexecute_tool_calls(
+        self,
+        calls: List[Tuple[Optional[str], str]],
+        functions_map: Dict[str, Callable[..., Any]],
+        tools_used: List[str],
+        trace_id: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Any]:
+        """Async `execute_tool_calls`."""
+        slots = asyncio.Semaphore(max_concurrency or _round_concurrency())
+        for fn_name, _ in calls:
+            if fn_name and fn_name not in tools_used:
+                tools_used.append(fn_name)
+
+        async def run(fn_name: Optional[str], raw_args: str) -> Any:
+            async with slots:
+                return await self.aexecute_tool_call(fn_name, raw_args, functions_map, tools_used, trace_id)
+
+        return list(await asyncio.gather(*(run(fn, args) for fn, args in calls)))
+
     @staticmethod
     def serialize_tool_result(result: Any) -> str:
         try:
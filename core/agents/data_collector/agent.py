@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 from .tools import Tools, get_llm_tools, execute_tool_call
 from .repo import DataRepo
+from .scheduler import CollectionScheduler
 
 logger = logging.getLogger("data_collector_agent")
 
@@ -30,6 +32,8 @@ class DataCollectorAgent:
         self,
         repo: DataRepo,
         check_interval_seconds: int = 180,
+        use_scheduler: Optional[bool] = None,
+        scheduler_workers: Optional[int] = None,
     ):
         self.repo = repo
         self.check_interval_seconds = check_interval_seconds
@@ -37,6 +41,18 @@ class DataCollectorAgent:
         self.llm = None
         self.logger = logger
         self.running = False
+
+        # The deterministic scheduler drives collection; the LLM (if any) only
+        # contributes advice by boosting SKUs in its queue.
+        if use_scheduler is None:
+            use_scheduler = os.getenv("COLLECTOR_SCHEDULER", "1").lower() in ("1", "true", "yes")
+        self.scheduler: Optional[CollectionScheduler] = None
+        if use_scheduler:
+            self.scheduler = CollectionScheduler(
+                self.tools,
+                workers=scheduler_workers or int(os.getenv("COLLECTOR_WORKERS", "4")),
+                fallback_connector=os.getenv("COLLECTOR_FALLBACK_CONNECTOR") or None,
+            )
         
         try:
             from core.agents.llm_client import get_llm_client
@@ -52,8 +68,12 @@ class DataCollectorAgent:
         self.running = True
         self.logger.info(
             f"DataCollectorAgent started - LLM={'enabled' if self.llm and self.llm.is_available() else 'disabled'}, "
-            f"check_interval={self.check_interval_seconds}s"
+            f"check_interval={self.check_interval_seconds}s, "
+            f"scheduler={'enabled' if self.scheduler else 'disabled'}"
         )
+
+        if self.scheduler is not None:
+            await self.scheduler.start()
         
         try:
             from core.agents.agent_sdk.bus_factory import get_bus
@@ -73,6 +93,10 @@ class DataCollectorAgent:
 
     async def stop(self):
         self.running = False
+        if self.scheduler is not None:
+            await self.scheduler.stop()
+        from .connectors.web_scraper import close_async_scraper
+        await close_async_scraper()
         self.logger.info("DataCollectorAgent stopped")
 
     async def _autonomous_loop(self):
@@ -82,6 +106,8 @@ class DataCollectorAgent:
                 
                 if self.llm and self.llm.is_available():
                     await self._handle_autonomous_check()
+                elif self.scheduler is not None:
+                    self.logger.info(f"Collection scheduler stats: {self.scheduler.stats()}")
                 else:
                     await self._handle_heuristic_check()
                     
@@ -119,6 +145,9 @@ Complete this workflow autonomously using your tools."""
             
             async def start_collection_job_async(sku: str, market: str = "DEFAULT", 
                                                 connector: str = "mock", depth: int = 5):
+                if self.scheduler is not None:
+                    # Advice only: bump the SKU in the scheduler's queue
+                    return self.scheduler.submit(sku, connector=connector)
                 return await execute_tool_call("start_collection_job", {
                     "sku": sku, "market": market, "connector": connector, "depth": depth
                 }, self.tools)
@@ -139,7 +168,7 @@ Complete this workflow autonomously using your tools."""
             }
             
             try:
-                result = self.llm.chat_with_tools(
+                result = await self.llm.achat_with_tools(
                     messages=messages,
                     tools=tools_schema,
                     functions_map=functions_map,
@@ -151,7 +180,8 @@ Complete this workflow autonomously using your tools."""
                 
             except Exception as e:
                 self.logger.error(f"LLM autonomous check failed: {e}")
-                await self._handle_heuristic_check()
+                if self.scheduler is None:
+                    await self._handle_heuristic_check()
                 
         except Exception as e:
             self.logger.error(f"Autonomous check failed: {e}")
@@ -0,0 +1,158 @@
+"""
+Chunked catalog import.
+
+Large catalog uploads are parsed a chunk at a time (pandas ``chunksize`` for
+CSV / JSON Lines, pyarrow record batches for Parquet), validated with
+vectorized checks and upserted one transaction per chunk. Progress is written
+to the ``catalog_import_jobs`` table so callers can poll it by job id.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pandas as pd
+
+from .repo import DataRepo
+
+logger = logging.getLogger("catalog_import")
+
+REQUIRED_COLUMNS = {"sku", "title", "currency", "current_price", "cost", "stock"}
+SUPPORTED_FORMATS = {
+    ".csv": "csv",
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+}
+DEFAULT_CHUNKSIZE = 5000
+MAX_ERROR_SAMPLES = 20
+
+
+def detect_format(filename: str) -> str:
+    """Map a filename to one of the supported import formats."""
+    fmt = SUPPORTED_FORMATS.get(Path(filename or "").suffix.lower())
+    if not fmt:
+        raise ValueError(
+            "Invalid file type. Please upload a CSV, JSON, JSON Lines or Parquet file."
+        )
+    return fmt
+
+
+def iter_chunks(path: str, fmt: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames of at most ``chunksize`` rows from ``path``."""
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunksize)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(path)
+        for batch in pf.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif fmt == "json":
+        # A JSON array cannot be parsed incrementally by pandas; parse once and
+        # still upsert in chunks so each transaction stays small.
+        df = pd.read_json(path)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def validate_chunk(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    """Vectorized validation of one chunk.
+
+    Returns the valid rows (with numeric columns coerced) and a list of error
+    messages for the rejected ones. Raises ValueError if required columns are
+    missing, since that affects every row in the file.
+    """
+    missing = REQUIRED_COLUMNS - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
+
+    df = df.copy()
+    df["sku"] = df["sku"].astype("string").str.strip()
+    for col in ("current_price", "cost", "stock"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    checks = {
+        "missing sku": df["sku"].isna() | (df["sku"] == ""),
+        "invalid number": df[["current_price", "cost", "stock"]].isna().any(axis=1),
+        "negative price or cost": (df["current_price"] < 0) | (df["cost"] < 0),
+        "negative stock": df["stock"] < 0,
+        "duplicate sku": df["sku"].duplicated(keep="last"),
+    }
+
+    bad = pd.Series(False, index=df.index)
+    errors: List[str] = []
+    for reason, mask in checks.items():
+        mask = mask.fillna(False) & ~bad
+        if mask.any():
+            errors.extend(f"sku={sku}: {reason}" for sku in df.loc[mask, "sku"].head(MAX_ERROR_SAMPLES))
+        bad |= mask
+
+    valid = df.loc[~bad].copy()
+    valid["stock"] = valid["stock"].astype(int)
+    valid = valid.astype(object).where(valid.notna(), None)
+    return valid, errors
+
+
+async def run_catalog_import(
+    repo: DataRepo,
+    job_id: str,
+    path: str,
+    fmt: str,
+    owner_id: str,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    remove_file: bool = True,
+) -> Dict[str, Any]:
+    """Import ``path`` chunk by chunk, recording progress on ``job_id``.
+
+    Parsing runs in a worker thread so the event loop is never blocked on a
+    multi-hundred-MB file.
+    """
+    progress: Dict[str, Any] = {
+        "rows_processed": 0,
+        "rows_inserted": 0,
+        "rows_rejected": 0,
+        "chunks": 0,
+        "errors": [],
+    }
+    try:
+        await repo.update_catalog_import_job(job_id, status="RUNNING")
+        chunks = iter_chunks(path, fmt, chunksize)
+        while True:
+            df = await asyncio.to_thread(next, chunks, None)
+            if df is None:
+                break
+            valid, errors = await asyncio.to_thread(validate_chunk, df)
+            inserted = await repo.upsert_products(valid.to_dict("records"), owner_id) if len(valid) else 0
+
+            progress["rows_processed"] += len(df)
+            progress["rows_inserted"] += inserted
+            progress["rows_rejected"] += len(df) - len(valid)
+            progress["chunks"] += 1
+            room = MAX_ERROR_SAMPLES - len(progress["errors"])
+            if room > 0:
+                progress["errors"].extend(errors[:room])
+            await repo.update_catalog_import_job(job_id, **progress)
+
+        await repo.update_catalog_import_job(job_id, status="DONE", finished=True)
+        progress["status"] = "DONE"
+    except Exception as e:
+        logger.error(f"Catalog import {job_id} failed: {e}")
+        await repo.update_catalog_import_job(job_id, status="FAILED", error=str(e), finished=True)
+        progress["status"] = "FAILED"
+        progress["error"] = str(e)
+    finally:
+        if remove_file:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return progress
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from core.agents.agent_sdk.bus_factory import get_bus as _get_bus
 from core.agents.agent_sdk.protocol import Topic
 from core.agents.agent_sdk.events_models import MarketTick
+from core.agents.agent_sdk.idempotency import IdempotencyStore
 from core.payloads import MarketFetchRequestPayload, MarketFetchAckPayload, MarketFetchDonePayload
 from .repo import DataRepo
+from .connectors.base import ConnectorRequest, get_connector, run_connector
 
 # Optional legacy agent SDK bus for backward compatibility.
 # If available, we will dual-publish the raw dict payload to the legacy bus/topic.
@@ -20,11 +23,13 @@ except Exception:
 
 
 class DataCollector:
-    def __init__(self, repo: DataRepo):
+    def __init__(self, repo: DataRepo, subscribe: bool = True):
         self.repo = repo
         self._instance_id = uuid.uuid4().hex[:8]  # Add instance ID for debugging
-        self._processed_requests = set()  # Track processed request IDs to prevent duplicates
-        self._setup_subscriptions()
+        # Processed request IDs (bounded by TTL, survives restarts) to prevent duplicates
+        self._processed_requests = IdempotencyStore("market_fetch_request", db_path=repo.path)
+        if subscribe:
+            self._setup_subscriptions()
 
     def _setup_subscriptions(self):
         """Set up event bus subscriptions for market fetch requests."""
@@ -32,9 +37,9 @@ class DataCollector:
         print(f"[DataCollector-{self._instance_id}] Setting up subscription to MARKET_FETCH_REQUEST")
         bus.subscribe(Topic.MARKET_FETCH_REQUEST.value, self._handle_market_fetch_request)
 
-    async def ingest_tick(self, d: Dict[str, Any]) -> None:
-        # Normalize required fields
-        payload = {
+    @staticmethod
+    def _normalize_tick(d: Dict[str, Any]) -> Dict[str, Any]:
+        return {
             "sku": d["sku"],
             "market": d.get("market", "DEFAULT"),
             "our_price": float(d["our_price"]),
@@ -44,7 +49,21 @@ class DataCollector:
             or datetime.now(timezone.utc).isoformat(),
             "source": d.get("source", "manual"),
         }
+
+    async def ingest_tick(self, d: Dict[str, Any]) -> None:
+        payload = self._normalize_tick(d)
         await self.repo.insert_tick(payload)
+        await self._publish_tick(payload)
+
+    async def ingest_batch(self, ticks: Iterable[Dict[str, Any]]) -> int:
+        """Insert a batch of ticks in one transaction, then publish each one."""
+        payloads = [self._normalize_tick(d) for d in ticks]
+        await self.repo.insert_ticks(payloads)
+        for payload in payloads:
+            await self._publish_tick(payload)
+        return len(payloads)
+
+    async def _publish_tick(self, payload: Dict[str, Any]) -> None:
         # Publish MARKET_TICK as a typed dataclass on the global bus so downstream
         # consumers (e.g., AlertEngine) receive the expected structure.
         competitor_price_value = payload.get("competitor_price")
@@ -68,9 +87,7 @@ class DataCollector:
                 legacy_bus = get_legacy_bus()
                 res = legacy_bus.publish(LegacyTopic.MARKET_TICK.value, payload)
                 # Handle both coroutine and sync publish implementations.
-                import asyncio as _asyncio
-
-                if _asyncio.iscoroutine(res):
+                if asyncio.iscoroutine(res):
                     await res
             except Exception as e:
                 # Non-fatal: continue if legacy publish fails.
@@ -82,12 +99,35 @@ class DataCollector:
     async def ingest_stream(
         self, it: Iterable[Dict[str, Any]], delay_s: float = 1.0
     ) -> None:
-        import asyncio
-
         for d in it:
             await self.ingest_tick(d)
             await asyncio.sleep(delay_s)
 
+    async def collect(
+        self,
+        sku: str,
+        market: str = "DEFAULT",
+        sources: Iterable[str] = ("mock",),
+        depth: int = 1,
+        urls: Optional[List[str]] = None,
+    ) -> int:
+        """Run the registered connectors for ``sources`` concurrently; returns ticks ingested.
+
+        Raises ValueError for an unknown connector. Connectors that need URLs are
+        skipped when none are given.
+        """
+        request = ConnectorRequest(sku=sku, market=market, depth=depth, urls=list(urls or []))
+        specs = []
+        for source in sources:
+            spec = get_connector(source)
+            if spec is None:
+                raise ValueError(f"unsupported_connector: {source}")
+            if spec.requires_urls and not request.urls:
+                continue
+            specs.append(spec)
+        counts = await asyncio.gather(*(run_connector(spec, request, self.ingest_batch) for spec in specs))
+        return sum(counts)
+
     async def _handle_market_fetch_request(self, payload: MarketFetchRequestPayload) -> None:
         """Handle market fetch requests by running appropriate connectors."""
         request_id = payload["request_id"]
@@ -99,14 +139,11 @@ class DataCollector:
         
         print(f"[DataCollector-{self._instance_id}] Handling market fetch request: {request_id}")
         
-        # Check for duplicate request processing
-        if request_id in self._processed_requests:
+        # Check for duplicate request processing and mark the request as being processed
+        if not await self._processed_requests.acheck_and_add(request_id):
             print(f"[DataCollector-{self._instance_id}] DUPLICATE REQUEST DETECTED - Ignoring request_id: {request_id}")
             return
-        
-        # Mark request as being processed
-        self._processed_requests.add(request_id)
-        print(f"[DataCollector-{self._instance_id}] Added request_id {request_id} to processed set. Total processed: {len(self._processed_requests)}")
+        print(f"[DataCollector-{self._instance_id}] Added request_id {request_id} to processed set. Total tracked: {len(self._processed_requests)}")
         
         bus = _get_bus()
         
@@ -130,39 +167,7 @@ class DataCollector:
             ack_payload["status"] = "RUNNING"
             await bus.publish(Topic.MARKET_FETCH_ACK.value, ack_payload)
             
-            tick_count = 0
-            
-            # Process each source
-            for source in sources:
-                if source == "web_scraper" and urls:
-                    # Use web scraper connector
-                    try:
-                        from .connectors.web_scraper import fetch_competitor_price
-                        
-                        for url in urls:
-                            try:
-                                result = fetch_competitor_price(url)
-                                if result.get("status") == "success" and "price" in result:
-                                    # Create tick data
-                                    tick_data = {
-                                        "sku": sku,
-                                        "market": market,
-                                        "our_price": 0.0,  # Will be updated from product catalog
-                                        "competitor_price": float(result["price"]),
-                                        "demand_index": 1.0,  # Default
-                                        "ts": datetime.now(timezone.utc).isoformat(),
-                                        "source": f"web_scraper:{url}"
-                                    }
-                                    
-                                    # Insert tick
-                                    await self.ingest_tick(tick_data)
-                                    tick_count += 1
-                                    
-                            except Exception as e:
-                                print(f"[DataCollector] Failed to scrape {url}: {e}")
-                                
-                    except ImportError:
-                        print("[DataCollector] web_scraper connector not available")
+            tick_count = await self.collect(sku, market, sources, depth, urls)
             
             # Mark job as done
             await self.repo.mark_job_done(job_id)
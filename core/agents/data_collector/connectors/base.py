@@ -0,0 +1,176 @@
+"""
+Connector interface and registry for the data collector.
+
+A connector is an async generator function taking a ``ConnectorRequest`` and
+yielding batches (lists) of tick dicts. Registering it declares how many jobs
+may run it at once and, optionally, how many batches per second it may yield;
+the collector enforces both, so connectors only produce data at their natural
+speed and never sleep to be polite.
+
+``run_connector`` moves batches from the generator into a bounded queue that a
+sink drains, so a fast connector blocks instead of piling up ticks in memory
+when ingestion falls behind.
+
+    @register_connector("csv_feed", concurrency=2)
+    async def csv_feed(req):
+        for chunk in read_feed(req.options["path"]):
+            yield [to_tick(row, req) for row in chunk]
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("data_collector_connectors")
+
+TickBatch = List[Dict[str, Any]]
+
+# Modules that register connectors when imported
+BUILTIN_CONNECTORS = (".mock", ".web_scraper")
+
+
+@dataclass
+class ConnectorRequest:
+    sku: str
+    market: str = "DEFAULT"
+    depth: int = 1
+    urls: List[str] = field(default_factory=list)
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ConnectorSpec:
+    name: str
+    fn: Callable[[ConnectorRequest], AsyncIterator[TickBatch]]
+    concurrency: int = 4
+    rate_per_s: Optional[float] = None
+    requires_urls: bool = False
+    description: str = ""
+    _semaphore: Optional[asyncio.Semaphore] = field(default=None, repr=False)
+    _bucket: Any = field(default=None, repr=False)
+
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        return self._semaphore
+
+    def bucket(self):
+        if self.rate_per_s and self._bucket is None:
+            from ..scheduler import TokenBucket
+
+            self._bucket = TokenBucket(self.rate_per_s)
+        return self._bucket
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "concurrency": self.concurrency,
+            "rate_per_s": self.rate_per_s,
+            "requires_urls": self.requires_urls,
+            "description": self.description,
+        }
+
+
+_REGISTRY: Dict[str, ConnectorSpec] = {}
+_builtins_loaded = False
+
+
+def register_connector(
+    name: str,
+    concurrency: int = 4,
+    rate_per_s: Optional[float] = None,
+    requires_urls: bool = False,
+    description: str = "",
+):
+    """Decorator registering an async generator function as connector ``name``."""
+
+    def deco(fn):
+        _REGISTRY[name] = ConnectorSpec(
+            name=name,
+            fn=fn,
+            concurrency=concurrency,
+            rate_per_s=rate_per_s,
+            requires_urls=requires_urls,
+            description=description or (fn.__doc__ or "").strip().split("\n")[0],
+        )
+        return fn
+
+    return deco
+
+
+def _load_builtins() -> None:
+    global _builtins_loaded
+    if _builtins_loaded:
+        return
+    _builtins_loaded = True
+    for mod in BUILTIN_CONNECTORS:
+        try:
+            importlib.import_module(mod, __package__)
+        except ImportError as e:
+            logger.warning(f"Connector module {mod} unavailable: {e}")
+
+
+def get_connector(name: str) -> Optional[ConnectorSpec]:
+    _load_builtins()
+    return _REGISTRY.get(name)
+
+
+def list_connectors() -> List[ConnectorSpec]:
+    _load_builtins()
+    return list(_REGISTRY.values())
+
+
+def connector_names() -> List[str]:
+    return sorted(spec.name for spec in list_connectors())
+
+
+async def run_connector(
+    spec: ConnectorSpec,
+    request: ConnectorRequest,
+    sink: Callable[[TickBatch], Awaitable[Any]],
+    max_pending_batches: int = 4,
+) -> int:
+    """Run one connector job, feeding its batches to ``sink``; returns ticks produced.
+
+    At most ``spec.concurrency`` jobs per connector run at once, batches are
+    paced by ``spec.rate_per_s``, and at most ``max_pending_batches`` batches
+    wait for the sink before the generator is suspended.
+    """
+    queue: "asyncio.Queue[Optional[TickBatch]]" = asyncio.Queue(maxsize=max(1, max_pending_batches))
+
+    async def produce() -> None:
+        try:
+            agen = spec.fn(request)
+            try:
+                async for batch in agen:
+                    if not batch:
+                        continue
+                    bucket = spec.bucket()
+                    if bucket is not None:
+                        await bucket.acquire()
+                    await queue.put(list(batch))
+            finally:
+                await agen.aclose()
+        finally:
+            await queue.put(None)
+
+    async with spec.semaphore():
+        producer = asyncio.create_task(produce())
+        count = 0
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    break
+                await sink(batch)
+                count += len(batch)
+        except BaseException:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            raise
+        # Surface connector errors after the queue has drained
+        await producer
+        return count
@@ -0,0 +1,29 @@
+"""Synthetic market ticks for development and tests."""
+from __future__ import annotations
+
+import random
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+from .base import ConnectorRequest, register_connector
+
+
+def mock_ticks(sku: str, market: str = "DEFAULT", n: int = 5, base_price: float = 100.0) -> Iterator[Dict[str, Any]]:
+    """Yield ``n`` random-walk ticks around ``base_price``."""
+    price = base_price
+    for _ in range(n):
+        price = max(1.0, price + random.uniform(-1.5, 1.5))
+        yield {
+            "sku": sku,
+            "market": market,
+            "our_price": round(price, 2),
+            "competitor_price": round(price * random.uniform(0.9, 1.1), 2),
+            "demand_index": round(random.uniform(0.5, 1.5), 3),
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "source": "mock",
+        }
+
+
+@register_connector("mock", concurrency=16, description="Mock data generator for testing")
+async def mock_connector(req: ConnectorRequest) -> AsyncIterator[List[Dict[str, Any]]]:
+    yield list(mock_ticks(sku=req.sku, market=req.market, n=max(1, int(req.depth))))
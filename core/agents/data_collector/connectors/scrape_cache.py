@@ -0,0 +1,168 @@
+"""
+Per-URL cache for scraped product pages.
+
+For every URL we keep the HTTP validators (ETag / Last-Modified), a SHA-256 of
+the last body and the last extracted result. The scraper uses this to send
+conditional requests and to skip HTML parsing when the body is unchanged.
+Bodies themselves are not stored, and the number of entries is capped with
+least-recently-used eviction so the file stays small. Reads only note their
+access time in memory; the times are written back in one batch before the next
+write or eviction (or every ``access_flush_batch`` reads), so a cache hit never
+costs a disk write.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def body_hash(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8", errors="replace")).hexdigest()
+
+
+class ScrapeCache:
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000, access_flush_batch: int = 256) -> None:
+        self.path = Path(path or os.getenv("SCRAPE_CACHE_DB", "app/scrape_cache.db"))
+        self.max_entries = max(1, int(max_entries))
+        self.access_flush_batch = max(1, int(access_flush_batch))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # url -> last read time not yet written to last_access
+        self._accessed: Dict[str, float] = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path.as_posix(), check_same_thread=False)
+            conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+
+                CREATE TABLE IF NOT EXISTS scrape_cache (
+                  url TEXT PRIMARY KEY,
+                  etag TEXT,
+                  last_modified TEXT,
+                  body_hash TEXT,
+                  result TEXT,
+                  fetched_at REAL,
+                  last_access REAL NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS ix_scrape_cache_last_access
+                  ON scrape_cache (last_access);
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for ``url`` and bump its LRU position."""
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT etag, last_modified, body_hash, result, fetched_at FROM scrape_cache WHERE url=?",
+                (url,),
+            ).fetchone()
+            if not row:
+                return None
+            self._accessed[url] = time.time()
+            if len(self._accessed) >= self.access_flush_batch:
+                self._flush_access(db)
+                db.commit()
+        etag, last_modified, digest, result, fetched_at = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_hash": digest,
+            "result": json.loads(result) if result else None,
+            "fetched_at": fetched_at,
+        }
+
+    def touch(self, url: str) -> None:
+        """Record that ``url`` was revalidated without a body change."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            self._accessed.pop(url, None)
+            db.execute("UPDATE scrape_cache SET fetched_at=?, last_access=? WHERE url=?", (now, now, url))
+            db.commit()
+
+    def put(
+        self,
+        url: str,
+        result: Dict[str, Any],
+        digest: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store the latest validators, body hash and parse result for ``url``."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                """
+                INSERT INTO scrape_cache
+                  (url, etag, last_modified, body_hash, result, fetched_at, last_access)
+                VALUES (?,?,?,?,?,?,?)
+                ON CONFLICT(url) DO UPDATE SET
+                  etag=excluded.etag,
+                  last_modified=excluded.last_modified,
+                  body_hash=excluded.body_hash,
+                  result=excluded.result,
+                  fetched_at=excluded.fetched_at,
+                  last_access=excluded.last_access
+                """,
+                (url, etag, last_modified, digest, json.dumps(result), now, now),
+            )
+            self._accessed.pop(url, None)
+            self._flush_access(db)
+            self._evict(db)
+            db.commit()
+
+    def _flush_access(self, db: sqlite3.Connection) -> None:
+        """Write buffered read times back (caller holds the lock and commits)."""
+        if not self._accessed:
+            return
+        pending, self._accessed = self._accessed, {}
+        db.executemany(
+            "UPDATE scrape_cache SET last_access=? WHERE url=? AND last_access<?",
+            [(ts, url, ts) for url, ts in pending.items()],
+        )
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        (count,) = db.execute("SELECT COUNT(*) FROM scrape_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            db.execute(
+                """
+                DELETE FROM scrape_cache WHERE url IN (
+                  SELECT url FROM scrape_cache ORDER BY last_access ASC LIMIT ?
+                )
+                """,
+                (excess,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._db().execute("SELECT COUNT(*) FROM scrape_cache").fetchone()
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses, "entries": len(self)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._flush_access(self._conn)
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
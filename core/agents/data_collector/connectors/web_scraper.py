@@ -2,15 +2,119 @@
 Simple web scraping tool to fetch a competitor price from a given URL.
 
 Note: The CSS selector used is an example and must be adapted to the actual target site.
+
+Two entry points are provided:
+
+* ``fetch_competitor_price(url)`` - blocking, uses ``requests``; kept for scripts.
+* ``fetch_competitor_price_async(url)`` / ``fetch_competitor_prices(urls)`` - run on
+  a shared ``aiohttp`` session with a pooled connector, per-host concurrency
+  limits and politeness delays, an overall fan-out cap and retries with jitter.
+  When a ``ScrapeCache`` is attached, requests are conditional and unchanged
+  bodies reuse the last extracted price instead of being parsed again.
+
+Parsing remembers which selector matched for each domain and tries it first,
+falling back to the full ``PRICE_SELECTORS`` list only on a miss. The parser
+backend is ``lxml`` when installed (override with ``SCRAPER_HTML_PARSER``).
+
+The module also registers the ``web_scraper`` collector connector.
 """
 from __future__ import annotations
 
+import asyncio
+import os
+import random
 import re
-from typing import Dict
+import threading
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Mapping, Optional
+from urllib.parse import urlsplit
 
 import requests
 from bs4 import BeautifulSoup
 
+from .base import ConnectorRequest, register_connector
+from .scrape_cache import ScrapeCache, body_hash
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1"
+}
+
+PRICE_SELECTORS = [
+    ".a-price .a-offscreen",
+    ".a-price-whole",
+    "span.a-price",
+    "#priceblock_ourprice",
+    "#priceblock_dealprice",
+    "#price_inside_buybox",
+    ".a-section.a-spacing-none.aok-align-center .a-price .a-offscreen",
+    "[data-a-color='price'] .a-offscreen",
+    "[itemprop='price']",
+    "meta[itemprop='price']",
+    ".price",
+    ".product-price"
+]
+
+# Status codes worth retrying; anything else in 4xx is final.
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def _default_parser() -> str:
+    """Pick the BeautifulSoup backend: SCRAPER_HTML_PARSER, else lxml if available."""
+    configured = os.getenv("SCRAPER_HTML_PARSER", "auto").strip().lower()
+    if configured and configured != "auto":
+        return configured
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+HTML_PARSER = _default_parser()
+
+
+class SelectorMemo:
+    """Remembers the last price selector that matched for each domain."""
+
+    def __init__(self) -> None:
+        self._by_domain: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, domain: str) -> Optional[str]:
+        with self._lock:
+            return self._by_domain.get(domain)
+
+    def record(self, domain: str, selector: str, memo_hit: bool) -> None:
+        with self._lock:
+            self._by_domain[domain] = selector
+            if memo_hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_domain.clear()
+            self.hits = self.misses = 0
+
+
+_SELECTOR_MEMO = SelectorMemo()
+
+
+def get_selector_memo() -> SelectorMemo:
+    return _SELECTOR_MEMO
+
 
 def _extract_price(text: str) -> float:
     """Best-effort extraction of a price number from text like "$1,234.56"."""
@@ -25,6 +129,46 @@ def _extract_price(text: str) -> float:
     return float(cleaned)
 
 
+def parse_price_html(
+    html: str,
+    url: str,
+    parser: Optional[str] = None,
+    memo: Optional[SelectorMemo] = _SELECTOR_MEMO,
+) -> Dict[str, object]:
+    """Extract the main product price from an HTML document.
+
+    Returns the same result shape as ``fetch_competitor_price``. Pass
+    ``memo=None`` to always walk the full selector list.
+    """
+    soup = BeautifulSoup(html, parser or HTML_PARSER)
+    domain = urlsplit(url).netloc.lower()
+
+    price_element = None
+    remembered = memo.get(domain) if memo is not None else None
+    if remembered:
+        price_element = soup.select_one(remembered)
+        if price_element:
+            memo.record(domain, remembered, memo_hit=True)
+
+    if not price_element:
+        for selector in PRICE_SELECTORS:
+            if selector == remembered:
+                continue
+            price_element = soup.select_one(selector)
+            if price_element:
+                if memo is not None:
+                    memo.record(domain, selector, memo_hit=False)
+                break
+
+    if not price_element:
+        return {"status": "error", "message": "price element not found - site may be blocking scraper"}
+
+    price_text = price_element.get("content") if price_element.has_attr("content") else price_element.get_text(strip=True)
+    price = _extract_price(price_text)
+
+    return {"status": "success", "price": price, "source": url}
+
+
 def fetch_competitor_price(url: str) -> Dict[str, object]:
     """Scrapes a given URL to find the main product price.
 
@@ -34,49 +178,253 @@ def fetch_competitor_price(url: str) -> Dict[str, object]:
         if not url or not isinstance(url, str):
             return {"status": "error", "message": "invalid url"}
 
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            ),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1"
-        }
-        resp = requests.get(url, headers=headers, timeout=15)
+        resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=15)
         resp.raise_for_status()
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        price_selectors = [
-            ".a-price .a-offscreen",
-            ".a-price-whole",
-            "span.a-price",
-            "#priceblock_ourprice",
-            "#priceblock_dealprice",
-            "#price_inside_buybox",
-            ".a-section.a-spacing-none.aok-align-center .a-price .a-offscreen",
-            "[data-a-color='price'] .a-offscreen",
-            "[itemprop='price']",
-            "meta[itemprop='price']",
-            ".price",
-            ".product-price"
-        ]
-        
-        price_element = None
-        for selector in price_selectors:
-            price_element = soup.select_one(selector)
-            if price_element:
-                break
+        return parse_price_html(resp.text, url)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
 
-        if not price_element:
-            return {"status": "error", "message": "price element not found - site may be blocking scraper"}
 
-        price_text = price_element.get("content") if price_element.has_attr("content") else price_element.get_text(strip=True)
-        price = _extract_price(price_text)
+class AsyncScraper:
+    """Concurrent scraper backed by a single pooled ``aiohttp`` session.
 
-        return {"status": "success", "price": price, "source": url}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    * ``concurrency`` caps in-flight requests across all hosts.
+    * ``per_host`` caps in-flight requests to any one host.
+    * ``host_delay_s`` is the minimum gap between request starts on a host.
+    * Failed requests (network errors, ``RETRY_STATUSES``) are retried up to
+      ``retries`` times with exponential backoff and full jitter.
+    * ``cache`` (optional) enables conditional requests and parse reuse.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 64,
+        per_host: int = 4,
+        host_delay_s: float = 0.25,
+        retries: int = 2,
+        backoff_s: float = 0.5,
+        timeout_s: float = 15.0,
+        cache: Optional[ScrapeCache] = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.host_delay_s = host_delay_s
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.timeout_s = timeout_s
+        self.cache = cache
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session = None
+        self._fanout: Optional[asyncio.Semaphore] = None
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._host_next: Dict[str, float] = {}
+
+    @classmethod
+    def from_env(cls) -> "AsyncScraper":
+        cache = None
+        if os.getenv("SCRAPE_CACHE", "1").lower() in ("1", "true", "yes"):
+            cache = ScrapeCache(max_entries=int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "10000")))
+        return cls(
+            concurrency=int(os.getenv("SCRAPER_CONCURRENCY", "64")),
+            per_host=int(os.getenv("SCRAPER_PER_HOST", "4")),
+            host_delay_s=float(os.getenv("SCRAPER_HOST_DELAY", "0.25")),
+            retries=int(os.getenv("SCRAPER_RETRIES", "2")),
+            timeout_s=float(os.getenv("SCRAPER_TIMEOUT", "15")),
+            cache=cache,
+        )
+
+    async def _ensure_session(self):
+        """Create the session and limits on first use in the current loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._loop is loop and not self._session.closed:
+            return self._session
+
+        import aiohttp
+
+        self._loop = loop
+        self._fanout = asyncio.Semaphore(self.concurrency)
+        self._host_sems.clear()
+        self._host_locks.clear()
+        self._host_next.clear()
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.per_host,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=DEFAULT_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout_s),
+        )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.cache is not None:
+            self.cache.close()
+
+    async def _polite_wait(self, host: str) -> None:
+        """Space out request starts on ``host`` by at least ``host_delay_s``."""
+        if self.host_delay_s <= 0:
+            return
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            start = max(now, self._host_next.get(host, 0.0))
+            self._host_next[host] = start + self.host_delay_s
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff_s * (2 ** attempt))
+
+    async def _get(self, session, url: str, headers: Optional[Dict[str, str]] = None):
+        """GET ``url`` and return ``(status, headers, text)``."""
+        async with session.get(url, headers=headers) as resp:
+            # Copy keeps the case-insensitive multidict semantics
+            return resp.status, resp.headers.copy(), await resp.text(errors="replace")
+
+    async def _conditional_headers(self, url: str) -> tuple:
+        """Return ``(cache_entry, headers)`` for a conditional GET of ``url``."""
+        if self.cache is None:
+            return None, None
+        entry = await asyncio.to_thread(self.cache.get, url)
+        if not entry:
+            return None, None
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return entry, headers or None
+
+    async def _handle_body(
+        self, url: str, entry: Optional[Dict], resp_headers: Mapping[str, str], text: str
+    ) -> Dict[str, object]:
+        """Parse ``text`` unless its hash matches the cached body."""
+        if self.cache is None:
+            return await asyncio.to_thread(parse_price_html, text, url)
+
+        digest = body_hash(text)
+        if entry and entry.get("body_hash") == digest and entry.get("result"):
+            self.cache.hits += 1
+            result = dict(entry["result"])
+        else:
+            self.cache.misses += 1
+            result = await asyncio.to_thread(parse_price_html, text, url)
+        await asyncio.to_thread(
+            self.cache.put,
+            url,
+            result,
+            digest,
+            resp_headers.get("ETag"),
+            resp_headers.get("Last-Modified"),
+        )
+        return result
+
+    async def fetch(self, url: str) -> Dict[str, object]:
+        """Fetch and parse one URL. Never raises; errors come back as a result dict."""
+        if not url or not isinstance(url, str):
+            return {"status": "error", "message": "invalid url"}
+        try:
+            session = await self._ensure_session()
+            host = urlsplit(url).netloc.lower()
+            host_sem = self._host_sems.setdefault(host, asyncio.Semaphore(self.per_host))
+            entry, cond_headers = await self._conditional_headers(url)
+
+            last_error = "request failed"
+            async with self._fanout, host_sem:
+                for attempt in range(self.retries + 1):
+                    await self._polite_wait(host)
+                    try:
+                        status, resp_headers, text = await self._get(session, url, cond_headers)
+                    except (asyncio.TimeoutError, OSError) as e:
+                        last_error = str(e) or type(e).__name__
+                    except Exception as e:
+                        # aiohttp.ClientError and friends
+                        last_error = str(e) or type(e).__name__
+                    else:
+                        if status == 304 and entry and entry.get("result"):
+                            self.cache.revalidated += 1
+                            await asyncio.to_thread(self.cache.touch, url)
+                            return dict(entry["result"])
+                        if status < 400:
+                            return await self._handle_body(url, entry, resp_headers, text)
+                        last_error = f"HTTP {status}"
+                        if status not in RETRY_STATUSES:
+                            break
+                    if attempt < self.retries:
+                        await asyncio.sleep(self._backoff(attempt))
+            return {"status": "error", "message": last_error}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    async def fetch_many(self, urls: List[str]) -> List[Dict[str, object]]:
+        """Fetch ``urls`` concurrently; results are in the same order as ``urls``."""
+        return list(await asyncio.gather(*(self.fetch(u) for u in urls)))
+
+
+_SCRAPER: Optional[AsyncScraper] = None
+
+
+def get_async_scraper() -> AsyncScraper:
+    global _SCRAPER
+    if _SCRAPER is None:
+        _SCRAPER = AsyncScraper.from_env()
+    return _SCRAPER
+
+
+async def close_async_scraper() -> None:
+    """Close the shared scraper's session and cache (call on shutdown)."""
+    global _SCRAPER
+    scraper, _SCRAPER = _SCRAPER, None
+    if scraper is not None:
+        await scraper.close()
+
+
+async def fetch_competitor_price_async(url: str) -> Dict[str, object]:
+    """Async counterpart of ``fetch_competitor_price`` using the shared scraper."""
+    return await get_async_scraper().fetch(url)
+
+
+async def fetch_competitor_prices(urls: List[str]) -> List[Dict[str, object]]:
+    """Fetch many URLs concurrently using the shared scraper."""
+    return await get_async_scraper().fetch_many(urls)
+
+
+@register_connector(
+    "web_scraper",
+    concurrency=8,
+    requires_urls=True,
+    description="Competitor prices scraped from product pages",
+)
+async def web_scraper_connector(req: ConnectorRequest) -> AsyncIterator[List[Dict[str, object]]]:
+    """Yield one tick per URL as soon as its page has been scraped."""
+    scraper = get_async_scraper()
+    pending = [asyncio.ensure_future(_fetch_with_url(scraper, u)) for u in req.urls]
+    try:
+        for fut in asyncio.as_completed(pending):
+            url, result = await fut
+            if result.get("status") != "success" or "price" not in result:
+                print(f"[DataCollector] Failed to scrape {url}: {result.get('message')}")
+                continue
+            yield [{
+                "sku": req.sku,
+                "market": req.market,
+                "our_price": 0.0,  # Will be updated from product catalog
+                "competitor_price": float(result["price"]),
+                "demand_index": 1.0,
+                "ts": datetime.now(timezone.utc).isoformat(),
+                "source": f"web_scraper:{url}",
+            }]
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+async def _fetch_with_url(scraper: AsyncScraper, url: str):
+    return url, await scraper.fetch(url)
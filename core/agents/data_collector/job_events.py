@@ -0,0 +1,169 @@
+"""
+In-process job completion notifications.
+
+``DataRepo.mark_job_done`` / ``mark_job_failed`` and the ``market.fetch.done``
+topic resolve per-job futures here, so callers can ``await`` a job instead of
+polling ``get_job_status``. A waiting job costs one future and nothing else.
+
+Jobs that run in another process (e.g. the stdio MCP data collector) never
+notify this registry, so ``wait_for_job`` can take a ``check`` callable that
+is invoked once up front and then on a fallback interval that doubles up to
+a ceiling.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("job_events")
+
+TERMINAL_STATUSES = {"DONE", "FAILED", "CANCELLED"}
+
+
+class JobWaiters:
+    def __init__(self, max_recent: int = 10000) -> None:
+        self._lock = threading.Lock()
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        # Recently finished jobs, so waiters arriving after completion return at once
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._max_recent = max_recent
+        self._subscribed = False
+
+    def notify(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """Record a terminal status for ``job_id`` and wake its waiters."""
+        if not job_id or status not in TERMINAL_STATUSES:
+            return
+        outcome = {"job_id": job_id, "status": status, "error": error}
+        with self._lock:
+            self._recent[job_id] = outcome
+            self._recent.move_to_end(job_id)
+            while len(self._recent) > self._max_recent:
+                self._recent.popitem(last=False)
+            waiters = self._waiters.pop(job_id, [])
+        for loop, fut in waiters:
+            if loop.is_closed():
+                continue
+            loop.call_soon_threadsafe(_resolve, fut, outcome)
+
+    def get_recent(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._recent.get(job_id)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._waiters.values())
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait for ``job_id`` to finish; returns its outcome or None on timeout."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            done = self._recent.get(job_id)
+            if done is not None:
+                return done
+            fut = loop.create_future()
+            self._waiters.setdefault(job_id, []).append((loop, fut))
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if not fut.done():
+                fut.cancel()
+            with self._lock:
+                entries = self._waiters.get(job_id)
+                if entries:
+                    entries[:] = [e for e in entries if e[1] is not fut]
+                    if not entries:
+                        self._waiters.pop(job_id, None)
+
+    def subscribe_bus(self) -> None:
+        """Also resolve waiters from bus events (covers publishers in other components)."""
+        if self._subscribed:
+            return
+        try:
+            from core.agents.agent_sdk.bus_factory import get_bus
+            from core.agents.agent_sdk.protocol import Topic
+
+            bus = get_bus()
+            bus.subscribe(Topic.MARKET_FETCH_DONE.value, self._on_bus_event)
+            bus.subscribe(Topic.MARKET_FETCH_ACK.value, self._on_bus_event)
+            self._subscribed = True
+        except Exception as e:
+            logger.debug(f"JobWaiters bus subscription unavailable: {e}")
+
+    def _on_bus_event(self, payload: Any) -> None:
+        if isinstance(payload, dict):
+            status, error = str(payload.get("status") or ""), payload.get("error")
+            self.notify(str(payload.get("job_id") or ""), status, error)
+            if payload.get("request_id"):
+                # Requesters only know their request_id until the ACK arrives
+                self.notify(request_key(str(payload["request_id"])), status, error)
+
+
+def request_key(request_id: str) -> str:
+    """Waiter key for the job created from MARKET_FETCH_REQUEST ``request_id``."""
+    return f"request:{request_id}"
+
+
+def _resolve(fut: asyncio.Future, outcome: Dict[str, Any]) -> None:
+    if not fut.done():
+        fut.set_result(outcome)
+
+
+_WAITERS: Optional[JobWaiters] = None
+
+
+def get_job_waiters() -> JobWaiters:
+    global _WAITERS
+    if _WAITERS is None:
+        _WAITERS = JobWaiters()
+        _WAITERS.subscribe_bus()
+    return _WAITERS
+
+
+async def wait_for_job(
+    job_id: str,
+    timeout_s: float,
+    check: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+    fallback_interval_s: float = 0.5,
+    max_fallback_interval_s: float = 5.0,
+) -> Optional[str]:
+    """Wait for a job to reach a terminal status and return it (None on timeout).
+
+    ``check`` should return the job's current status; it is called once before
+    waiting and then with a backoff from ``fallback_interval_s`` to
+    ``max_fallback_interval_s`` in case the job finishes somewhere that cannot
+    notify this process.
+    """
+    waiters = get_job_waiters()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
+    status: Optional[str] = None
+    interval = fallback_interval_s
+
+    while True:
+        if check is not None:
+            try:
+                status = await check()
+            except Exception as e:
+                logger.debug(f"wait_for_job status check failed: {e}")
+            if status in TERMINAL_STATUSES:
+                return status
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return status
+        step = remaining if check is None else min(remaining, interval)
+        outcome = await waiters.wait(job_id, timeout=step)
+        if outcome is not None:
+            return outcome["status"]
+        interval = min(interval * 2, max_fallback_interval_s)
+
+
+async def wait_for_request(request_id: str, timeout_s: float) -> Optional[str]:
+    """Wait for the job started by fetch request ``request_id``; returns its terminal
+    status, or None on timeout (e.g. a collector in another process)."""
+    outcome = await get_job_waiters().wait(request_key(request_id), timeout=timeout_s)
+    return outcome["status"] if outcome else None
@@ -23,15 +23,16 @@ except Exception:  # minimal fallback shim
 
 from .repo import DataRepo
 from .collector import DataCollector
-from .connectors.mock import mock_ticks
+from .connectors.base import connector_names, get_connector, list_connectors
 from ..agent_sdk.health_tools import ping, version, health
 from ..agent_sdk.auth import verify_capability, AuthError, get_auth_metrics
+from ..agent_sdk.batch import run_batch
 
 # Input validation schemas using Pydantic
 class StartCollectionRequest(BaseModel):
     sku: str = Field(..., min_length=1)
     market: str = Field("DEFAULT", min_length=1)
-    connector: str = Field("mock", pattern=r"^(mock|web_scraper|api)$")
+    connector: str = Field("mock", min_length=1)
     depth: int = Field(1, ge=1, le=100)
 
 class FetchMarketFeaturesRequest(BaseModel):
@@ -48,7 +49,21 @@ class JobStatusRequest(BaseModel):
 
 mcp = FastMCP("data-collector-service")
 _repo = DataRepo()
-_collector = DataCollector(_repo)
+_collector: Optional[DataCollector] = None
+
+
+def start_collector(subscribe: bool = True) -> DataCollector:
+    """Create the server's collector. Only the stdio server process subscribes it
+    to MARKET_FETCH_REQUEST; when the tools are imported in-process the host
+    already runs its own collector on that bus."""
+    global _collector
+    if _collector is None:
+        _collector = DataCollector(_repo, subscribe=subscribe)
+    return _collector
+
+
+def _get_collector() -> DataCollector:
+    return _collector or start_collector(subscribe=False)
 
 
 def _since_iso_from_window(window: str) -> str:
@@ -108,7 +123,7 @@ async def ingest_tick(d: dict, capability_token: str = "") -> dict:
     try:
         verify_capability(capability_token, "write")
         await _repo.init()
-        await _collector.ingest_tick(d)
+        await _get_collector().ingest_tick(d)
         return {"ok": True}
     except AuthError as e:
         return {"ok": False, "error": "auth_error", "message": str(e)}
@@ -150,18 +165,29 @@ async def import_product_catalog(rows: list, capability_token: str = "") -> dict
         return {"ok": False, "error": "internal_error", "message": str(e)}
 
 
+def _source_urls(sku: str) -> List[str]:
+    """Product page URLs for ``sku`` (the source_url column is added by a migration)."""
+    import sqlite3
+
+    try:
+        with sqlite3.connect(f"file:{_repo.path.as_posix()}?mode=ro", uri=True) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT source_url FROM product_catalog WHERE sku = ? AND source_url IS NOT NULL",
+                (sku,),
+            ).fetchall()
+    except sqlite3.Error:
+        return []
+    return [r[0] for r in rows if r[0]]
+
+
 async def _run_job(job_id: str, sku: str, market: str, connector: str, depth: int) -> None:
     """Background job runner: marks RUNNING, ingests, then DONE/FAILED."""
     print(f"[mcp_job] start job id={job_id} sku={sku} connector={connector} depth={depth}")
     try:
         await _repo.mark_job_running(job_id)
-        if connector == "mock":
-            await _collector.ingest_stream(
-                mock_ticks(sku=sku, market=market, n=max(1, int(depth))),
-                delay_s=0.15,
-            )
-        else:
-            raise ValueError(f"unsupported_connector: {connector}")
+        spec = get_connector(connector)
+        urls = _source_urls(sku) if spec is not None and spec.requires_urls else []
+        await _get_collector().collect(sku, market, [connector], depth, urls)
         await _repo.mark_job_done(job_id)
         print(f"[mcp_job] done job id={job_id}")
     except Exception as e:
@@ -196,11 +222,11 @@ async def start_collection(
         await _repo.init()
 
         # Validate connector support
-        if request.connector not in ["mock"]:  # Extend as more connectors are added
+        if get_connector(request.connector) is None:
             return {
                 "ok": False, 
                 "error": "unsupported_connector", 
-                "supported_connectors": ["mock"]
+                "supported_connectors": connector_names()
             }
 
         job_id = await _repo.create_job(request.sku, request.market, request.connector, request.depth)
@@ -258,21 +284,10 @@ async def list_sources(capability_token: str = "") -> dict:
         # Validate auth
         verify_capability(capability_token, "read")
         # In production, this would check actual connector health
+        now = datetime.now(timezone.utc).isoformat()
         sources = [
-            {
-                "name": "mock",
-                "type": "mock", 
-                "status": "active",
-                "description": "Mock data generator for testing",
-                "last_check": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "name": "web_scraper", 
-                "type": "web_scraper",
-                "status": "inactive",
-                "description": "Web scraping data connector",
-                "last_check": datetime.now(timezone.utc).isoformat()
-            }
+            {**spec.info(), "type": spec.name, "status": "active", "last_check": now}
+            for spec in list_connectors()
         ]
         
         return {
@@ -287,6 +302,23 @@ async def list_sources(capability_token: str = "") -> dict:
         return {"ok": False, "error": "internal_error", "message": str(e)}
 
 
+@mcp.tool()
+async def batch_call(calls: list, capability_token: str = "") -> dict:
+    """Run several tools in one round trip; results are ordered and may partially fail."""
+    try:
+        tools = {
+            "fetch_market_features": fetch_market_features,
+            "ingest_tick": ingest_tick,
+            "import_product_catalog": import_product_catalog,
+            "start_collection": start_collection,
+            "get_job_status": get_job_status,
+            "list_sources": list_sources,
+        }
+        return await run_batch(tools, calls, capability_token=capability_token)
+    except Exception as e:
+        return {"ok": False, "error": "internal_error", "message": str(e)}
+
+
 # Health tools
 @mcp.tool()
 async def ping_health() -> dict:
@@ -340,6 +372,7 @@ def _call_mcp_run() -> None:
 
 def serve() -> None:
     asyncio.run(_repo.init())
+    start_collector()
     _call_mcp_run()
 
 
@@ -347,6 +380,7 @@ def serve() -> None:
 async def main():
     # Initialize repository, then run the server in a separate thread to avoid nested event loops
     await _repo.init()
+    start_collector()
     loop = asyncio.get_running_loop()
     await loop.run_in_executor(None, _call_mcp_run)
 
@@ -0,0 +1,135 @@
+"""
+Shared SKU -> owner_id lookup over ``product_catalog``.
+
+The alert engine and alert tools resolve the owning user of every alerted SKU;
+this bounded LRU answers repeat lookups from memory. Misses are cached too, so
+an unknown SKU on a hot tick stream is queried once.
+
+``DataRepo`` invalidates entries whenever a catalog upload or delete changes
+an owner's products, and ``preload`` bulk-loads the catalog at startup.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Union
+
+import aiosqlite
+
+logger = logging.getLogger("owner_cache")
+
+_MISS = ""  # cached "no owner" marker; owner ids are never empty
+
+
+class OwnerLookup:
+    def __init__(self, db_path: Union[str, Path, None] = None, max_entries: Optional[int] = None) -> None:
+        self.db_path = Path(db_path or os.getenv("DATA_DB", "app/data.db"))
+        self.max_entries = max_entries or int(os.getenv("OWNER_CACHE_SIZE", "50000"))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._by_owner: Dict[str, Set[str]] = {}
+        self._missing: Set[str] = set()
+        # Bumped on invalidation so in-flight lookups don't cache stale owners
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _forget(self, sku: str, owner_id: Optional[str]) -> None:
+        if owner_id:
+            self._by_owner.get(owner_id, set()).discard(sku)
+        else:
+            self._missing.discard(sku)
+
+    def _put(self, sku: str, owner_id: str) -> None:
+        if sku in self._entries:
+            self._forget(sku, self._entries.pop(sku))
+        self._entries[sku] = owner_id
+        if owner_id:
+            self._by_owner.setdefault(owner_id, set()).add(sku)
+        else:
+            self._missing.add(sku)
+        while len(self._entries) > self.max_entries:
+            self._forget(*self._entries.popitem(last=False))
+
+    async def get(self, sku: str) -> Optional[str]:
+        with self._lock:
+            cached = self._entries.get(sku)
+            if cached is not None:
+                self._entries.move_to_end(sku)
+                self.hits += 1
+                return cached or None
+            self.misses += 1
+            generation = self._generation
+        try:
+            async with aiosqlite.connect(self.db_path.as_posix()) as db:
+                cur = await db.execute(
+                    "SELECT owner_id FROM product_catalog WHERE sku=? LIMIT 1",
+                    (sku,),
+                )
+                row = await cur.fetchone()
+        except Exception as e:
+            logger.warning(f"Failed to fetch owner_id for SKU {sku}: {e}")
+            return None
+        owner_id = str(row[0]) if row and row[0] is not None else None
+        with self._lock:
+            if generation == self._generation:
+                self._put(sku, owner_id or _MISS)
+        return owner_id
+
+    async def preload(self) -> int:
+        """Bulk-load SKU owners from the catalog (up to ``max_entries``)."""
+        try:
+            async with aiosqlite.connect(self.db_path.as_posix()) as db:
+                cur = await db.execute(
+                    "SELECT sku, owner_id FROM product_catalog ORDER BY updated_at DESC LIMIT ?",
+                    (self.max_entries,),
+                )
+                rows = await cur.fetchall()
+        except Exception as e:
+            logger.warning(f"Owner cache preload failed: {e}")
+            return 0
+        with self._lock:
+            # Oldest first so the most recently updated SKUs end up hottest
+            for sku, owner_id in reversed(rows):
+                if sku and owner_id is not None:
+                    self._put(str(sku), str(owner_id))
+        return len(rows)
+
+    def invalidate_owner(self, owner_id: str, skus: Optional[Iterable[str]] = None) -> None:
+        """Drop cached entries affected by a catalog change for ``owner_id``.
+
+        Cached misses are dropped as well, since an upload may have added SKUs
+        that were previously unknown.
+        """
+        with self._lock:
+            self._generation += 1
+            stale = self._by_owner.pop(str(owner_id), set()) | self._missing
+            if skus is not None:
+                stale.update(str(s) for s in skus)
+            for sku in stale:
+                if sku in self._entries:
+                    self._forget(sku, self._entries.pop(sku))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_owner.clear()
+            self._missing.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_lookup: Optional[OwnerLookup] = None
+
+
+def get_owner_lookup() -> OwnerLookup:
+    global _lookup
+    if _lookup is None:
+        _lookup = OwnerLookup()
+    return _lookup
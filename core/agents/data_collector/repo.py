@@ -1,19 +1,68 @@
 from __future__ import annotations
 
+import base64
+import json
 import os
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List, Sequence, Tuple
 
 import aiosqlite
 import uuid
 import sqlite3
 
+from .job_events import get_job_waiters
+from .owner_cache import get_owner_lookup
+
+
+PRODUCT_FIELDS: Tuple[str, ...] = (
+    "sku",
+    "owner_id",
+    "title",
+    "currency",
+    "current_price",
+    "cost",
+    "stock",
+    "updated_at",
+)
+
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _projection(fields: Optional[Sequence[str]]) -> List[str]:
+    """Validate a field projection against PRODUCT_FIELDS.
+
+    Returns the requested fields in PRODUCT_FIELDS order, or every field when
+    none are given. Raises ValueError for unknown names.
+    """
+    if not fields:
+        return list(PRODUCT_FIELDS)
+    unknown = [f for f in fields if f not in PRODUCT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown product fields: {', '.join(unknown)}")
+    return [f for f in PRODUCT_FIELDS if f in fields]
+
+
+def encode_cursor(updated_at: Optional[str], sku: str) -> str:
+    """Encode an (updated_at, sku) keyset position as an opaque token."""
+    raw = json.dumps([updated_at, sku], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], str]:
+    """Decode a token produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, sku = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if not isinstance(sku, str) or not (updated_at is None or isinstance(updated_at, str)):
+        raise ValueError("Invalid cursor: malformed keyset")
+    return updated_at, sku
+
+
 class DataRepo:
     """
     Minimal repo for market ticks. Uses SQLite at DATA_DB or app/data.db.
@@ -61,6 +110,11 @@ class DataRepo:
                 CREATE INDEX IF NOT EXISTS idx_product_catalog_owner_id 
                    ON product_catalog(owner_id);
 
+                -- Keyset pagination on (updated_at, sku) per owner; NULL updated_at sorts as ''
+                DROP INDEX IF EXISTS idx_product_catalog_owner_updated_sku;
+                CREATE INDEX IF NOT EXISTS idx_product_catalog_owner_keyset
+                   ON product_catalog(owner_id, COALESCE(updated_at, ''), sku);
+
                 CREATE TABLE IF NOT EXISTS ingestion_jobs (
                   id TEXT PRIMARY KEY,
                   sku TEXT,
@@ -74,6 +128,39 @@ class DataRepo:
                   finished_at TEXT
                 );
 
+                -- Per-SKU freshness index maintained on ingest and job completion.
+                -- last_tick_ts is '' until the first tick so that a single range
+                -- scan (last_tick_ts < cutoff) also returns never-collected SKUs.
+                CREATE TABLE IF NOT EXISTS sku_freshness (
+                  sku TEXT NOT NULL,
+                  market TEXT NOT NULL DEFAULT 'DEFAULT',
+                  last_tick_ts TEXT NOT NULL DEFAULT '',
+                  tick_count INTEGER NOT NULL DEFAULT 0,
+                  last_job_status TEXT,
+                  last_job_at TEXT,
+                  PRIMARY KEY (sku, market)
+                );
+
+                CREATE INDEX IF NOT EXISTS ix_sku_freshness_market_last_tick
+                  ON sku_freshness (market, last_tick_ts);
+
+                CREATE TABLE IF NOT EXISTS catalog_import_jobs (
+                  id TEXT PRIMARY KEY,
+                  owner_id TEXT NOT NULL,
+                  filename TEXT,
+                  format TEXT,
+                  status TEXT,
+                  rows_processed INTEGER DEFAULT 0,
+                  rows_inserted INTEGER DEFAULT 0,
+                  rows_rejected INTEGER DEFAULT 0,
+                  chunks INTEGER DEFAULT 0,
+                  errors TEXT,
+                  error TEXT,
+                  created_at TEXT,
+                  updated_at TEXT,
+                  finished_at TEXT
+                );
+
                 CREATE TABLE IF NOT EXISTS price_proposals (
                   id TEXT PRIMARY KEY,
                   sku TEXT,
@@ -85,8 +172,27 @@ class DataRepo:
                 );
                 """
             )
+            await self._backfill_freshness(db)
             await db.commit()
 
+    async def _backfill_freshness(self, db: aiosqlite.Connection) -> None:
+        """Populate sku_freshness once for databases that predate it."""
+        cur = await db.execute("SELECT 1 FROM sku_freshness LIMIT 1")
+        if await cur.fetchone():
+            return
+        await db.execute(
+            """
+            INSERT OR IGNORE INTO sku_freshness (sku, market, last_tick_ts, tick_count)
+            SELECT sku, market, MAX(ts), COUNT(*) FROM market_ticks GROUP BY sku, market
+            """
+        )
+        await db.execute(
+            """
+            INSERT OR IGNORE INTO sku_freshness (sku, market)
+            SELECT DISTINCT sku, 'DEFAULT' FROM product_catalog
+            """
+        )
+
     async def insert_tick(self, d: Dict[str, Any]) -> None:
         # Expect ISO ts; if missing, use now
         ts = d.get("ts") or _utc_now_iso()
@@ -109,7 +215,58 @@ class DataRepo:
                     _utc_now_iso(),
                 ),
             )
+            await db.execute(
+                """
+                INSERT INTO sku_freshness (sku, market, last_tick_ts, tick_count)
+                VALUES (?,?,?,1)
+                ON CONFLICT(sku, market) DO UPDATE SET
+                  last_tick_ts=MAX(last_tick_ts, excluded.last_tick_ts),
+                  tick_count=tick_count + 1
+                """,
+                (d["sku"], d.get("market", "DEFAULT"), ts),
+            )
+            await db.commit()
+
+    async def insert_ticks(self, ticks: Sequence[Dict[str, Any]]) -> int:
+        """Insert a batch of ticks in one transaction; returns the number inserted."""
+        if not ticks:
+            return 0
+        now = _utc_now_iso()
+        rows = [
+            (
+                d["sku"],
+                d.get("market", "DEFAULT"),
+                float(d["our_price"]),
+                d.get("competitor_price"),
+                d.get("demand_index"),
+                d.get("ts") or now,
+                d.get("source", "unknown"),
+                now,
+            )
+            for d in ticks
+        ]
+        async with aiosqlite.connect(self.path.as_posix()) as db:
+            await db.executemany(
+                """
+                INSERT INTO market_ticks
+                  (sku, market, our_price, competitor_price, demand_index, ts,
+                   source, ingested_at)
+                VALUES (?,?,?,?,?,?,?,?)
+                """,
+                rows,
+            )
+            await db.executemany(
+                """
+                INSERT INTO sku_freshness (sku, market, last_tick_ts, tick_count)
+                VALUES (?,?,?,1)
+                ON CONFLICT(sku, market) DO UPDATE SET
+                  last_tick_ts=MAX(last_tick_ts, excluded.last_tick_ts),
+                  tick_count=tick_count + 1
+                """,
+                [(r[0], r[1], r[5]) for r in rows],
+            )
             await db.commit()
+        return len(rows)
 
     async def features_for(
         self, sku: str, market: str, since_iso: str
@@ -203,10 +360,15 @@ class DataRepo:
             """
         )
 
+        freshness_params = [(p[0],) for p in params]
+        freshness_sql = "INSERT OR IGNORE INTO sku_freshness (sku, market) VALUES (?, 'DEFAULT')"
+
         async with aiosqlite.connect(self.path.as_posix()) as db:
             try:
                 await db.executemany(insert_sql, params)
+                await db.executemany(freshness_sql, freshness_params)
                 await db.commit()
+                get_owner_lookup().invalidate_owner(owner_id, [p[0] for p in params])
                 return len(params)
             except Exception:
                 processed = 0
@@ -247,7 +409,9 @@ class DataRepo:
                             ),
                         )
                         processed += 1
+                await db.executemany(freshness_sql, freshness_params)
                 await db.commit()
+                get_owner_lookup().invalidate_owner(owner_id, [p[0] for p in params])
                 return processed
 
     async def get_products_by_owner(self, owner_id: str) -> List[Dict[str, Any]]:
@@ -266,6 +430,84 @@ class DataRepo:
             rows = await cur.fetchall()
         return [dict(row) for row in rows]
 
+    async def get_products_page(
+        self,
+        owner_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return one page of an owner's products, newest first.
+
+        Pages are keyed on (updated_at, sku) so each request is an index range
+        scan regardless of how deep into the catalog the caller is. Rows with
+        no updated_at sort as '' (last) so they are still reachable. Returns
+        ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+        """
+        limit = max(1, int(limit))
+        selected = _projection(fields)
+        columns = list(dict.fromkeys(selected + ["updated_at", "sku"]))
+
+        where = "owner_id=?"
+        params: List[Any] = [owner_id]
+        if cursor:
+            after_updated_at, after_sku = decode_cursor(cursor)
+            after_updated_at = after_updated_at or ""
+            where += " AND (COALESCE(updated_at, '') < ? OR (COALESCE(updated_at, '') = ? AND sku < ?))"
+            params.extend([after_updated_at, after_updated_at, after_sku])
+        params.append(limit + 1)
+
+        async with aiosqlite.connect(self.path.as_posix()) as db:
+            db.row_factory = aiosqlite.Row
+            cur = await db.execute(
+                f"""
+                SELECT {", ".join(columns)}
+                FROM product_catalog
+                WHERE {where}
+                ORDER BY COALESCE(updated_at, '') DESC, sku DESC
+                LIMIT ?
+                """,
+                params,
+            )
+            rows = await cur.fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["updated_at"] or "", last["sku"])
+        return [{k: row[k] for k in selected} for row in rows], next_cursor
+
+    async def iter_products_by_owner(
+        self,
+        owner_id: str,
+        fields: Optional[Sequence[str]] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream an owner's products from a server-side cursor.
+
+        Rows are fetched ``batch_size`` at a time so memory stays flat no
+        matter how large the catalog is.
+        """
+        selected = _projection(fields)
+        async with aiosqlite.connect(self.path.as_posix()) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(
+                f"""
+                SELECT {", ".join(selected)}
+                FROM product_catalog
+                WHERE owner_id=?
+                ORDER BY COALESCE(updated_at, '') DESC, sku DESC
+                """,
+                (owner_id,),
+            ) as cur:
+                while True:
+                    rows = await cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(row)
+
     async def get_product_by_sku_and_owner(self, sku: str, owner_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a specific product by SKU and owner_id."""
         async with aiosqlite.connect(self.path.as_posix()) as db:
@@ -292,6 +534,7 @@ class DataRepo:
                 (sku, owner_id),
             )
             await db.commit()
+        get_owner_lookup().invalidate_owner(owner_id, [sku])
         return cursor.rowcount
 
     async def delete_all_products_by_owner(self, owner_id: str) -> int:
@@ -305,6 +548,7 @@ class DataRepo:
                 (owner_id,),
             )
             await db.commit()
+        get_owner_lookup().invalidate_owner(owner_id)
         return cursor.rowcount
 
     async def create_job(
@@ -361,7 +605,9 @@ class DataRepo:
                 """,
                 ("DONE", _utc_now_iso(), job_id),
             )
+            await self._record_job_freshness(db, job_id, "DONE")
             await db.commit()
+        get_job_waiters().notify(job_id, "DONE")
 
     async def mark_job_failed(self, job_id: str, error: str) -> None:
         """Mark an ingestion job as FAILED with an error message."""
@@ -374,20 +620,56 @@ class DataRepo:
                 """,
                 ("FAILED", str(error), _utc_now_iso(), job_id),
             )
+            await self._record_job_freshness(db, job_id, "FAILED")
             await db.commit()
+        get_job_waiters().notify(job_id, "FAILED", str(error))
 
-    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Return a job row as a dict, or None if not found."""
+    async def _record_job_freshness(self, db: aiosqlite.Connection, job_id: str, status: str) -> None:
+        await db.execute(
+            """
+            INSERT INTO sku_freshness (sku, market, last_job_status, last_job_at)
+            SELECT sku, COALESCE(market, 'DEFAULT'), ?, ? FROM ingestion_jobs
+            WHERE id=? AND sku IS NOT NULL
+            ON CONFLICT(sku, market) DO UPDATE SET
+              last_job_status=excluded.last_job_status,
+              last_job_at=excluded.last_job_at
+            """,
+            (status, _utc_now_iso(), job_id),
+        )
+
+    async def mark_sku_not_collectable(self, sku: str, market: str = "DEFAULT") -> None:
+        """Record in sku_freshness that ``sku`` has no source to collect from."""
         async with aiosqlite.connect(self.path.as_posix()) as db:
-            cur = await db.execute(
+            await db.execute(
                 """
-                SELECT id, sku, market, connector, depth, status, error,
-                       created_at, started_at, finished_at
-                FROM ingestion_jobs
-                WHERE id=?
+                INSERT INTO sku_freshness (sku, market, last_job_status, last_job_at)
+                VALUES (?, ?, 'NO_SOURCE', ?)
+                ON CONFLICT(sku, market) DO UPDATE SET
+                  last_job_status=excluded.last_job_status,
+                  last_job_at=excluded.last_job_at
                 """,
-                (job_id,),
+                (sku, market, _utc_now_iso()),
             )
+            await db.commit()
+
+    async def get_job(self, job_id: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return a job row as a dict, or None if not found.
+
+        With ``owner_id`` the job is only returned when its SKU is in that
+        owner's catalog; ingestion jobs carry no owner of their own.
+        """
+        q = """
+            SELECT id, sku, market, connector, depth, status, error,
+                   created_at, started_at, finished_at
+            FROM ingestion_jobs
+            WHERE id=?
+        """
+        params: List[Any] = [job_id]
+        if owner_id is not None:
+            q += " AND EXISTS (SELECT 1 FROM product_catalog pc WHERE pc.sku = ingestion_jobs.sku AND pc.owner_id = ?)"
+            params.append(owner_id)
+        async with aiosqlite.connect(self.path.as_posix()) as db:
+            cur = await db.execute(q, params)
             row = await cur.fetchone()
         if not row:
             return None
@@ -405,6 +687,78 @@ class DataRepo:
         ]
         return {k: row[i] for i, k in enumerate(keys)}
 
+    async def create_catalog_import_job(self, owner_id: str, filename: str, fmt: str) -> str:
+        """Create a QUEUED catalog import job and return its id (uuid4)."""
+        job_id = str(uuid.uuid4())
+        now = _utc_now_iso()
+        async with aiosqlite.connect(self.path.as_posix()) as db:
+            await db.execute(
+                """
+                INSERT INTO catalog_import_jobs
+                  (id, owner_id, filename, format, status, created_at, updated_at)
+                VALUES (?,?,?,?,?,?,?)
+                """,
+                (job_id, owner_id, filename, fmt, "QUEUED", now, now),
+            )
+            await db.commit()
+        return job_id
+
+    async def update_catalog_import_job(
+        self,
+        job_id: str,
+        status: Optional[str] = None,
+        rows_processed: Optional[int] = None,
+        rows_inserted: Optional[int] = None,
+        rows_rejected: Optional[int] = None,
+        chunks: Optional[int] = None,
+        errors: Optional[List[str]] = None,
+        error: Optional[str] = None,
+        finished: bool = False,
+    ) -> None:
+        """Update progress counters and/or status of a catalog import job."""
+        now = _utc_now_iso()
+        values: Dict[str, Any] = {
+            "status": status,
+            "rows_processed": rows_processed,
+            "rows_inserted": rows_inserted,
+            "rows_rejected": rows_rejected,
+            "chunks": chunks,
+            "errors": json.dumps(errors) if errors is not None else None,
+            "error": error,
+        }
+        sets = {k: v for k, v in values.items() if v is not None}
+        sets["updated_at"] = now
+        if finished:
+            sets["finished_at"] = now
+        assignments = ", ".join(f"{k}=?" for k in sets)
+        async with aiosqlite.connect(self.path.as_posix()) as db:
+            await db.execute(
+                f"UPDATE catalog_import_jobs SET {assignments} WHERE id=?",
+                (*sets.values(), job_id),
+            )
+            await db.commit()
+
+    async def get_catalog_import_job(self, job_id: str, owner_id: str) -> Optional[Dict[str, Any]]:
+        """Return a catalog import job owned by ``owner_id``, or None."""
+        async with aiosqlite.connect(self.path.as_posix()) as db:
+            db.row_factory = aiosqlite.Row
+            cur = await db.execute(
+                """
+                SELECT id, owner_id, filename, format, status, rows_processed,
+                       rows_inserted, rows_rejected, chunks, errors, error,
+                       created_at, updated_at, finished_at
+                FROM catalog_import_jobs
+                WHERE id=? AND owner_id=?
+                """,
+                (job_id, owner_id),
+            )
+            row = await cur.fetchone()
+        if not row:
+            return None
+        job = dict(row)
+        job["errors"] = json.loads(job["errors"]) if job["errors"] else []
+        return job
+
     async def insert_price_proposal(self, pp: Dict[str, Any]) -> None:
         """Insert a price proposal row.
 
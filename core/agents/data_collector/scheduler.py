@@ -0,0 +1,253 @@
+"""
+Deterministic, staleness-priority collection scheduler.
+
+Stale SKUs are pulled from ``Tools.get_stale_products`` into a priority queue
+keyed by staleness x importance, and a fixed pool of async workers drains it.
+Each connector has its own token-bucket rate limit, and a worker holds its slot
+until the collection job it started finishes (or ``job_timeout_s`` passes), so
+``workers`` bounds how many collections run at once. The queue is refilled
+whenever it drops below a low watermark instead of on a fixed sleep, so
+throughput tracks how fast collection actually completes.
+
+SKUs without a source URL have nothing real to collect from. Unless a
+``fallback_connector`` (e.g. ``mock`` for demos) is configured, the stale query
+leaves them out, and any that still reach a worker are marked NO_SOURCE in
+``sku_freshness`` instead of being collected.
+
+LLM planning is optional: advice arrives through ``submit`` and only boosts
+priorities; it is never required for collection to progress.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from .job_events import get_job_waiters, wait_for_request
+
+logger = logging.getLogger("data_collector_scheduler")
+
+# Staleness assigned to SKUs that have never been collected
+NEVER_COLLECTED_MINUTES = 10 ** 6
+
+DEFAULT_CONNECTOR_RATES: Dict[str, float] = {
+    "web_scraper": 2.0,
+    "mock": 50.0,
+}
+
+
+class TokenBucket:
+    """Simple async token bucket: ``rate`` tokens/second, up to ``burst``."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate = max(rate, 1e-6)
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+def default_importance(product: Dict[str, Any]) -> float:
+    """SKUs we can actually scrape are worth more than fallback-only ones."""
+    return 2.0 if product.get("source_url") else 1.0
+
+
+class CollectionScheduler:
+    def __init__(
+        self,
+        tools,
+        workers: int = 4,
+        stale_threshold_minutes: int = 60,
+        batch_size: int = 500,
+        low_watermark: Optional[int] = None,
+        idle_interval_s: float = 30.0,
+        depth: int = 5,
+        cooldown_s: float = 300.0,
+        job_timeout_s: float = 120.0,
+        connector_rates: Optional[Dict[str, float]] = None,
+        importance: Callable[[Dict[str, Any]], float] = default_importance,
+        fallback_connector: Optional[str] = None,
+    ) -> None:
+        self.tools = tools
+        self.workers = max(1, int(workers))
+        self.stale_threshold_minutes = stale_threshold_minutes
+        self.batch_size = batch_size
+        self.low_watermark = low_watermark if low_watermark is not None else self.workers * 2
+        self.idle_interval_s = idle_interval_s
+        self.depth = depth
+        self.cooldown_s = cooldown_s
+        self.job_timeout_s = job_timeout_s
+        self.importance = importance
+        self.fallback_connector = fallback_connector
+        self._rates = dict(DEFAULT_CONNECTOR_RATES)
+        self._rates.update(connector_rates or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+
+        self._queue: "asyncio.PriorityQueue" = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._pending: Set[str] = set()
+        self._boosts: Dict[str, float] = {}
+        # sku -> monotonic time of last attempt, so failing SKUs are not hot-looped
+        self._last_attempt: Dict[str, float] = {}
+        self._low = asyncio.Event()
+        self._tasks: list = []
+        self.running = False
+        self.metrics = {"refills": 0, "enqueued": 0, "started": 0, "completed": 0, "failed": 0, "timed_out": 0, "skipped": 0}
+
+    # ------------------------------------------------------------------ queue
+    def _connector(self, product: Dict[str, Any]) -> Optional[str]:
+        if product.get("connector"):
+            return product["connector"]
+        return "web_scraper" if product.get("source_url") else self.fallback_connector
+
+    def _priority(self, product: Dict[str, Any]) -> float:
+        stale = product.get("minutes_stale")
+        stale = NEVER_COLLECTED_MINUTES if stale is None else float(stale)
+        boost = self._boosts.pop(product["sku"], 1.0)
+        # PriorityQueue pops the smallest item first
+        return -(stale * self.importance(product) * boost)
+
+    def _enqueue(self, product: Dict[str, Any]) -> bool:
+        sku = product["sku"]
+        if sku in self._pending:
+            return False
+        self._pending.add(sku)
+        self._queue.put_nowait((self._priority(product), next(self._seq), product))
+        self.metrics["enqueued"] += 1
+        return True
+
+    def submit(self, sku: str, connector: Optional[str] = None, boost: float = 10.0) -> Dict[str, Any]:
+        """Queue ``sku`` ahead of its staleness rank (used for LLM/user advice)."""
+        if sku in self._pending:
+            return {"ok": True, "sku": sku, "queued": False, "reason": "already_pending"}
+        self._boosts[sku] = boost
+        product = {"sku": sku, "minutes_stale": None, "connector": connector}
+        self._enqueue(product)
+        return {"ok": True, "sku": sku, "queued": True}
+
+    async def refill(self) -> int:
+        """Pull the stalest SKUs into the queue; returns how many were added."""
+        self.metrics["refills"] += 1
+        result = await self.tools.get_stale_products(
+            threshold_minutes=self.stale_threshold_minutes,
+            limit=self.batch_size,
+            collectable_only=self.fallback_connector is None,
+        )
+        if not result.get("ok"):
+            logger.error(f"Scheduler refill failed: {result.get('error')}")
+            return 0
+        cutoff = time.monotonic() - self.cooldown_s
+        self._last_attempt = {k: v for k, v in self._last_attempt.items() if v > cutoff}
+        return sum(
+            1
+            for p in result.get("stale_products", [])
+            if p["sku"] not in self._last_attempt and self._enqueue(p)
+        )
+
+    # ---------------------------------------------------------------- workers
+    def _bucket(self, connector: str) -> TokenBucket:
+        if connector not in self._buckets:
+            self._buckets[connector] = TokenBucket(self._rates.get(connector, 1.0))
+        return self._buckets[connector]
+
+    async def _run_one(self, product: Dict[str, Any]) -> None:
+        sku = product["sku"]
+        connector = self._connector(product)
+        if connector is None:
+            self.metrics["skipped"] += 1
+            logger.info(f"Scheduler skipping {sku}: no source URL and no fallback connector")
+            await self.tools.mark_not_collectable(sku)
+            return
+        await self._bucket(connector).acquire()
+        self._last_attempt[sku] = time.monotonic()
+        result = await self.tools.start_collection_job(
+            sku=sku, market="DEFAULT", connector=connector, depth=self.depth
+        )
+        if not result.get("ok"):
+            self.metrics["failed"] += 1
+            logger.error(f"Scheduler failed to collect {sku}: {result.get('error')}")
+            return
+        self.metrics["started"] += 1
+        # start_collection_job only publishes the request; hold this worker until the job ends
+        status = await wait_for_request(result["request_id"], self.job_timeout_s) if result.get("request_id") else "DONE"
+        if status == "DONE":
+            self.metrics["completed"] += 1
+        elif status is None:
+            self.metrics["timed_out"] += 1
+            logger.warning(f"Collection job for {sku} did not finish within {self.job_timeout_s}s")
+        else:
+            self.metrics["failed"] += 1
+            logger.error(f"Collection job for {sku} ended {status}")
+
+    async def _worker(self, n: int) -> None:
+        while self.running:
+            _, _, product = await self._queue.get()
+            try:
+                await self._run_one(product)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.error(f"Scheduler worker {n} error: {e}", exc_info=True)
+            finally:
+                self._pending.discard(product["sku"])
+                self._queue.task_done()
+                if self._queue.qsize() <= self.low_watermark:
+                    self._low.set()
+
+    async def _refill_loop(self) -> None:
+        while self.running:
+            try:
+                if self._queue.qsize() <= self.low_watermark:
+                    self._low.clear()
+                    if await self.refill() == 0:
+                        # Nothing new is stale (or it is all cooling down); check again later
+                        await asyncio.sleep(self.idle_interval_s)
+                        continue
+                try:
+                    await asyncio.wait_for(self._low.wait(), timeout=self.idle_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scheduler refill loop error: {e}", exc_info=True)
+                await asyncio.sleep(self.idle_interval_s)
+
+    # -------------------------------------------------------------- lifecycle
+    async def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        get_job_waiters()  # subscribe to fetch ACK/DONE before the first job is requested
+        self._tasks = [asyncio.create_task(self._refill_loop())]
+        self._tasks += [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"CollectionScheduler started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        self.running = False
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            "queued": self._queue.qsize(),
+            "pending": len(self._pending),
+            "workers": self.workers,
+        }
@@ -6,6 +6,8 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .connectors.base import connector_names
+
 logger = logging.getLogger("data_collector_tools")
 
 class Tools:
@@ -48,14 +50,28 @@ class Tools:
             import sqlite3
             with sqlite3.connect(uri_app, uri=True) as conn:
                 conn.row_factory = sqlite3.Row
-                row = conn.execute(
-                    """
-                    SELECT MAX(ts) as last_ts, COUNT(*) as tick_count
-                    FROM market_ticks
-                    WHERE sku=? AND market=?
-                    """,
-                    (sku, market),
-                ).fetchone()
+                row = None
+                try:
+                    row = conn.execute(
+                        """
+                        SELECT NULLIF(last_tick_ts, '') as last_ts, tick_count, last_job_status
+                        FROM sku_freshness
+                        WHERE sku=? AND market=?
+                        """,
+                        (sku, market),
+                    ).fetchone()
+                except sqlite3.OperationalError:
+                    pass
+                if row is None or (row["last_ts"] is None and row["tick_count"] == 0 and row["last_job_status"] is None):
+                    # Not indexed yet (e.g. ticks written outside DataRepo)
+                    row = conn.execute(
+                        """
+                        SELECT MAX(ts) as last_ts, COUNT(*) as tick_count, NULL as last_job_status
+                        FROM market_ticks
+                        WHERE sku=? AND market=?
+                        """,
+                        (sku, market),
+                    ).fetchone()
                 
                 if not row or not row["last_ts"]:
                     return {
@@ -67,6 +83,7 @@ class Tools:
                         "minutes_stale": None,
                         "tick_count": 0,
                         "is_stale": True,
+                        "last_job_status": row["last_job_status"] if row else None,
                     }
                 
                 last_ts = datetime.fromisoformat(row["last_ts"])
@@ -85,13 +102,23 @@ class Tools:
                     "minutes_stale": minutes_stale,
                     "tick_count": row["tick_count"],
                     "is_stale": minutes_stale > 60,
+                    "last_job_status": row["last_job_status"],
                 }
         except Exception as e:
             logger.error(f"Failed to check data freshness for {sku}: {e}")
             return {"ok": False, "error": str(e)}
 
-    async def get_stale_products(self, threshold_minutes: int = 60) -> Dict[str, Any]:
+    async def get_stale_products(
+        self,
+        threshold_minutes: int = 60,
+        limit: int = 20,
+        market: str = "DEFAULT",
+        collectable_only: bool = False,
+    ) -> Dict[str, Any]:
+        """Stalest SKUs first. ``collectable_only`` drops SKUs without a source_url,
+        so they cannot crowd collectable ones out of the ``limit`` window."""
         try:
+            url_filter = " AND pc.source_url IS NOT NULL" if collectable_only else ""
             uri_app = f"file:{self.repo.path.as_posix()}?mode=ro"
             import sqlite3
             
@@ -100,26 +127,53 @@ class Tools:
             with sqlite3.connect(uri_app, uri=True) as conn:
                 conn.row_factory = sqlite3.Row
                 
-                rows = conn.execute(
-                    """
-                    SELECT 
-                        pc.sku,
-                        pc.title,
-                        pc.source_url,
-                        MAX(mt.ts) as last_update,
-                        COUNT(mt.id) as tick_count
-                    FROM product_catalog pc
-                    LEFT JOIN market_ticks mt ON pc.sku = mt.sku
-                    GROUP BY pc.sku, pc.title, pc.source_url
-                    HAVING last_update IS NULL OR last_update < ?
-                    ORDER BY 
-                        CASE WHEN pc.source_url IS NOT NULL THEN 0 ELSE 1 END,
-                        last_update ASC NULLS FIRST
-                    LIMIT 20
-                    """,
-                    (cutoff,),
-                ).fetchall()
+                try:
+                    # Range scan on ix_sku_freshness_market_last_tick; never-collected
+                    # SKUs have last_tick_ts='' and sort first.
+                    rows = conn.execute(
+                        f"""
+                        SELECT
+                            f.sku,
+                            pc.title,
+                            pc.source_url,
+                            NULLIF(f.last_tick_ts, '') as last_update,
+                            f.tick_count,
+                            f.last_job_status
+                        FROM sku_freshness f
+                        JOIN product_catalog pc ON pc.rowid = (
+                            SELECT rowid FROM product_catalog WHERE sku = f.sku LIMIT 1
+                        )
+                        WHERE f.market = ? AND f.last_tick_ts < ?{url_filter}
+                        ORDER BY f.last_tick_ts ASC
+                        LIMIT ?
+                        """,
+                        (market, cutoff, int(limit)),
+                    ).fetchall()
+                except sqlite3.OperationalError:
+                    # Database predates sku_freshness (DataRepo.init not run yet)
+                    rows = conn.execute(
+                        f"""
+                        SELECT 
+                            pc.sku,
+                            pc.title,
+                            pc.source_url,
+                            MAX(mt.ts) as last_update,
+                            COUNT(mt.id) as tick_count,
+                            NULL as last_job_status
+                        FROM product_catalog pc
+                        LEFT JOIN market_ticks mt ON pc.sku = mt.sku
+                        WHERE 1=1{url_filter}
+                        GROUP BY pc.sku, pc.title, pc.source_url
+                        HAVING last_update IS NULL OR last_update < ?
+                        ORDER BY 
+                            CASE WHEN pc.source_url IS NOT NULL THEN 0 ELSE 1 END,
+                            last_update ASC NULLS FIRST
+                        LIMIT ?
+                        """,
+                        (cutoff, int(limit)),
+                    ).fetchall()
                 
+                now = datetime.now(timezone.utc)
                 stale_products = []
                 for r in rows:
                     last_ts = None
@@ -127,7 +181,6 @@ class Tools:
                     
                     if r["last_update"]:
                         last_ts = datetime.fromisoformat(r["last_update"])
-                        now = datetime.now(timezone.utc)
                         if last_ts.tzinfo is None:
                             last_ts = last_ts.replace(tzinfo=timezone.utc)
                         minutes_stale = (now - last_ts).total_seconds() / 60
@@ -139,6 +192,7 @@ class Tools:
                         "last_update": r["last_update"],
                         "minutes_stale": minutes_stale,
                         "tick_count": r["tick_count"] or 0,
+                        "last_job_status": r["last_job_status"],
                     })
                 
                 return {
@@ -151,6 +205,14 @@ class Tools:
             logger.error(f"Failed to get stale products: {e}")
             return {"ok": False, "error": str(e)}
 
+    async def mark_not_collectable(self, sku: str, market: str = "DEFAULT") -> Dict[str, Any]:
+        try:
+            await self.repo.mark_sku_not_collectable(sku, market)
+            return {"ok": True, "sku": sku}
+        except Exception as e:
+            logger.error(f"Failed to mark {sku} not collectable: {e}")
+            return {"ok": False, "error": str(e)}
+
     async def start_collection_job(
         self,
         sku: str,
@@ -353,7 +415,7 @@ def get_llm_tools():
                         "connector": {
                             "type": "string",
                             "description": "Data connector to use (default: mock)",
-                            "enum": ["mock", "web_scraper"]
+                            "enum": connector_names()
                         },
                         "depth": {
                             "type": "number",
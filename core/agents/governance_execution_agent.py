@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Optional, Dict, Any
 
 from core.agents.agent_sdk.bus_factory import get_bus
+from core.agents.agent_sdk.idempotency import IdempotencyStore
 from core.agents.agent_sdk.protocol import Topic
 from core.payloads import PriceProposalPayload, PriceUpdatePayload
 from core.observability.logging import get_logger
@@ -36,11 +37,12 @@ class Guardrails:
 class GovernanceExecutionAgent:
     def __init__(self) -> None:
         self._callback = None
+        self._seen_proposals = IdempotencyStore("governance_proposal", db_path=_market_db_path())
 
     async def start(self) -> None:
         async def on_price_proposal(payload: Dict[str, Any]):
             try:
-                self._handle_price_proposal(payload)  # offload inside
+                await self._handle_price_proposal(payload)  # offload inside
             except Exception as e:
                 try:
                     get_logger("ge_agent").warning("on_price_proposal_error", error=str(e))
@@ -129,7 +131,7 @@ class GovernanceExecutionAgent:
             pass
         return Guardrails(auto_apply=auto_apply, min_margin=min_margin, max_delta=max_delta)
 
-    def _handle_price_proposal(self, payload: Dict[str, Any]) -> None:
+    async def _handle_price_proposal(self, payload: Dict[str, Any]) -> None:
         # Validate payload shape
         try:
             pp = PriceProposalPayload(
@@ -145,6 +147,10 @@ class GovernanceExecutionAgent:
                 print(f"Failed to log invalid payload: {e}")
             return
 
+        # Redelivered proposals are dropped before a worker thread is spawned
+        if not await self._seen_proposals.acheck_and_add(pp["proposal_id"]):
+            return
+
         # Offload to background thread to avoid blocking bus
         threading.Thread(target=lambda: self._apply_sync(pp), daemon=True).start()
 
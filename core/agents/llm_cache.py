@@ -0,0 +1,234 @@
+"""
+Response cache for deterministic LLM calls.
+
+Entries are keyed by provider, model, a hash of the normalized messages and the
+sampling parameters. A bounded in-memory LRU sits in front of a SQLite store so
+cached answers survive restarts; every entry carries its own expiry. Callers
+opt in per call (``LLMClient.chat(..., cache=True)``), so only prompts whose
+answer may be reused are ever stored.
+
+Hits are counted together with the tokens (and, when a ``cost_fn`` is set,
+the dollars) the original completion cost.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger("core.agents.llm")
+
+CostFn = Callable[[str, str, int, int], Optional[float]]
+
+# (response, expires_at, prompt_tokens, completion_tokens, cost_usd)
+_Entry = Tuple[str, float, int, int, float]
+
+
+def _default_path() -> Path:
+    root = Path(__file__).resolve().parents[2]
+    return Path(os.getenv("LLM_CACHE_DB", str(root / ".llm_cache" / "responses.db")))
+
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(role, content) pairs with whitespace collapsed, so cosmetic prompt
+    differences map to the same key."""
+    out = []
+    for m in messages:
+        content = m.get("content")
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, ensure_ascii=False)
+        out.append((str(m.get("role") or ""), " ".join(content.split())))
+    return out
+
+
+def make_key(provider: str, model: str, messages: List[Dict[str, Any]], **params: Any) -> str:
+    digest = hashlib.sha256(
+        json.dumps(normalize_messages(messages), ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    param_str = json.dumps(params, sort_keys=True, default=str)
+    return f"{provider}|{model}|{digest}|{hashlib.sha256(param_str.encode('utf-8')).hexdigest()[:16]}"
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        max_entries: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        cost_fn: Optional[CostFn] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MEMORY_SIZE", "512"))
+        self.ttl_s = ttl_s if ttl_s is not None else float(os.getenv("LLM_CACHE_TTL_S", "86400"))
+        self.cost_fn = cost_fn
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._puts = 0
+        self.stats: Dict[str, float] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stores": 0,
+            "tokens_saved": 0,
+            "cost_saved_usd": 0.0,
+        }
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._db is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(self.path.as_posix(), check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    """CREATE TABLE IF NOT EXISTS llm_responses(
+                        key TEXT PRIMARY KEY,
+                        response TEXT NOT NULL,
+                        expires_at REAL NOT NULL,
+                        prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                        completion_tokens INTEGER NOT NULL DEFAULT 0,
+                        cost_usd REAL NOT NULL DEFAULT 0,
+                        created_at REAL NOT NULL
+                    )"""
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_expires ON llm_responses(expires_at)")
+                db.commit()
+                self._db = db
+            except Exception as e:
+                logger.warning("LLM response cache store unavailable (%s); using memory only", e)
+                self.path = None
+                return None
+        return self._db
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _hit(self, entry: _Entry, tier: str) -> str:
+        self.stats["hits"] += 1
+        self.stats[f"{tier}_hits"] += 1
+        self.stats["tokens_saved"] += entry[2] + entry[3]
+        self.stats["cost_saved_usd"] += entry[4]
+        return entry[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    return self._hit(entry, "memory")
+                del self._memory[key]
+            db = self._conn()
+            row = None
+            if db is not None:
+                try:
+                    row = db.execute(
+                        "SELECT response, expires_at, prompt_tokens, completion_tokens, cost_usd "
+                        "FROM llm_responses WHERE key=? AND expires_at>?",
+                        (key, now),
+                    ).fetchone()
+                except Exception as e:
+                    logger.debug("LLM response cache read failed: %s", e)
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            entry = (row[0], float(row[1]), int(row[2]), int(row[3]), float(row[4]))
+            self._remember(key, entry)
+            return self._hit(entry, "disk")
+
+    def put(
+        self,
+        key: str,
+        response: str,
+        usage: Optional[Dict[str, Any]] = None,
+        ttl_s: Optional[float] = None,
+    ) -> None:
+        if not response:
+            return
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        cost = 0.0
+        if self.cost_fn is not None:
+            try:
+                cost = float(self.cost_fn(usage.get("provider") or "", usage.get("model") or "", prompt_tokens, completion_tokens) or 0.0)
+            except Exception:
+                cost = 0.0
+        now = self._clock()
+        entry = (response, now + (ttl_s if ttl_s is not None else self.ttl_s), prompt_tokens, completion_tokens, cost)
+        with self._lock:
+            self._remember(key, entry)
+            self.stats["stores"] += 1
+            self._puts += 1
+            db = self._conn()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_responses"
+                    "(key, response, expires_at, prompt_tokens, completion_tokens, cost_usd, created_at) "
+                    "VALUES(?,?,?,?,?,?,?)",
+                    (key, *entry, now),
+                )
+                # Expired rows are only skipped on read; sweep them now and then
+                if self._puts % 100 == 0:
+                    db.execute("DELETE FROM llm_responses WHERE expires_at<=?", (now,))
+                db.commit()
+            except Exception as e:
+                logger.debug("LLM response cache write failed: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            db = self._conn()
+            if db is not None:
+                db.execute("DELETE FROM llm_responses")
+                db.commit()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "cost_saved_usd": round(self.stats["cost_saved_usd"], 6),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache; ``LLM_CACHE_DISK=0`` keeps it memory-only."""
+    global _cache
+    if _cache is None:
+        enabled = os.getenv("LLM_CACHE_DISK", "1").lower() in {"1", "true", "yes", "on"}
+        _cache = ResponseCache(path=_default_path() if enabled else None)
+    return _cache
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import asyncio
 import importlib
 import logging
 from pathlib import Path
@@ -11,8 +12,10 @@ from datetime import datetime
 from .llm_provider_manager import (
     ProviderManager,
     _save_gemini_working_key,
+    async_client_for,
 )
 from .base_chat_handler import BaseChatHandler
+from .llm_cache import get_response_cache, make_key
 
 
 def _load_dotenv_if_present() -> None:
@@ -74,6 +77,7 @@ class LLMClient:
         self._provider: str = "none"
         self._unavailable_reason: Optional[str] = None
         self.last_usage: Dict[str, Any] = {}
+        self.response_cache = get_response_cache()
 
         try:
             openai_mod = importlib.import_module("openai")
@@ -127,13 +131,143 @@ class LLMClient:
     def unavailable_reason(self) -> Optional[str]:
         return self._unavailable_reason
 
-    def chat(self, messages: List[Dict[str, str]], max_tokens: int = 256, temperature: float = 0.2) -> str:
+    def _cache_key(self, messages: List[Dict[str, Any]], max_tokens: int, temperature: float) -> str:
+        return make_key(self._provider, self.model or "", messages, max_tokens=max_tokens, temperature=temperature)
+
+    def _store(
+        self,
+        lookup_key: str,
+        idx: int,
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        temperature: float,
+        content: str,
+        ttl: Optional[float],
+    ) -> None:
+        """Cache ``content`` under the provider that answered. After a fallback it is
+        also stored under ``lookup_key``, so callers still starting on the original
+        provider find it."""
+        answered = self._providers[idx]
+        usage = self.last_usage or {}
+        answer_key = make_key(
+            usage.get("provider") or answered["name"],
+            usage.get("model") or answered["model"],
+            messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        for key in dict.fromkeys((answer_key, lookup_key)):
+            self.response_cache.put(key, content, self.last_usage, ttl)
+
+    def _cached(self, key: str) -> Optional[str]:
+        hit = self.response_cache.get(key)
+        if hit is not None:
+            self.last_usage = {"provider": self._provider, "model": self.model, "cached": True}
+        return hit
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 256,
+        temperature: float = 0.2,
+        cache: bool = False,
+        cache_ttl: Optional[float] = None,
+    ) -> str:
+        """Single completion. With ``cache=True`` an identical earlier call (same
+        provider, model, normalized messages and parameters) is answered from
+        the response cache; only use it where a reused answer is acceptable."""
+        key = self._cache_key(messages, max_tokens, temperature) if cache else ""
+        if cache:
+            hit = self._cached(key)
+            if hit is not None:
+                return hit
         handler = self._get_handler()
         content, idx = handler.execute_chat(messages, max_tokens, temperature, "chat completion")
         self.last_usage = handler.last_usage
+        if cache:
+            self._store(key, idx, messages, max_tokens, temperature, content, cache_ttl)
+        self._set_active_provider(idx)
+        return content
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 256,
+        temperature: float = 0.2,
+        cache: bool = False,
+        cache_ttl: Optional[float] = None,
+    ) -> str:
+        """Async `chat` on the provider's AsyncOpenAI client; does not block the event loop."""
+        key = self._cache_key(messages, max_tokens, temperature) if cache else ""
+        if cache:
+            hit = await asyncio.to_thread(self._cached, key)
+            if hit is not None:
+                return hit
+        handler = self._get_handler()
+        content, idx = await handler.aexecute_chat(messages, max_tokens, temperature, "chat completion")
+        self.last_usage = handler.last_usage
+        if cache:
+            await asyncio.to_thread(self._store, key, idx, messages, max_tokens, temperature, content, cache_ttl)
         self._set_active_provider(idx)
         return content
 
+    async def astream(
+        self,
+        messages: List[Dict[str, Any]],
+        max_tokens: int = 256,
+        temperature: float = 0.2,
+    ):
+        """Async counterpart of `chat_stream`: yields text chunks as they arrive."""
+        if not self._providers:
+            raise RuntimeError("LLM client unavailable (missing key or package)")
+
+        handler = self._get_handler()
+        last_error: Optional[Exception] = None
+        for idx in handler.provider_indices():
+            provider = self._providers[idx]
+            try:
+                try:
+                    stream = await async_client_for(provider).chat.completions.create(
+                        model=provider["model"],
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                    )
+                except Exception as se:
+                    self._log.debug("Async streaming not available for %s: %s", provider["name"], se)
+                    content = await self.achat(messages, max_tokens=max_tokens, temperature=temperature)
+                    yield content
+                    self._set_active_provider(idx)
+                    return
+                async for event in stream:
+                    try:
+                        usage = getattr(event, "usage", None)
+                        if usage:
+                            handler.capture_usage(event, provider["name"], provider["model"])
+                        choices = getattr(event, "choices", None) or []
+                        if choices:
+                            delta = getattr(choices[0], "delta", None)
+                            if delta is not None:
+                                text = getattr(delta, "content", None)
+                                if text:
+                                    yield text
+                    except Exception:
+                        continue
+                self.last_usage = handler.last_usage
+                self._set_active_provider(idx)
+                return
+            except Exception as exc:
+                last_error = exc
+                error_type = type(exc).__name__
+                self._log.warning("Provider %s failed for async stream (%s): %s", provider["name"], error_type, exc)
+                continue
+
+        error_msg = f"All LLM providers failed for streaming. Last error: {last_error or 'no provider succeeded'}"
+        self._log.error(error_msg)
+        raise RuntimeError(error_msg)
+
     def chat_stream(
         self,
         messages: List[Dict[str, Any]],
@@ -213,6 +347,28 @@ class LLMClient:
         self._set_active_provider(idx)
         return content
 
+    async def achat_with_tools(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: List[Dict[str, Any]],
+        functions_map: Dict[str, Callable[..., Any]],
+        tool_choice: Optional[str] = "auto",
+        max_rounds: int = 3,
+        max_tokens: int = 256,
+        temperature: float = 0.2,
+        trace_id: Optional[str] = None,
+    ) -> str:
+        """Async `chat_with_tools`; model rounds are awaited and tools run off the event loop."""
+        handler = self._get_handler()
+        content, idx, tools_used = await handler.aexecute_chat_with_tools(
+            messages, tools, functions_map, tool_choice, max_rounds, max_tokens, temperature, trace_id
+        )
+        if tools_used:
+            handler.last_usage = {**(handler.last_usage or {}), "tools_used": tools_used}
+        self.last_usage = handler.last_usage
+        self._set_active_provider(idx)
+        return content
+
     def chat_with_tools_stream(
         self,
         messages: List[Dict[str, Any]],
@@ -322,26 +478,12 @@ class LLMClient:
                         assistant_msg["tool_calls"] = normalized_calls
                         local_msgs.append(assistant_msg)
 
-                        for tc in normalized_calls:
-                            fn_name = (tc.get("function") or {}).get("name")
-                            raw_args = (tc.get("function") or {}).get("arguments") or "{}"
-                            call_id = tc.get("id") or "tool_call"
-
-                            result = handler.executor.execute_tool_call(fn_name, raw_args, functions_map, tools_used, trace_id)
-
-                            try:
-                                if fn_name:
-                                    yield {"type": "tool_call", "name": fn_name, "status": "end"}
-                            except Exception:
-                                pass
-
-                            content_str = handler.executor.serialize_tool_result(result)
-                            local_msgs.append({
-                                "role": "tool",
-                                "tool_call_id": call_id,
-                                "name": fn_name,
-                                "content": content_str,
-                            })
+                        calls = handler.tool_call_args(normalized_calls)
+                        results = handler.executor.execute_tool_calls(calls, functions_map, tools_used, trace_id)
+                        for fn_name, _ in calls:
+                            if fn_name:
+                                yield {"type": "tool_call", "name": fn_name, "status": "end"}
+                        local_msgs.extend(handler.tool_messages(normalized_calls, results))
                         continue
 
                     try:
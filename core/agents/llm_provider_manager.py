@@ -1,13 +1,20 @@
 from __future__ import annotations
 import os
+import asyncio
 import logging
+import weakref
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 import importlib
 
 
 _GEMINI_WORKING_KEY_CACHE: Optional[str] = None
 
+# Async clients are bound to the event loop that first used them, so pools and
+# clients are cached per loop; they go away with the loop.
+_HTTP_POOLS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], Any]]" = weakref.WeakKeyDictionary()
+
 
 def _get_gemini_working_key_file() -> Path:
     root = Path(__file__).resolve().parents[2]
@@ -37,6 +44,51 @@ def _save_gemini_working_key(key: str) -> None:
         logging.getLogger("core.agents.llm").debug("Failed to save Gemini working key: %s", e)
 
 
+def _http_pool(loop: asyncio.AbstractEventLoop, base_url: Optional[str]) -> Any:
+    """Shared keep-alive pool for every provider talking to ``base_url`` on ``loop``."""
+    pools = _HTTP_POOLS.setdefault(loop, {})
+    key = base_url or "<default>"
+    pool = pools.get(key)
+    if pool is None or pool.is_closed:
+        import httpx
+
+        max_conn = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+        pool = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_conn,
+                max_keepalive_connections=max_conn,
+                keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_S", "30")),
+            ),
+            timeout=httpx.Timeout(float(os.getenv("LLM_HTTP_TIMEOUT_S", "60")), connect=10.0),
+            follow_redirects=True,
+        )
+        pools[key] = pool
+    return pool
+
+
+def async_client_for(provider: Dict[str, Any]) -> Any:
+    """AsyncOpenAI client for ``provider`` on the running loop, built on the shared pool."""
+    loop = asyncio.get_running_loop()
+    clients = _ASYNC_CLIENTS.setdefault(loop, {})
+    key = (provider["name"], provider.get("api_key") or "")
+    client = clients.get(key)
+    if client is None:
+        client = provider["make_async_client"](_http_pool(loop, provider.get("base_url")))
+        clients[key] = client
+    return client
+
+
+async def close_async_clients() -> None:
+    """Close the HTTP pools opened on the running loop (call on shutdown)."""
+    loop = asyncio.get_running_loop()
+    _ASYNC_CLIENTS.pop(loop, None)
+    for pool in (_HTTP_POOLS.pop(loop, None) or {}).values():
+        try:
+            await pool.aclose()
+        except Exception:
+            pass
+
+
 class ProviderManager:
     def __init__(self, logger: logging.Logger):
         self._log = logger
@@ -88,6 +140,9 @@ class ProviderManager:
             self._log.error("Failed to initialize %s client: %s", provider_name, exc)
             return
 
+        def make_async_client(http_client: Any) -> Any:
+            return openai_mod.AsyncOpenAI(**kwargs, http_client=http_client)
+
         self._providers.append(
             {
                 "name": provider_name,
@@ -95,6 +150,7 @@ class ProviderManager:
                 "model": model_name,
                 "base_url": provider_base_url,
                 "api_key": provider_api_key,
+                "make_async_client": make_async_client,
             }
         )
         self._log.debug(
@@ -13,6 +13,7 @@ from typing import Any, Dict, Optional, List, Tuple
 from .optimizer import Features, optimize
 from .algorithms import ALGORITHMS
 from .tools import Tools, get_llm_tools, execute_tool_call
+from core.agents.agent_sdk.batch import batch_result
 
 try:
     from core.agents.agent_sdk.activity_log import should_trace, activity_log, safe_redact, generate_trace_id
@@ -263,7 +264,7 @@ Use your tools to complete this workflow autonomously."""
             }
             
             try:
-                result = self.llm.chat_with_tools(
+                result = await self.llm.achat_with_tools(
                     messages=messages,
                     tools=tools_schema,
                     functions_map=functions_map,
@@ -298,7 +299,12 @@ Use your tools to complete this workflow autonomously."""
         except Exception:
             pass
         
-        product_info = await self.tools.get_product_info(product_identifier)
+        # Product lookup and market intelligence share one round trip
+        lookup = await self.tools.call_batch([
+            {"tool": "get_product_info", "arguments": {"sku": product_identifier}},
+            {"tool": "get_market_intelligence", "arguments": {"product_title": {"$ref": "0.title"}}},
+        ])
+        product_info = batch_result(lookup, 0)
         if not product_info.get("ok"):
             self.logger.error(f"Product not found: {product_identifier}")
             return
@@ -312,7 +318,7 @@ Use your tools to complete this workflow autonomously."""
             self.logger.error(f"Product missing price: {product_identifier}")
             return
         
-        market_intel = await self.tools.get_market_intelligence(title)
+        market_intel = batch_result(lookup, 1)
         competitor_price = market_intel.get("competitor_price") if market_intel.get("ok") else None
         market_records = market_intel.get("market_records", []) if market_intel.get("ok") else []
         
@@ -333,15 +339,42 @@ Use your tools to complete this workflow autonomously."""
             elif any(k in req_l for k in ("ml", "predict", "model")):
                 algorithm = "ml_model"
         
-        algo_result = await self.tools.run_pricing_algorithm(
-            algorithm=algorithm,
-            sku=sku,
-            our_price=our_price,
-            competitor_price=competitor_price,
-            cost=cost,
-            market_records=market_records,
-            min_margin=0.12,
-        )
+        # Compute, validate and publish in one round trip; if the algorithm fails,
+        # the later calls cannot resolve the recommended price and are skipped.
+        proposal = await self.tools.call_batch([
+            {
+                "tool": "run_pricing_algorithm",
+                "arguments": {
+                    "algorithm": algorithm,
+                    "sku": sku,
+                    "our_price": our_price,
+                    "competitor_price": competitor_price,
+                    "cost": cost,
+                    "market_records": market_records,
+                    "min_margin": 0.12,
+                },
+            },
+            {
+                "tool": "validate_price",
+                "arguments": {
+                    "proposed_price": {"$ref": "0.recommended_price"},
+                    "current_price": our_price,
+                    "cost": cost,
+                    "min_margin": 0.12,
+                },
+            },
+            {
+                "tool": "publish_price_proposal",
+                "arguments": {
+                    "sku": sku,
+                    "old_price": our_price,
+                    "new_price": {"$ref": "0.recommended_price"},
+                    "margin": {"$ref": "1.margin", "default": 0.0},
+                    "algorithm": algorithm,
+                },
+            },
+        ])
+        algo_result = batch_result(proposal, 0)
         
         if not algo_result.get("ok"):
             self.logger.error(f"Algorithm failed: {algo_result.get('error')}")
@@ -349,25 +382,11 @@ Use your tools to complete this workflow autonomously."""
         
         proposed_price = algo_result["recommended_price"]
         
-        validation = await self.tools.validate_price(
-            proposed_price=proposed_price,
-            current_price=our_price,
-            cost=cost,
-            min_margin=0.12,
-        )
-        
+        validation = batch_result(proposal, 1)
         if not validation.get("valid", False):
             self.logger.warning(f"Price validation failed: {validation.get('error')} - publishing anyway")
         
-        margin = validation.get("margin", 0.0)
-        
-        publish_result = await self.tools.publish_price_proposal(
-            sku=sku,
-            old_price=our_price,
-            new_price=proposed_price,
-            margin=margin,
-            algorithm=algorithm,
-        )
+        publish_result = batch_result(proposal, 2)
         
         completed = datetime.now()
         
@@ -87,6 +87,7 @@ class LLMBrain:
 				messages=[{"role": "user", "content": prompt}],
 				max_tokens=300,
 				temperature=0.0,
+				cache=True,
 			)
 			
 			try:
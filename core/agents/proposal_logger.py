@@ -7,6 +7,7 @@ them to app/data.db:price_proposals table for tracking and audit purposes.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import sqlite3
 import uuid
@@ -15,6 +16,7 @@ from pathlib import Path
 from typing import Any, Dict
 
 from core.agents.agent_sdk.bus_factory import get_bus
+from core.agents.agent_sdk.idempotency import IdempotencyStore
 from core.agents.agent_sdk.protocol import Topic
 
 
@@ -30,6 +32,7 @@ class ProposalLogger:
         
         self.db_path = db_path
         self._callback = None
+        self._seen_proposals = IdempotencyStore("proposal_logger", db_path=db_path)
         
     async def start(self) -> None:
         """Start listening for PRICE_PROPOSAL events."""
@@ -37,7 +40,8 @@ class ProposalLogger:
         
         async def on_proposal(proposal: Dict[str, Any]):
             try:
-                self._persist_proposal(proposal)
+                # Idempotency check and INSERT are blocking sqlite calls
+                await asyncio.to_thread(self._persist_proposal, proposal)
             except Exception as e:
                 self.logger.error(f"Failed to persist proposal: {e}", exc_info=True)
         
@@ -86,6 +90,10 @@ class ProposalLogger:
             if not sku or proposed_price is None:
                 self.logger.warning(f"Skipping proposal with missing data: {proposal}")
                 return
+
+            if "proposal_id" in proposal and not self._seen_proposals.check_and_add(proposal_id):
+                self.logger.info(f"Skipping duplicate proposal {proposal_id}")
+                return
             
             # Insert into database
             with sqlite3.connect(str(self.db_path)) as conn:
@@ -14,7 +14,7 @@ import uuid
 from core.agents.price_optimizer.agent import PricingOptimizerAgent
 from core.agents.agent_sdk.bus_factory import get_bus
 from core.agents.agent_sdk.protocol import Topic
-from core.workflow_templates import collect_and_optimize_prelude
+from core.workflow_templates import await_job_status, collect_and_optimize_prelude
 
 
 
@@ -81,15 +81,7 @@ class Supervisor:
                             return
                         job_id = start_res["job_id"]
                         summary["job_id"] = job_id
-                        t0 = time.time()
-                        status = None
-                        while time.time() - t0 < timeout_s:
-                            st = await self.tool_registry.execute_tool("get_job_status", job_id=job_id)
-                            job = st.get("job") if st.get("ok") else None
-                            status = (job or {}).get("status")
-                            if status in {"DONE", "FAILED", "CANCELLED"}:
-                                break
-                            await asyncio.sleep(0.25)
+                        status = await await_job_status(self.tool_registry, job_id, timeout_s)
                         summary["job_status"] = status or "UNKNOWN"
                         if status != "DONE":
                             results[sku] = summary
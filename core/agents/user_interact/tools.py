@@ -308,14 +308,16 @@ def check_stale_market_data(threshold_minutes: int = 60) -> Dict[str, Any]:
             if not _table_exists(conn, "market_data"):
                 return {"stale_items": [], "count": 0, "note": "market_data missing"}
             
+            # update_time is written both as ISO 'T' strings and as SQLite
+            # 'YYYY-MM-DD HH:MM:SS', so compare as julian days, not strings.
             query = """
                 SELECT id, product_name, price, update_time,
                        CAST((julianday('now') - julianday(update_time)) * 24 * 60 AS INTEGER) as age_minutes
                 FROM market_data
-                WHERE age_minutes > ?
-                ORDER BY age_minutes DESC
+                WHERE julianday(update_time) < julianday('now', ?)
+                ORDER BY julianday(update_time) ASC
             """
-            rows = conn.execute(query, (threshold_minutes,)).fetchall()
+            rows = conn.execute(query, (f"-{int(threshold_minutes)} minutes",)).fetchall()
             stale_items = [dict(r) for r in rows]
             
             total_query = "SELECT COUNT(*) as total FROM market_data"
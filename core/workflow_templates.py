@@ -1,22 +1,37 @@
 from __future__ import annotations
 
 import asyncio
-import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from core.tool_registry import get_tool_registry
+from core.agents.data_collector.job_events import wait_for_job
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+async def await_job_status(registry, job_id: str, timeout_s: float, poll_interval: float = 0.5) -> Optional[str]:
+    """Wait for a collection job to finish; returns its final status or None on timeout.
+
+    Completion is pushed in-process; ``get_job_status`` is only consulted up front
+    and as a backed-off fallback for jobs run by an out-of-process collector.
+    """
+
+    async def check() -> Optional[str]:
+        st = await registry.execute_tool("get_job_status", job_id=job_id)
+        job = st.get("job") if st.get("ok") else None
+        return (job or {}).get("status")
+
+    return await wait_for_job(job_id, timeout_s, check=check, fallback_interval_s=poll_interval)
+
+
 async def collect_and_optimize_prelude(
     row: Dict[str, Any],
     timeout_s: int = 60,
     *,
     max_retries: int = 2,
     backoff: float = 0.5,
-    poll_interval: float = 0.25,
+    poll_interval: float = 0.5,
 ) -> Dict[str, Any]:
     registry = get_tool_registry()
     sku = str(row.get("sku") or "").strip()
@@ -57,18 +72,7 @@ async def collect_and_optimize_prelude(
             await asyncio.sleep(backoff * (attempt + 1))
 
     job_id = str(start_res.get("job_id"))
-    t0 = time.time()
-    status: str | None = None
-    while time.time() - t0 < timeout_s:
-        try:
-            st = await registry.execute_tool("get_job_status", job_id=job_id)
-            job = st.get("job") if st.get("ok") else None
-            status = (job or {}).get("status")
-            if status in {"DONE", "FAILED", "CANCELLED"}:
-                break
-        except Exception as e:
-            logger.debug("get_job_status error: %s", e)
-        await asyncio.sleep(poll_interval)
+    status = await await_job_status(registry, job_id, timeout_s, poll_interval=poll_interval)
 
     logger.info("collect_and_optimize_prelude finished: sku=%s job_id=%s status=%s", sku, job_id, status)
     return {"ok": True, "sku": sku, "job_id": job_id, "job_status": status or "UNKNOWN"}
@@ -0,0 +1,60 @@
+"""
+Benchmark competitor-price parsing per page.
+
+Compares the full selector scan on html.parser (the old behaviour) with the
+per-domain selector memo, on html.parser and on lxml when it is installed.
+
+Usage: python scripts/bench_scraper_parse.py [pages] [filler_rows]
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.agents.data_collector.connectors.web_scraper import SelectorMemo, parse_price_html
+
+PAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+FILLER_ROWS = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+
+
+def make_page(i: int) -> str:
+    # Price sits behind the last selector in the list, like many non-Amazon shops
+    filler = "".join(
+        f"<div class='row'><a href='/p/{j}'>Item {j}</a><span class='meta'>{j}</span></div>"
+        for j in range(FILLER_ROWS)
+    )
+    return (
+        "<html><head><title>Product</title></head><body>"
+        f"<div id='content'>{filler}</div>"
+        f"<div class='product-price'>${100 + i}.99</div>"
+        "</body></html>"
+    )
+
+
+def bench(label: str, parser: str, use_memo: bool, pages) -> None:
+    memo = SelectorMemo() if use_memo else None
+    start = time.perf_counter()
+    for i, html in enumerate(pages):
+        result = parse_price_html(html, f"https://shop.example.com/p/{i}", parser=parser, memo=memo)
+        assert result["status"] == "success", result
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / len(pages) * 1000:8.2f} ms/page  ({elapsed:.2f}s total)")
+
+
+def main() -> None:
+    pages = [make_page(i) for i in range(PAGES)]
+    print(f"Parsing {PAGES} pages (~{len(pages[0]) // 1024} KiB each)\n")
+
+    bench("html.parser, full selector scan", "html.parser", False, pages)
+    bench("html.parser, domain memo", "html.parser", True, pages)
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        print("lxml not installed - skipping lxml runs (pip install lxml)")
+        return
+    bench("lxml, full selector scan", "lxml", False, pages)
+    bench("lxml, domain memo", "lxml", True, pages)
+
+
+if __name__ == "__main__":
+    main()
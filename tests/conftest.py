@@ -9,3 +9,18 @@ if str(ROOT) not in sys.path:
 
 # Common env used by tests
 os.environ.setdefault("DEBUG_LLM", "0")
+# Keep the LLM response cache off disk during tests
+os.environ.setdefault("LLM_CACHE_DISK", "0")
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _fresh_llm_response_cache():
+    """Each test gets its own (memory-only) response cache, so no test sees
+    answers stored by another."""
+    from core.agents import llm_cache
+
+    llm_cache._cache = None
+    yield
+    llm_cache._cache = None
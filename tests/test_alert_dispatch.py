@@ -0,0 +1,147 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiohttp import web
+
+from core.agents.alert_service.dispatch import Dispatcher, EmailChannel, HttpClient, WebhookChannel
+
+
+class FakeRepo:
+    def __init__(self):
+        self.deliveries = []
+
+    async def record_delivery(self, delivery_id, incident_id, channel, status, response_json=None):
+        self.deliveries.append((incident_id, channel, status, response_json))
+
+
+def _rule(**notify):
+    return SimpleNamespace(spec=SimpleNamespace(notify=SimpleNamespace(**notify)))
+
+
+def _incident(i):
+    return {"id": f"inc_{i}", "sku": f"S{i}", "title": f"rule on S{i}", "severity": "warn"}
+
+
+async def _smtp_server(messages):
+    """Minimal SMTP stand-in: accepts every message and keeps its DATA payload."""
+
+    async def handle(reader, writer):
+        writer.write(b"220 localhost ESMTP\r\n")
+        data_mode, lines = False, []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if data_mode:
+                if line == b".\r\n":
+                    messages.append(b"".join(lines).decode())
+                    data_mode, lines = False, []
+                    writer.write(b"250 OK\r\n")
+                else:
+                    lines.append(line)
+                continue
+            cmd = line.strip().upper()
+            if cmd.startswith(b"EHLO"):
+                writer.write(b"250 localhost\r\n")
+            elif cmd == b"DATA":
+                data_mode = True
+                writer.write(b"354 go ahead\r\n")
+            elif cmd == b"QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def test_webhook_batches_and_retries_against_local_server():
+    posts = []
+
+    async def run():
+        async def hook(request):
+            posts.append(await request.json())
+            return web.json_response({}, status=503 if len(posts) == 1 else 200)
+
+        app = web.Application()
+        app.router.add_post("/hook", hook)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        repo = FakeRepo()
+        http = HttpClient()
+        dispatcher = Dispatcher(
+            repo, {"webhook": WebhookChannel(http)}, flush_interval_s=0.05, backoff_s=0.01, http=http,
+        )
+        rule = _rule(channels=["webhook"], webhook_url=f"http://127.0.0.1:{port}/hook")
+        for i in range(5):
+            assert dispatcher.enqueue(_incident(i), rule) == 1
+        await dispatcher.flush()
+        await dispatcher.close()
+        await runner.cleanup()
+        return repo, dispatcher
+
+    repo, dispatcher = asyncio.run(run())
+    assert len(posts) == 2  # one bulk POST, retried once after the 503
+    assert posts[-1]["count"] == 5
+    assert [d[2] for d in repo.deliveries] == ["sent"] * 5
+    assert repo.deliveries[0][3]["attempts"] == 2 and repo.deliveries[0][3]["batch_size"] == 5
+    assert dispatcher.stats["retries"] == 1
+
+
+def test_email_digest_per_recipient_list_against_local_smtp():
+    messages = []
+
+    async def run():
+        server = await _smtp_server(messages)
+        port = server.sockets[0].getsockname()[1]
+        repo = FakeRepo()
+        email = EmailChannel(host="127.0.0.1", port=port, start_tls=False, default_to=["ops@example.com"])
+        dispatcher = Dispatcher(repo, {"email": email}, flush_interval_s=0.05)
+        for i in range(3):
+            dispatcher.enqueue(_incident(i), _rule(channels=["email"]))
+        dispatcher.enqueue(_incident(9), _rule(channels=["email"], email_to=["cfo@example.com"]))
+        await dispatcher.flush()
+        await dispatcher.close()
+        server.close()
+        await server.wait_closed()
+        return repo
+
+    repo = asyncio.run(run())
+    assert len(messages) == 2
+    digest = next(m for m in messages if "ops@example.com" in m)
+    assert "[Alerts] 3 incidents" in digest and "inc_2" in digest
+    assert sorted(d[0] for d in repo.deliveries) == ["inc_0", "inc_1", "inc_2", "inc_9"]
+    assert all(d[2] == "sent" for d in repo.deliveries)
+
+
+def test_non_retryable_failure_is_recorded_once():
+    calls = []
+
+    class Rejecting:
+        def target(self, incident, rule):
+            return "x"
+
+        async def send_batch(self, target, deliveries):
+            from core.agents.alert_service.dispatch import DeliveryError
+
+            calls.append(len(deliveries))
+            raise DeliveryError("HTTP 400", retryable=False)
+
+    async def run():
+        repo = FakeRepo()
+        dispatcher = Dispatcher(repo, {"webhook": Rejecting()}, flush_interval_s=0.01)
+        dispatcher.enqueue(_incident(1), _rule(channels=["webhook", "slack"]))
+        await dispatcher.flush()
+        await dispatcher.close()
+        return repo
+
+    repo = asyncio.run(run())
+    assert calls == [1]
+    assert repo.deliveries[0][2] == "failed" and repo.deliveries[0][3]["attempts"] == 1
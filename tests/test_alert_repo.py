@@ -0,0 +1,178 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from core.agents.alert_service.repo import Repo
+from core.agents.alert_service.schemas import Alert
+
+
+def _alert(rule_id, sku, ts, owner_id="u1"):
+    return Alert(
+        id=f"a_{rule_id}", rule_id=rule_id, sku=sku, title=f"{rule_id} on {sku}", payload={},
+        severity="warn", ts=ts, fingerprint=f"{rule_id}:{sku}", owner_id=owner_id,
+    )
+
+
+def test_indexes_and_batched_upsert(tmp_path):
+    path = str(tmp_path / "alert.db")
+
+    async def run():
+        repo = Repo(path, pool_size=2)
+        await repo.init()
+        now = datetime.now(timezone.utc)
+        alerts = [_alert(f"r{i}", "SKU1", now) for i in range(5)]
+        first = await repo.upsert_incidents(alerts)
+        again = await repo.upsert_incidents(alerts[:2])
+        rows = await repo.list_incidents("OPEN", "u1")
+        await repo.close()
+        return first, again, rows
+
+    first, again, rows = asyncio.run(run())
+    assert len({inc.id for inc in first}) == 5  # same timestamp, distinct ids
+    assert [inc.id for inc in again] == [inc.id for inc in first[:2]]
+    assert len(rows) == 5
+
+    with sqlite3.connect(path) as conn:
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        plan = " ".join(str(r) for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM incidents WHERE owner_id=? AND status=? ORDER BY last_seen DESC",
+            ("u1", "OPEN"),
+        ))
+    assert {"ix_incidents_owner_status_last_seen", "ix_incidents_status_last_seen"} <= names
+    assert "ix_incidents_owner_status_last_seen" in plan
+
+
+def test_transaction_rolls_back_whole_pass(tmp_path):
+    async def run():
+        repo = Repo(str(tmp_path / "alert.db"))
+        await repo.init()
+        now = datetime.now(timezone.utc)
+        with pytest.raises(RuntimeError):
+            async with repo.transaction():
+                await repo.find_or_create_incident(_alert("r1", "A", now))
+                await repo.find_or_create_incident(_alert("r2", "A", now))
+                raise RuntimeError("boom")
+        rows = await repo.list_incidents(None)
+        await repo.close()
+        return rows
+
+    assert asyncio.run(run()) == []
+
+
+def test_throttle_window_serves_checks_from_memory(tmp_path):
+    path = str(tmp_path / "alert.db")
+
+    seeded_at = datetime.now(timezone.utc)
+
+    async def seed():
+        repo = Repo(path)
+        await repo.init()
+        await repo.find_or_create_incident(_alert("noisy", "A", seeded_at))
+        await repo.close()
+
+    async def run():
+        repo = Repo(path)
+        await repo.init()  # warms the window from incidents
+        opened = []
+        real_db = repo._db
+
+        def counting_db():
+            opened.append(1)
+            return real_db()
+
+        repo._db = counting_db
+        throttled = [await repo.is_throttled("noisy:A", "15m") for _ in range(50)]
+        for _ in range(50):
+            await repo.touch_incident("noisy:A")
+        unknown = await repo.is_throttled("other:B", "15m")
+        reads_before_flush = len(opened)
+        await repo.flush_touches()
+        await repo.close()
+        return throttled, unknown, reads_before_flush
+
+    asyncio.run(seed())
+    throttled, unknown, reads = asyncio.run(run())
+    assert all(throttled) and not unknown
+    assert reads == 0
+    with sqlite3.connect(path) as conn:
+        last_seen = conn.execute("SELECT last_seen FROM incidents WHERE fingerprint='noisy:A'").fetchone()[0]
+    assert datetime.fromisoformat(last_seen) > seeded_at
+
+
+def test_incident_pages_follow_cursor(tmp_path):
+    from datetime import timedelta
+
+    async def run():
+        repo = Repo(str(tmp_path / "alert.db"))
+        await repo.init()
+        base = datetime.now(timezone.utc)
+        await repo.upsert_incidents([
+            _alert(f"r{i}", "A", base + timedelta(seconds=i // 2), owner_id="u1" if i % 3 else "u2")
+            for i in range(10)
+        ])
+        full = await repo.list_incidents(None, "u1")
+        pages, cursor = [], None
+        while True:
+            rows, cursor = await repo.list_incidents_page(owner_id="u1", limit=2, cursor=cursor)
+            pages.append(rows)
+            if cursor is None:
+                break
+        filtered, _ = await repo.list_incidents_page(rule_id="r4", limit=10)
+        with pytest.raises(ValueError):
+            await repo.list_incidents_page(cursor="not-a-cursor")
+        await repo.close()
+        return full, pages, filtered
+
+    full, pages, filtered = asyncio.run(run())
+    flat = [r["id"] for page in pages for r in page]
+    assert len(flat) == len(set(flat)) == len(full) == 6
+    assert sorted(flat) == sorted(r["id"] for r in full)
+    assert all(len(p) <= 2 for p in pages)
+    assert [r["rule_id"] for r in filtered] == ["r4"]
+
+
+def test_buffered_touches_flush_without_further_traffic(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALERT_TOUCH_FLUSH_INTERVAL_S", "0.05")
+    path = str(tmp_path / "alert.db")
+    seeded_at = datetime.now(timezone.utc)
+
+    async def run():
+        repo = Repo(path)
+        await repo.init()
+        inc = await repo.find_or_create_incident(_alert("noisy", "A", seeded_at))
+        await repo.touch_incident("noisy:A")  # buffered, below the batch size
+        touched = (await repo.get_incident(inc.id))["last_seen"]
+        await repo.touch_incident("noisy:A")
+        await asyncio.sleep(0.2)  # no further touches: the background task writes it
+        with sqlite3.connect(path) as conn:
+            flushed = conn.execute("SELECT last_seen FROM incidents WHERE id=?", (inc.id,)).fetchone()[0]
+        await repo.close()
+        return touched, flushed
+
+    touched, flushed = asyncio.run(run())
+    assert datetime.fromisoformat(touched) > seeded_at
+    assert datetime.fromisoformat(flushed) > datetime.fromisoformat(touched)
+
+
+def test_pending_touch_never_moves_last_seen_back(tmp_path):
+    from datetime import timedelta
+
+    path = str(tmp_path / "alert.db")
+    now = datetime.now(timezone.utc)
+
+    async def run():
+        repo = Repo(path)
+        await repo.init()
+        await repo.find_or_create_incident(_alert("noisy", "A", now))
+        await repo.touch_incident("noisy:A")  # buffered at "now"
+        later = now + timedelta(hours=1)
+        await repo.upsert_incidents([_alert("noisy", "A", later)])  # transaction flushes on exit
+        await repo.close()
+        return later
+
+    later = asyncio.run(run())
+    with sqlite3.connect(path) as conn:
+        last_seen = conn.execute("SELECT last_seen FROM incidents WHERE fingerprint='noisy:A'").fetchone()[0]
+    assert datetime.fromisoformat(last_seen) == later
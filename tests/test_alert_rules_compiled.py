@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core.agents.alert_service.compiled import (
+    RuleIndex,
+    UnsafeExpression,
+    columns_for,
+    compile_where,
+)
+
+
+def _rule(source, where=None, detector=None, hold_for=None):
+    return SimpleNamespace(spec=SimpleNamespace(source=source, where=where, detector=detector, hold_for=hold_for))
+
+
+def test_compiled_where_scalar_and_alias():
+    pred = compile_where("pp.margin < 0.05 and proposed_price < current_price * 0.95")
+    assert pred.fields == {"margin", "proposed_price", "current_price"}
+    assert pred({"margin": 0.02, "proposed_price": 90, "current_price": 100})
+    assert not pred({"margin": 0.02, "proposed_price": 99, "current_price": 100})
+    assert not pred({"margin": 0.02})  # missing fields never fire
+    assert compile_where("pp.margin < 0.05") is compile_where("pp.margin < 0.05")
+
+
+@pytest.mark.parametrize("expr", [
+    "__import__('os').system('true')",
+    "margin.__class__",
+    "open('x')",
+    "[x for x in margin]",
+    "(lambda: 1)()",
+])
+def test_unsafe_expressions_rejected(expr):
+    with pytest.raises(UnsafeExpression):
+        compile_where(expr)
+
+
+def test_vectorized_matches_scalar():
+    exprs = [
+        "our_price > competitor_price * 1.1 or demand_index >= 0.9",
+        "not (0.2 < demand_index < 0.8)",
+        "abs(our_price - competitor_price) > 5",
+        "sku in ('A', 'C')",
+        "our_price / demand_index > 1",
+        "not (our_price / (competitor_price - 100) > 1)",
+        "our_price % 0 == 0",
+        "min(our_price, competitor_price, 110) < 101",
+        "max(our_price, competitor_price) > 110",
+    ]
+    rows = [
+        {"sku": "A", "our_price": 120.0, "competitor_price": 100.0, "demand_index": 0.5},
+        {"sku": "B", "our_price": 100.0, "competitor_price": 101.0, "demand_index": 0.95},
+        {"sku": "C", "our_price": 100.0, "competitor_price": None, "demand_index": 0.1},
+        {"sku": "D", "our_price": 98.0, "competitor_price": 100.0, "demand_index": 0.3},
+        {"sku": "E", "our_price": 50.0, "competitor_price": 100.0, "demand_index": 0.0},
+    ]
+    for expr in exprs:
+        pred = compile_where(expr)
+        columns, present = columns_for(rows, pred.fields)
+        assert list(pred.evaluate_columns(columns, present, len(rows))) == [pred(r) for r in rows], expr
+
+
+def test_vector_min_max_leave_columns_untouched():
+    pred = compile_where("min(a, b, c) < 1 or max(a, b, c) > 5")
+    rows = [{"a": 3.0, "b": 2.0, "c": 9.0}, {"a": 3.0, "b": 4.0, "c": 4.0}]
+    columns, present = columns_for(rows, pred.fields)
+    assert list(pred.evaluate_columns(columns, present, 2)) == [True, False]
+    assert list(columns["c"]) == [9.0, 4.0]
+    for expr in ("min(a)", "abs(a, b)", "round(a, 1, b)"):
+        with pytest.raises(UnsafeExpression):
+            compile_where(expr)
+
+
+def test_rule_index_groups_by_source():
+    index = RuleIndex()
+    for i in range(500):
+        index.add(f"t{i}", _rule("MARKET_TICK", where=f"our_price > {i}"))
+    index.add("pp", _rule(" price_proposal ", where="margin < 0.05"))
+    index.add("det", _rule("PRICE_PROPOSAL", detector="ewma_zscore"))
+    index.add("held", _rule("PRICE_PROPOSAL", where="margin < 0", hold_for="5m"))
+
+    assert len(index) == 503
+    assert [e.id for e in index.for_source("price_proposal")] == ["pp", "det", "held"]
+    assert [e.stateless for e in index.for_source("PRICE_PROPOSAL")] == [True, False, False]
+    assert index.for_source("UNKNOWN") == []
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from core.agents.alert_service.repo import Repo
+from core.agents.alert_service.stream import IncidentStream
+
+
+def test_updates_fan_out_per_owner():
+    async def run():
+        stream = IncidentStream(max_queue=2)
+        async with stream.listen("u1") as mine, stream.listen("u2") as theirs:
+            stream.publish({"id": "inc_1", "owner_id": "u1", "status": "OPEN"})
+            stream.publish({"id": "inc_2", "owner_id": None, "status": "OPEN"})
+            stream.publish(SimpleNamespace(sku="SYS", title="AlertEngine ready"))  # not an incident
+            for i in range(3):
+                stream.publish({"id": "inc_3", "owner_id": "u2", "status": f"S{i}"})
+            got_mine = [mine.get_nowait()["id"] for _ in range(mine.qsize())]
+            got_theirs = [theirs.get_nowait()["status"] for _ in range(theirs.qsize())]
+        return stream, got_mine, got_theirs
+
+    stream, mine, theirs = asyncio.run(run())
+    assert mine == ["inc_1", "inc_2"]
+    assert theirs == ["S1", "S2"]  # bounded queue keeps the newest updates
+    assert stream.listener_count() == 0
+
+
+def test_fired_rule_reaches_stream_listener(tmp_path, monkeypatch):
+    engine_mod = pytest.importorskip("core.agents.alert_service.engine")
+
+    async def run():
+        repo = Repo(str(tmp_path / "alert.db"))
+        await repo.init()
+        engine = engine_mod.AlertEngine(repo)
+        delivered = []
+        monkeypatch.setattr(engine.dispatcher, "enqueue", lambda inc, rule: delivered.append(inc))
+
+        async def owner_of(sku):
+            return "u1"
+
+        monkeypatch.setattr(engine.owners, "get", owner_of)
+        spec = SimpleNamespace(severity="crit", notify=SimpleNamespace(throttle="15m"))
+        entry = SimpleNamespace(id="low_margin", rule=SimpleNamespace(spec=spec))
+        stream = IncidentStream()
+        async with stream.listen("u1") as mine, stream.listen("u2") as theirs:
+            await engine._fire([(entry, SimpleNamespace(sku="SKU1"))], datetime.now(timezone.utc))
+            got = await asyncio.wait_for(mine.get(), 1.0)
+            leaked = theirs.qsize()
+        await repo.close()
+        return got, leaked, delivered
+
+    got, leaked, delivered = asyncio.run(run())
+    assert got["rule_id"] == "low_margin" and got["owner_id"] == "u1"
+    assert leaked == 0 and len(delivered) == 1
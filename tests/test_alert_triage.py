@@ -0,0 +1,86 @@
+import asyncio
+
+from core.agents.alert_service.triage import TriageQueue, proposal_margin
+
+
+def test_prefilter_coalesce_and_batch():
+    batches = []
+
+    async def handler(batch):
+        batches.append([e["sku"] for e in batch])
+
+    async def run():
+        q = TriageQueue(handler, window_s=0.01, max_batch=3, concurrency=1, margin_low=0.0, margin_high=0.08)
+        assert not q.submit({"sku": "healthy", "margin": 0.3})
+        assert not q.submit({"sku": "loss", "margin": -0.2})
+        assert q.submit({"sku": "nomargin"})
+        for i in range(5):
+            q.submit({"sku": f"s{i}", "margin": 0.02})
+        for _ in range(10):
+            q.submit({"sku": "s0", "margin": 0.03})
+        await q.drain()
+        return q
+
+    q = asyncio.run(run())
+    assert sorted(sum(batches, [])) == ["nomargin", "s0", "s1", "s2", "s3", "s4"]
+    assert all(len(b) <= 3 for b in batches)
+    assert q.stats["filtered"] == 2 and q.stats["coalesced"] == 10
+    assert q.stats["triaged"] == 6
+
+
+def test_concurrency_cap_and_nonblocking_submit():
+    active = 0
+    peak = 0
+
+    async def handler(batch):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+
+    async def run():
+        q = TriageQueue(handler, window_s=0.0, max_batch=1, concurrency=2, margin_low=0.0, margin_high=0.1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i in range(8):
+            q.submit({"sku": f"s{i}", "margin": 0.05})
+        submit_time = loop.time() - start
+        await q.drain()
+        return q, submit_time
+
+    q, submit_time = asyncio.run(run())
+    assert submit_time < 0.01
+    assert peak == 2
+    assert q.stats["batches"] == 8
+
+
+def test_bus_proposal_payload_reaches_triage():
+    # Shape published by the pricing optimizer, supervisor and MCP client
+    def proposal(sku, proposed):
+        return {"proposal_id": f"p-{sku}", "product_id": sku, "previous_price": 100.0, "proposed_price": proposed}
+
+    async def handler(batch):
+        pass
+
+    q = TriageQueue(handler, margin_low=0.0, margin_high=0.08)
+    thin, healthy, unknown = proposal("thin", 104.0), proposal("healthy", 150.0), proposal("nocost", 99.0)
+    thin["margin"] = proposal_margin(thin, 100.0)
+    healthy["margin"] = proposal_margin(healthy, 100.0)
+    unknown["margin"] = proposal_margin(unknown, None)
+
+    async def run():
+        return q.submit(thin), q.submit(healthy), q.submit(unknown), q.pending()
+
+    assert asyncio.run(run()) == (True, False, True, 2)
+    assert proposal_margin({"product_id": "x"}, 10.0) is None
+
+    # By default loss-making proposals are never filtered out
+    loss = proposal("loss", 80.0)
+    loss["margin"] = proposal_margin(loss, 100.0)
+    default_q = TriageQueue(handler, margin_high=0.08)
+
+    async def run_default():
+        return default_q.submit(loss)
+
+    assert loss["margin"] < 0 and asyncio.run(run_default()) is True
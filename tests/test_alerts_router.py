@@ -0,0 +1,32 @@
+import pytest
+
+alerts = pytest.importorskip("backend.routers.alerts")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.deps import get_current_user_for_alerts
+
+
+def test_incident_listing_is_owner_scoped(monkeypatch):
+    calls = []
+
+    async def list_incidents(status=None, owner_id=None, severity=None, rule_id=None, sku=None):
+        calls.append(("full", owner_id, severity, rule_id, sku))
+        return []
+
+    async def list_incidents_page(status=None, owner_id=None, limit=50, cursor=None, severity=None, rule_id=None, sku=None):
+        calls.append(("page", owner_id, severity, rule_id, sku))
+        return [], None
+
+    monkeypatch.setattr(alerts.alert_api, "list_incidents", list_incidents)
+    monkeypatch.setattr(alerts.alert_api, "list_incidents_page", list_incidents_page)
+    app = FastAPI()
+    app.include_router(alerts.router)
+    app.dependency_overrides[get_current_user_for_alerts] = lambda: {"user_id": 7}
+    client = TestClient(app)
+
+    assert client.get("/api/alerts/incidents", params={"sku": "A"}).status_code == 200
+    page = client.get("/api/alerts/incidents", params={"limit": 5, "severity": "crit", "rule_id": "r1"})
+    assert page.json() == {"incidents": [], "count": 0, "next_cursor": None}
+    assert calls == [("full", "7", None, None, "A"), ("page", "7", "crit", "r1", None)]
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from core.agents.agent_sdk import auth
+
+
+@pytest.fixture(autouse=True)
+def _fresh_auth():
+    if not auth._get_auth_config()[0]:
+        pytest.skip("MCP_AUTH_SECRET not configured")
+    auth.clear_token_cache()
+    auth.reset_auth_metrics()
+    yield
+    auth.clear_token_cache()
+
+
+def test_repeat_verification_hits_cache_and_keeps_metrics():
+    token = auth.create_token({"read", "write"}, expiry_seconds=60)
+    first = auth.verify_capability(token, "read")
+    second = auth.verify_capability(token, "write")
+    assert second["scopes"] == first["scopes"] == {"read", "write"}
+    assert second["expiry"] == first["expiry"]
+
+    metrics = auth.get_auth_metrics()
+    assert metrics["token_cache_misses"] == 1
+    assert metrics["token_cache_hits"] == 1
+    assert metrics["tokens_verified"] == 2
+
+    with pytest.raises(auth.InsufficientScopeError):
+        auth.verify_capability(token, "admin")
+    assert auth.get_auth_metrics()["scope_denials"] == 1
+
+
+def test_cached_token_still_expires(monkeypatch):
+    token = auth.create_token({"read"}, expiry_seconds=1)
+    auth.verify_capability(token, "read")
+    later = time.time() + 10
+    monkeypatch.setattr(auth.time, "time", lambda: later)
+    with pytest.raises(auth.TokenExpiredError):
+        auth.verify_capability(token, "read")
+    assert len(auth._token_cache) == 0
+
+
+def test_tampered_token_is_not_served_from_cache():
+    token = auth.create_token({"read"}, expiry_seconds=60)
+    auth.verify_capability(token, "read")
+    payload, sig = token.rsplit(".", 1)
+    with pytest.raises(auth.InvalidTokenError):
+        auth.verify_capability(payload.replace("read", "admin") + "." + sig, "admin")
@@ -0,0 +1,70 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from core.agents.data_collector.catalog_import import detect_format, run_catalog_import, validate_chunk
+from core.agents.data_collector.repo import DataRepo
+
+
+def _frame(n: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "sku": [f"SKU{i}" for i in range(n)],
+            "title": [f"Product {i}" for i in range(n)],
+            "currency": ["USD"] * n,
+            "current_price": [10.0 + i for i in range(n)],
+            "cost": [5.0] * n,
+            "stock": [i for i in range(n)],
+        }
+    )
+
+
+def test_detect_format():
+    assert detect_format("catalog.CSV") == "csv"
+    assert detect_format("catalog.ndjson") == "jsonl"
+    assert detect_format("catalog.parquet") == "parquet"
+    with pytest.raises(ValueError):
+        detect_format("catalog.txt")
+
+
+def test_validate_chunk_rejects_bad_rows():
+    df = _frame(5).astype({"stock": object})
+    df.loc[1, "current_price"] = -1
+    df.loc[2, "stock"] = "lots"
+    df.loc[3, "sku"] = "SKU4"
+    valid, errors = validate_chunk(df)
+    assert list(valid["sku"]) == ["SKU0", "SKU4"]
+    assert len(errors) == 3
+
+    with pytest.raises(ValueError):
+        validate_chunk(df.drop(columns=["cost"]))
+
+
+@pytest.mark.parametrize("fmt,ext", [("csv", ".csv"), ("jsonl", ".jsonl"), ("parquet", ".parquet")])
+def test_run_catalog_import_in_chunks(tmp_path, fmt, ext):
+    path = tmp_path / f"catalog{ext}"
+    df = _frame(250)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "jsonl":
+        df.to_json(path, orient="records", lines=True)
+    else:
+        df.to_parquet(path)
+
+    repo = DataRepo(tmp_path / "data.db")
+    asyncio.run(repo.init())
+    job_id = asyncio.run(repo.create_catalog_import_job("owner-1", path.name, fmt))
+
+    result = asyncio.run(run_catalog_import(repo, job_id, str(path), fmt, "owner-1", chunksize=100))
+    assert result["status"] == "DONE"
+
+    job = asyncio.run(repo.get_catalog_import_job(job_id, "owner-1"))
+    assert job["status"] == "DONE"
+    assert job["chunks"] == 3
+    assert job["rows_processed"] == 250
+    assert job["rows_inserted"] == 250
+    assert job["finished_at"] is not None
+    assert not path.exists()
+    assert len(asyncio.run(repo.get_products_by_owner("owner-1"))) == 250
+    assert asyncio.run(repo.get_catalog_import_job(job_id, "someone-else")) is None
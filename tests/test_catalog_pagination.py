@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from core.agents.data_collector.repo import DataRepo, decode_cursor, encode_cursor
+
+
+def _seed(repo: DataRepo, n: int = 25):
+    rows = [
+        {
+            "sku": f"SKU{i:03d}",
+            "title": f"Product {i}",
+            "currency": "USD",
+            "current_price": 10.0 + i,
+            "cost": 5.0,
+            "stock": i,
+            # Pairs of rows share a timestamp to exercise the sku tie-break
+            "updated_at": f"2025-01-01T00:00:{i // 2:02d}+00:00",
+        }
+        for i in range(n)
+    ]
+    asyncio.run(repo.upsert_products(rows, "owner-1"))
+    asyncio.run(repo.upsert_products([{"sku": "OTHER", "current_price": 1.0}], "owner-2"))
+
+
+def test_keyset_pages_cover_catalog_once(tmp_path):
+    repo = DataRepo(tmp_path / "data.db")
+    asyncio.run(repo.init())
+    _seed(repo)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        rows, cursor = asyncio.run(repo.get_products_page("owner-1", limit=7, cursor=cursor))
+        seen.extend(r["sku"] for r in rows)
+        pages += 1
+        if cursor is None:
+            break
+
+    full = [r["sku"] for r in asyncio.run(repo.get_products_by_owner("owner-1"))]
+    assert pages == 4
+    assert len(seen) == 25 and len(set(seen)) == 25
+    assert set(seen) == set(full)
+    assert "OTHER" not in seen
+
+
+def test_keyset_pages_reach_rows_without_updated_at(tmp_path):
+    import sqlite3
+
+    repo = DataRepo(tmp_path / "data.db")
+    asyncio.run(repo.init())
+    _seed(repo, n=5)
+    with sqlite3.connect(tmp_path / "data.db") as conn:
+        conn.executemany(
+            "INSERT INTO product_catalog (sku, owner_id, updated_at) VALUES (?, 'owner-1', NULL)",
+            [(f"LEGACY{i}",) for i in range(4)],
+        )
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = asyncio.run(repo.get_products_page("owner-1", limit=2, cursor=cursor))
+        seen.extend(r["sku"] for r in rows)
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 9
+    assert seen[-4:] == ["LEGACY3", "LEGACY2", "LEGACY1", "LEGACY0"]
+
+    with sqlite3.connect(tmp_path / "data.db") as conn:
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        plan = " ".join(str(r[-1]) for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT sku FROM product_catalog WHERE owner_id=? "
+            "AND COALESCE(updated_at, '') < ? ORDER BY COALESCE(updated_at, '') DESC, sku DESC LIMIT 3",
+            ("owner-1", "z"),
+        ))
+    assert "idx_product_catalog_owner_updated_sku" not in names
+    assert "idx_product_catalog_owner_keyset" in plan and "TEMP B-TREE" not in plan
+
+
+def test_page_field_projection(tmp_path):
+    repo = DataRepo(tmp_path / "data.db")
+    asyncio.run(repo.init())
+    _seed(repo, n=3)
+
+    rows, cursor = asyncio.run(repo.get_products_page("owner-1", limit=2, fields=["current_price"]))
+    assert [set(r) for r in rows] == [{"current_price"}, {"current_price"}]
+    assert cursor is not None
+
+    with pytest.raises(ValueError):
+        asyncio.run(repo.get_products_page("owner-1", fields=["password"]))
+
+
+def test_iter_products_streams_all_rows(tmp_path):
+    repo = DataRepo(tmp_path / "data.db")
+    asyncio.run(repo.init())
+    _seed(repo, n=12)
+
+    async def collect():
+        return [r async for r in repo.iter_products_by_owner("owner-1", fields=["sku"], batch_size=5)]
+
+    rows = asyncio.run(collect())
+    assert len(rows) == 12
+    assert all(set(r) == {"sku"} for r in rows)
+
+
+def test_cursor_roundtrip_and_rejects_garbage():
+    token = encode_cursor("2025-01-01T00:00:00+00:00", "SKU/1")
+    assert decode_cursor(token) == ("2025-01-01T00:00:00+00:00", "SKU/1")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from core.agents.chat_executor import ChatExecutor, tool_latency
+
+
+def test_async_executor_awaits_coroutines_on_caller_loop():
+    executor = ChatExecutor(logging.getLogger("test"))
+    seen = {}
+
+    async def lookup(sku):
+        seen["loop"] = asyncio.get_running_loop()
+        return {"sku": sku}
+
+    def blocking(n):
+        seen["thread"] = threading.current_thread().name
+        return n * 2
+
+    async def run():
+        tools_used = []
+        fns = {"lookup": lookup, "blocking": blocking}
+        a = await executor.aexecute_tool_call("lookup", '{"sku": "A1"}', fns, tools_used)
+        b = await executor.aexecute_tool_call("blocking", '{"n": 21}', fns, tools_used)
+        c = await executor.aexecute_tool_call("missing", "{}", fns, tools_used)
+        return asyncio.get_running_loop(), a, b, c, tools_used
+
+    tool_latency.reset()
+    loop, a, b, c, tools_used = asyncio.run(run())
+    assert a == {"sku": "A1"} and seen["loop"] is loop
+    assert b == 42 and seen["thread"].startswith("llm-tool")
+    assert c == {"error": "unknown tool: missing"}
+    assert tools_used == ["lookup", "blocking", "missing"]
+
+    stats = tool_latency.snapshot()
+    assert stats["lookup"]["calls"] == 1 and stats["lookup"]["errors"] == 0
+    assert stats["missing"]["errors"] == 1
+    assert stats["blocking"]["avg_ms"] >= 0
+
+
+def test_sync_executor_reuses_one_loop_for_coroutines():
+    executor = ChatExecutor(logging.getLogger("test"))
+    loops = []
+
+    async def tool():
+        loops.append(asyncio.get_running_loop())
+        raise ValueError("boom")
+
+    results = [executor.execute_tool_call("tool", "{}", {"tool": tool}, []) for _ in range(3)]
+    assert results == [{"error": "boom"}] * 3
+    assert len(set(map(id, loops))) == 1
+
+
+def test_round_runs_concurrently_and_keeps_order():
+    executor = ChatExecutor(logging.getLogger("test"))
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def slow(i):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05 * (5 - i))
+        with lock:
+            active["now"] -= 1
+        return i
+
+    calls = [("slow", json.dumps({"i": i})) for i in range(5)]
+    results = executor.execute_tool_calls(calls, {"slow": slow}, [], max_concurrency=3)
+    assert results == [0, 1, 2, 3, 4]
+    assert active["peak"] == 3
+
+    async def aslow(i):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01 * (5 - i))
+        active["now"] -= 1
+        return i
+
+    active["peak"] = 0
+    tools_used = []
+    results = asyncio.run(executor.aexecute_tool_calls(
+        [("aslow", json.dumps({"i": i})) for i in range(5)] + [("nope", "{}")],
+        {"aslow": aslow}, tools_used, max_concurrency=2,
+    ))
+    assert results[:5] == [0, 1, 2, 3, 4] and results[5] == {"error": "unknown tool: nope"}
+    assert active["peak"] == 2
+    assert tools_used == ["aslow", "nope"]
+
+
+def test_async_executor_keeps_context_for_sync_tools():
+    from core.agents.user_interact.context import get_owner_id, set_owner_id
+
+    executor = ChatExecutor(logging.getLogger("test"))
+
+    def whoami():
+        return get_owner_id()
+
+    async def run():
+        set_owner_id("42")
+        return await executor.aexecute_tool_call("whoami", "{}", {"whoami": whoami}, [])
+
+    assert asyncio.run(run()) == "42"
+
+
+def test_parallel_round_keeps_owner_context():
+    from core.agents.user_interact.context import _owner_id_ctx, get_owner_id, set_owner_id
+
+    executor = ChatExecutor(logging.getLogger("test"))
+
+    def whoami():
+        time.sleep(0.01)
+        return get_owner_id()
+
+    async def awhoami():
+        return get_owner_id()
+
+    token = _owner_id_ctx.set(None)
+    try:
+        set_owner_id("42")
+        fns = {"whoami": whoami, "awhoami": awhoami}
+        calls = [("whoami", "{}"), ("whoami", "{}"), ("awhoami", "{}")]
+        assert executor.execute_tool_calls(calls, fns, []) == ["42", "42", "42"]
+        assert asyncio.run(executor.aexecute_tool_calls(calls, fns, [])) == ["42", "42", "42"]
+    finally:
+        _owner_id_ctx.reset(token)
@@ -0,0 +1,168 @@
+import asyncio
+import sqlite3
+import uuid
+
+from core.agents.data_collector.job_events import get_job_waiters, request_key
+from core.agents.data_collector.repo import DataRepo
+from core.agents.data_collector.scheduler import CollectionScheduler, TokenBucket
+from core.agents.data_collector.tools import Tools
+
+
+class FakeTools:
+    """Like the real Tools: start_collection_job only publishes a request and
+    returns; the job finishes later and is announced through the job waiters."""
+
+    def __init__(self, stale, job_s=0.01):
+        self.stale = list(stale)
+        self.job_s = job_s
+        self.started = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.not_collectable = []
+
+    async def get_stale_products(self, threshold_minutes=60, limit=20, collectable_only=False):
+        collected = {sku for sku, _ in self.started}
+        rows = [
+            p for p in self.stale
+            if p["sku"] not in collected and (p["source_url"] or not collectable_only)
+        ][:limit]
+        return {"ok": True, "stale_products": rows}
+
+    async def mark_not_collectable(self, sku, market="DEFAULT"):
+        self.not_collectable.append(sku)
+        return {"ok": True, "sku": sku}
+
+    async def _run_job(self, request_id):
+        await asyncio.sleep(self.job_s)
+        self.in_flight -= 1
+        get_job_waiters().notify(request_key(request_id), "DONE")
+
+    async def start_collection_job(self, sku, market="DEFAULT", connector="mock", depth=5):
+        request_id = uuid.uuid4().hex
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.started.append((sku, connector))
+        asyncio.get_running_loop().create_task(self._run_job(request_id))
+        return {"ok": True, "request_id": request_id}
+
+
+def _products():
+    return [
+        {"sku": "FRESHISH", "minutes_stale": 61, "source_url": None},
+        {"sku": "NEVER", "minutes_stale": None, "source_url": None},
+        {"sku": "OLD", "minutes_stale": 500, "source_url": None},
+        {"sku": "OLD_URL", "minutes_stale": 300, "source_url": "https://shop.example.com/x"},
+    ]
+
+
+def test_refill_orders_by_staleness_and_importance():
+    async def run():
+        sched = CollectionScheduler(FakeTools(_products()), workers=1, fallback_connector="mock")
+        assert await sched.refill() == 4
+        # Re-refilling does not duplicate pending SKUs
+        assert await sched.refill() == 0
+        order = []
+        while not sched._queue.empty():
+            order.append(sched._queue.get_nowait()[2]["sku"])
+        return order
+
+    assert asyncio.run(run()) == ["NEVER", "OLD_URL", "OLD", "FRESHISH"]
+
+
+def test_workers_drain_queue_with_bounded_concurrency():
+    async def run():
+        stale = [{"sku": f"SKU{i}", "minutes_stale": i, "source_url": None} for i in range(30)]
+        tools = FakeTools(stale)
+        sched = CollectionScheduler(
+            tools, workers=3, idle_interval_s=0.05, connector_rates={"mock": 1000}, fallback_connector="mock"
+        )
+        await sched.start()
+        for _ in range(100):
+            if sched.stats()["completed"] == 30:
+                break
+            await asyncio.sleep(0.02)
+        await sched.stop()
+        return tools, sched
+
+    tools, sched = asyncio.run(run())
+    assert sorted(sku for sku, _ in tools.started) == sorted(f"SKU{i}" for i in range(30))
+    assert tools.max_in_flight == 3
+    assert sched.stats()["started"] == 30 and sched.stats()["completed"] == 30
+
+
+def test_worker_slot_released_on_job_timeout():
+    async def run():
+        tools = FakeTools([{"sku": "SLOW", "minutes_stale": 90, "source_url": None}], job_s=10)
+        sched = CollectionScheduler(tools, workers=1, job_timeout_s=0.05, fallback_connector="mock")
+        await sched.refill()
+        await sched._run_one(sched._queue.get_nowait()[2])
+        return sched.stats()
+
+    stats = asyncio.run(run())
+    assert stats["started"] == 1 and stats["timed_out"] == 1 and stats["completed"] == 0
+
+
+def test_skus_without_url_are_skipped_by_default():
+    async def run():
+        tools = FakeTools(_products())
+        sched = CollectionScheduler(tools, workers=1)
+        added = await sched.refill()
+        again = await sched.refill()
+        product = sched._queue.get_nowait()[2]
+        await sched._run_one(product)
+        await sched._run_one({"sku": "ADVICE", "minutes_stale": None, "connector": None})
+        return added, again, tools, sched.stats()
+
+    added, again, tools, stats = asyncio.run(run())
+    assert added == 1 and again == 0
+    assert tools.started == [("OLD_URL", "web_scraper")]
+    assert tools.not_collectable == ["ADVICE"]
+    assert stats["skipped"] == 1
+
+
+def test_url_less_skus_do_not_crowd_out_collectable_ones(tmp_path):
+    async def run():
+        repo = DataRepo(tmp_path / "data.db")
+        await repo.init()
+        # source_url is added to product_catalog by scripts/migrate_add_source_url.py
+        with sqlite3.connect(repo.path) as conn:
+            conn.execute("ALTER TABLE product_catalog ADD COLUMN source_url TEXT")
+        rows = [{"sku": f"BARE{i:03d}", "current_price": 1.0} for i in range(30)]
+        await repo.upsert_products(rows + [{"sku": "HAS_URL", "current_price": 1.0}], "owner-1")
+        with sqlite3.connect(repo.path) as conn:
+            conn.execute("UPDATE product_catalog SET source_url='https://shop.example.com/p' WHERE sku='HAS_URL'")
+        tools = Tools(repo)
+        sched = CollectionScheduler(tools, workers=1, batch_size=10)
+        added = await sched.refill()
+        queued = sched._queue.get_nowait()[2]["sku"]
+        await tools.mark_not_collectable("BARE000")
+        return added, queued
+
+    added, queued = asyncio.run(run())
+    assert (added, queued) == (1, "HAS_URL")
+    with sqlite3.connect(tmp_path / "data.db") as conn:
+        status = conn.execute("SELECT last_job_status FROM sku_freshness WHERE sku='BARE000'").fetchone()[0]
+    assert status == "NO_SOURCE"
+
+
+def test_submit_boosts_advice_ahead_of_queue():
+    async def run():
+        sched = CollectionScheduler(FakeTools(_products()), workers=1, fallback_connector="mock")
+        await sched.refill()
+        assert sched.submit("OLD")["queued"] is False
+        assert sched.submit("HOT", connector="web_scraper")["queued"] is True
+        return sched._queue.get_nowait()[2]
+
+    assert asyncio.run(run())["sku"] == "HOT"
+
+
+def test_token_bucket_limits_rate():
+    async def run():
+        bucket = TokenBucket(rate=20, burst=1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(5):
+            await bucket.acquire()
+        return loop.time() - start
+
+    assert asyncio.run(run()) >= 0.18
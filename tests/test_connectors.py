@@ -0,0 +1,85 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from core.agents.data_collector.connectors.base import (
+    ConnectorRequest,
+    connector_names,
+    get_connector,
+    register_connector,
+    run_connector,
+)
+from core.agents.data_collector.repo import DataRepo
+
+
+def test_builtin_connectors_registered():
+    assert {"mock", "web_scraper"} <= set(connector_names())
+    assert get_connector("web_scraper").requires_urls
+    assert get_connector("nope") is None
+
+
+def test_mock_connector_into_batched_ingest(tmp_path):
+    async def run():
+        repo = DataRepo(tmp_path / "data.db")
+        await repo.init()
+        n = await run_connector(get_connector("mock"), ConnectorRequest(sku="A1", depth=7), repo.insert_ticks)
+        return repo, n
+
+    repo, n = asyncio.run(run())
+    assert n == 7
+    with sqlite3.connect(repo.path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM market_ticks WHERE sku='A1'").fetchone()[0] == 7
+        assert conn.execute("SELECT tick_count FROM sku_freshness WHERE sku='A1'").fetchone()[0] == 7
+
+
+def test_backpressure_and_concurrency_limits():
+    state = {"produced": 0, "running": 0, "max_running": 0}
+
+    @register_connector("test_fast", concurrency=2)
+    async def fast(req):
+        state["running"] += 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        try:
+            for i in range(20):
+                state["produced"] += 1
+                yield [{"sku": req.sku, "our_price": float(i)}]
+        finally:
+            state["running"] -= 1
+
+    async def run():
+        consumed = []
+        lag = []
+
+        async def slow_sink(batch):
+            # Producer may run at most queue size + one in-hand batch ahead of the sink
+            lag.append(state["produced"] - len(consumed))
+            await asyncio.sleep(0.001)
+            consumed.append(batch)
+
+        spec = get_connector("test_fast")
+        counts = await asyncio.gather(
+            *(run_connector(spec, ConnectorRequest(sku=f"S{i}"), slow_sink, max_pending_batches=2) for i in range(5))
+        )
+        return counts, lag
+
+    counts, lag = asyncio.run(run())
+    assert counts == [20] * 5
+    assert state["max_running"] == 2
+    assert max(lag) <= 2 * (2 + 2)
+
+
+def test_connector_errors_propagate():
+    @register_connector("test_broken")
+    async def broken(req):
+        yield [{"sku": req.sku, "our_price": 1.0}]
+        raise RuntimeError("feed down")
+
+    got = []
+
+    async def sink(batch):
+        got.extend(batch)
+
+    with pytest.raises(RuntimeError, match="feed down"):
+        asyncio.run(run_connector(get_connector("test_broken"), ConnectorRequest(sku="X"), sink))
+    assert len(got) == 1
@@ -0,0 +1,78 @@
+import sqlite3
+
+from core.agents.agent_sdk.idempotency import IdempotencyStore
+
+
+class Clock:
+    def __init__(self, t: float = 1_000_000.0) -> None:
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def test_duplicates_and_ttl_eviction(tmp_path):
+    clock = Clock()
+    store = IdempotencyStore("t", ttl_s=60, bucket_s=10, db_path=tmp_path / "i.db", clock=clock)
+    assert store.check_and_add("a") is True
+    assert store.check_and_add("a") is False
+    assert store.seen("a")
+
+    for i in range(100):
+        clock.t += 1
+        store.check_and_add(f"k{i}")
+    # Only keys from the last TTL window (plus one partial bucket) stay in memory
+    assert len(store) <= 70
+    assert not store.seen("a")
+    assert store.check_and_add("a") is True
+
+    with sqlite3.connect(tmp_path / "i.db") as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM idempotency_keys WHERE expires_at <= ?", (clock.t,)).fetchone()[0]
+    assert rows == 0
+
+
+def test_duplicates_survive_restart(tmp_path):
+    clock = Clock()
+    first = IdempotencyStore("fetch", ttl_s=60, db_path=tmp_path / "i.db", clock=clock)
+    assert first.check_and_add("req-1")
+    first.close()
+
+    second = IdempotencyStore("fetch", ttl_s=60, db_path=tmp_path / "i.db", clock=clock)
+    other_ns = IdempotencyStore("other", ttl_s=60, db_path=tmp_path / "i.db", clock=clock)
+    assert second.check_and_add("req-1") is False
+    assert other_ns.check_and_add("req-1") is True
+
+    clock.t += 61
+    third = IdempotencyStore("fetch", ttl_s=60, db_path=tmp_path / "i.db", clock=clock)
+    assert third.check_and_add("req-1") is True
+
+
+def test_memory_only_mode():
+    store = IdempotencyStore("mem", ttl_s=5, persist=False)
+    assert store.check_and_add("x")
+    assert not store.check_and_add("x")
+
+
+def test_async_check_runs_sqlite_off_the_loop(tmp_path):
+    import asyncio
+    import threading
+
+    store = IdempotencyStore("async", ttl_s=60, db_path=tmp_path / "i.db")
+    threads = []
+    real_db = store._db
+
+    def recording_db():
+        threads.append(threading.get_ident())
+        return real_db()
+
+    store._db = recording_db
+
+    async def run():
+        loop_thread = threading.get_ident()
+        first = await store.acheck_and_add("req-1")
+        again = await store.acheck_and_add("req-1")  # answered from memory
+        return loop_thread, first, again
+
+    loop_thread, first, again = asyncio.run(run())
+    assert first is True and again is False
+    assert threads and loop_thread not in threads
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+from core.agents.data_collector.job_events import JobWaiters, get_job_waiters, wait_for_job
+from core.agents.data_collector.repo import DataRepo
+
+
+def test_mark_job_done_wakes_many_waiters(tmp_path):
+    async def run():
+        repo = DataRepo(tmp_path / "data.db")
+        await repo.init()
+        job_ids = [await repo.create_job(f"SKU{i}", "DEFAULT", "mock", 1) for i in range(1000)]
+        waits = [asyncio.create_task(wait_for_job(j, timeout_s=5)) for j in job_ids]
+        await asyncio.sleep(0)
+        assert get_job_waiters().pending_count() >= 1000
+        for j in job_ids[:-1]:
+            await repo.mark_job_done(j)
+        await repo.mark_job_failed(job_ids[-1], "boom")
+        return await asyncio.gather(*waits)
+
+    statuses = asyncio.run(run())
+    assert statuses[:-1] == ["DONE"] * 999
+    assert statuses[-1] == "FAILED"
+    assert get_job_waiters().pending_count() == 0
+
+
+def test_notify_from_another_thread_and_late_waiters():
+    waiters = JobWaiters()
+
+    async def run():
+        task = asyncio.create_task(waiters.wait("job-1", timeout=2))
+        await asyncio.sleep(0.01)
+        threading.Thread(target=waiters.notify, args=("job-1", "DONE")).start()
+        first = await task
+        # Arriving after completion returns immediately
+        late = await waiters.wait("job-1", timeout=0.01)
+        missing = await waiters.wait("job-2", timeout=0.01)
+        return first, late, missing
+
+    first, late, missing = asyncio.run(run())
+    assert first["status"] == late["status"] == "DONE"
+    assert missing is None
+
+
+def test_fallback_check_for_out_of_process_jobs():
+    calls = []
+
+    async def check():
+        calls.append(1)
+        return "DONE" if len(calls) >= 3 else "RUNNING"
+
+    async def run():
+        return await wait_for_job("remote-job", timeout_s=2, check=check, fallback_interval_s=0.01)
+
+    assert asyncio.run(run()) == "DONE"
+    assert len(calls) == 3
+
+
+def test_get_job_scoped_to_sku_owner(tmp_path):
+    async def run():
+        repo = DataRepo(tmp_path / "data.db")
+        await repo.init()
+        await repo.upsert_products([{"sku": "MINE", "title": "t"}], "u1")
+        mine = await repo.create_job("MINE", "DEFAULT", "mock", 1)
+        other = await repo.create_job("THEIRS", "DEFAULT", "mock", 1)
+        return (
+            await repo.get_job(mine, "u1"),
+            await repo.get_job(mine, "u2"),
+            await repo.get_job(other, "u1"),
+            await repo.get_job(other),
+        )
+
+    mine, foreign, unowned, unscoped = asyncio.run(run())
+    assert mine["sku"] == "MINE"
+    assert foreign is None and unowned is None
+    assert unscoped["sku"] == "THEIRS"
@@ -0,0 +1,87 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+from core.agents.llm_client import LLMClient
+
+
+def _response(content=None, tool_calls=None):
+    resp = Mock()
+    resp.choices = [Mock(message=Mock(content=content, tool_calls=tool_calls))]
+    resp.usage = Mock(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+    return resp
+
+
+def _openai(async_client):
+    mod = Mock()
+    mod.OpenAI = Mock(return_value=Mock())
+    mod.AsyncOpenAI = Mock(return_value=async_client)
+    return mod
+
+
+def test_achat_uses_shared_async_client():
+    async_client = Mock()
+    async_client.chat.completions.create = AsyncMock(return_value=_response("hi"))
+    mod = _openai(async_client)
+
+    async def run(client):
+        first = await client.achat([{"role": "user", "content": "Hello"}])
+        second = await client.achat([{"role": "user", "content": "Again"}])
+        return first, second
+
+    with patch("core.agents.llm_client.importlib.import_module", return_value=mod):
+        client = LLMClient(api_key="test-key")
+        assert asyncio.run(run(client)) == ("hi", "hi")
+
+    # One AsyncOpenAI client per provider per loop, on an httpx pool
+    assert mod.AsyncOpenAI.call_count == 1
+    assert mod.AsyncOpenAI.call_args.kwargs["http_client"] is not None
+    assert client.last_usage["total_tokens"] == 15
+    mod.OpenAI.return_value.chat.completions.create.assert_not_called()
+
+
+def test_achat_with_tools_awaits_rounds_and_runs_tools():
+    tool_call = Mock(id="call_1", type="function")
+    tool_call.function = Mock(arguments='{"product": "laptop"}')
+    tool_call.function.name = "get_price"
+    async_client = Mock()
+    async_client.chat.completions.create = AsyncMock(
+        side_effect=[_response(None, [tool_call]), _response("Price is $1000")]
+    )
+
+    async def get_price(product):
+        return {"price": 1000, "product": product}
+
+    with patch("core.agents.llm_client.importlib.import_module", return_value=_openai(async_client)):
+        client = LLMClient(api_key="test-key")
+        result = asyncio.run(client.achat_with_tools(
+            messages=[{"role": "user", "content": "Get laptop price"}],
+            tools=[{"type": "function", "function": {"name": "get_price"}}],
+            functions_map={"get_price": get_price},
+        ))
+
+    assert result == "Price is $1000"
+    assert client.last_usage["tools_used"] == ["get_price"]
+    tool_msg = async_client.chat.completions.create.call_args_list[1].kwargs["messages"][2]
+    assert tool_msg["role"] == "tool" and '"price": 1000' in tool_msg["content"]
+
+
+def test_astream_yields_chunks_and_falls_back():
+    async def events():
+        for text in ("Hel", "lo"):
+            yield Mock(choices=[Mock(delta=Mock(content=text))], usage=None)
+
+    async_client = Mock()
+    async_client.chat.completions.create = AsyncMock(return_value=events())
+
+    async def collect(client):
+        return [chunk async for chunk in client.astream([{"role": "user", "content": "Hi"}])]
+
+    with patch("core.agents.llm_client.importlib.import_module", return_value=_openai(async_client)):
+        client = LLMClient(api_key="test-key")
+        assert asyncio.run(collect(client)) == ["Hel", "lo"]
+
+        # Streaming rejected: fall back to a single non-streamed completion
+        async_client.chat.completions.create = AsyncMock(
+            side_effect=[Exception("stream unsupported"), _response("whole")]
+        )
+        assert asyncio.run(collect(client)) == ["whole"]
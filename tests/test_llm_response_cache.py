@@ -0,0 +1,101 @@
+from unittest.mock import Mock, patch
+
+from core.agents.llm_cache import ResponseCache, make_key
+from core.agents.llm_client import LLMClient
+
+
+def _client_with(responses):
+    mod = Mock()
+    client = Mock()
+    client.chat.completions.create = Mock(side_effect=responses)
+    mod.OpenAI = Mock(return_value=client)
+    return mod, client
+
+
+def _response(content):
+    resp = Mock()
+    resp.choices = [Mock(message=Mock(content=content))]
+    resp.usage = Mock(prompt_tokens=100, completion_tokens=20, total_tokens=120)
+    return resp
+
+
+def test_key_normalizes_whitespace_and_separates_params():
+    a = make_key("openai", "m", [{"role": "user", "content": "pick  a\n tool"}], temperature=0.0)
+    b = make_key("openai", "m", [{"role": "user", "content": "pick a tool"}], temperature=0.0)
+    assert a == b
+    assert a != make_key("openai", "m", [{"role": "user", "content": "pick a tool"}], temperature=0.2)
+    assert a != make_key("gemini", "m", [{"role": "user", "content": "pick a tool"}], temperature=0.0)
+
+
+def test_chat_cache_is_opt_in_and_counts_savings(tmp_path):
+    mod, raw = _client_with([_response("A"), _response("B"), _response("C")])
+    msgs = [{"role": "user", "content": "title please"}]
+    with patch("core.agents.llm_client.importlib.import_module", return_value=mod):
+        client = LLMClient(api_key="test-key")
+        client.response_cache = ResponseCache(path=tmp_path / "cache.db", cost_fn=lambda p, m, i, o: 0.01)
+
+        assert client.chat(msgs, temperature=0.0, cache=True) == "A"
+        assert client.chat(msgs, temperature=0.0, cache=True) == "A"
+        assert client.last_usage["cached"] is True
+        assert client.chat(msgs, temperature=0.0) == "B"  # not opted in
+        assert client.chat(msgs, temperature=0.5, cache=True) == "C"  # different params
+
+    assert raw.chat.completions.create.call_count == 3
+    stats = client.response_cache.snapshot()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["tokens_saved"] == 120 and stats["cost_saved_usd"] == 0.01
+
+
+def test_disk_store_survives_restart_and_expires(tmp_path):
+    now = [1000.0]
+    path = tmp_path / "cache.db"
+    first = ResponseCache(path=path, ttl_s=60, clock=lambda: now[0])
+    first.put("k", "answer", {"prompt_tokens": 5, "completion_tokens": 1})
+    first.put("short", "gone soon", ttl_s=1)
+    first.close()
+
+    second = ResponseCache(path=path, clock=lambda: now[0])
+    assert second.get("k") == "answer"
+    assert second.get("k") == "answer"
+    assert second.stats["disk_hits"] == 1 and second.stats["memory_hits"] == 1
+
+    now[0] += 30
+    assert second.get("short") is None
+    now[0] += 60
+    assert second.get("k") is None
+    assert second.stats["misses"] == 2
+
+
+def test_fallback_answer_is_found_from_either_provider(tmp_path):
+    import os
+
+    failing = Mock()
+    failing.chat.completions.create = Mock(side_effect=Exception("provider down"))
+    working = Mock()
+    working.chat.completions.create = Mock(side_effect=[_response("from fallback")])
+    mod = Mock()
+    made = []
+
+    def make_client(**kwargs):
+        made.append(1)
+        return failing if len(made) % 2 == 1 else working
+
+    mod.OpenAI = Mock(side_effect=make_client)
+    shared = ResponseCache(path=tmp_path / "cache.db")
+    msgs = [{"role": "user", "content": "summarize"}]
+    with patch.dict(os.environ, {"OPENROUTER_API_KEY": "k1", "OPENAI_API_KEY": "k2"}, clear=True):
+        with patch("core.agents.llm_client.importlib.import_module", return_value=mod):
+            first = LLMClient()
+            first.response_cache = shared
+            original = first.provider()
+            assert first.chat(msgs, temperature=0.0, cache=True) == "from fallback"
+            assert first.provider() != original
+            assert first.chat(msgs, temperature=0.0, cache=True) == "from fallback"  # now on the fallback
+
+            fresh = LLMClient()  # starts on the original provider again
+            fresh.response_cache = shared
+            assert fresh.provider() == original
+            assert fresh.chat(msgs, temperature=0.0, cache=True) == "from fallback"
+
+    assert working.chat.completions.create.call_count == 1
+    assert shared.stats["hits"] == 2
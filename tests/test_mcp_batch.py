@@ -0,0 +1,71 @@
+import asyncio
+
+from core.agents.agent_sdk.batch import batch_result, run_batch
+
+
+class FakeTools:
+    def __init__(self):
+        self.tokens = []
+
+    async def get_product_info(self, sku: str):
+        if sku == "missing":
+            return {"ok": False, "error": "not_found"}
+        return {"ok": True, "sku": sku, "title": f"Title {sku}", "current_price": 10.0}
+
+    async def get_market_intelligence(self, product_title: str):
+        return {"ok": True, "title_seen": product_title, "competitor_price": 9.5}
+
+    async def secured(self, x: int, capability_token: str = ""):
+        self.tokens.append(capability_token)
+        return {"ok": True, "x": x}
+
+    async def explode(self):
+        raise RuntimeError("boom")
+
+
+def _tools(t):
+    return {
+        "get_product_info": t.get_product_info,
+        "get_market_intelligence": t.get_market_intelligence,
+        "secured": t.secured,
+        "explode": t.explode,
+    }
+
+
+def test_ordered_results_with_references_and_token_injection():
+    t = FakeTools()
+    res = asyncio.run(run_batch(_tools(t), [
+        {"tool": "get_product_info", "arguments": {"sku": "A1"}},
+        {"tool": "get_market_intelligence", "arguments": {"product_title": {"$ref": "0.title"}}},
+        {"tool": "secured", "arguments": {"x": 1}},
+    ], capability_token="tok"))
+    assert res["ok"] and res["succeeded"] == 3 and not res["partial"]
+    assert [e["tool"] for e in res["results"]] == ["get_product_info", "get_market_intelligence", "secured"]
+    assert batch_result(res, 1)["title_seen"] == "Title A1"
+    assert t.tokens == ["tok"]
+
+
+def test_partial_failure_does_not_abort_batch():
+    t = FakeTools()
+    res = asyncio.run(run_batch(_tools(t), [
+        {"tool": "get_product_info", "arguments": {"sku": "missing"}},
+        {"tool": "get_market_intelligence", "arguments": {"product_title": {"$ref": "0.title"}}},
+        {"tool": "get_market_intelligence", "arguments": {"product_title": {"$ref": "0.title", "default": "n/a"}}},
+        {"tool": "explode"},
+        {"tool": "nope"},
+        {"tool": "secured", "arguments": {"y": 2}},
+        {"tool": "secured", "arguments": {"x": 3}},
+    ]))
+    assert not res["ok"] and res["partial"]
+    errors = [e["result"].get("error") for e in res["results"]]
+    assert errors == [
+        "not_found", "unresolved_reference", None, "internal_error", "unknown_tool", "validation_error", None,
+    ]
+    assert res["succeeded"] == 2 and res["failed"] == 5
+
+
+def test_rejects_empty_and_oversized_batches():
+    assert asyncio.run(run_batch({}, []))["error"] == "validation_error"
+    calls = [{"tool": "x"}] * 3
+    assert asyncio.run(run_batch({}, calls, max_calls=2))["error"] == "validation_error"
+    assert batch_result({"ok": False, "error": "validation_error"}, 0)["error"] == "validation_error"
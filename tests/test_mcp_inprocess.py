@@ -0,0 +1,54 @@
+import asyncio
+import sys
+import types
+
+from core.agents.agent_sdk.mcp_client import _MCPDataCollectorTools, _select_transport
+
+
+def _install_server(name: str) -> None:
+    from mcp.server.fastmcp import FastMCP
+
+    mod = types.ModuleType(name)
+    mcp = FastMCP("fake")
+
+    @mcp.tool()
+    async def echo(value: int, capability_token: str = "") -> dict:
+        if capability_token != "secret":
+            return {"ok": False, "error": "auth_error", "message": "No token provided"}
+        return {"ok": True, "value": value}
+
+    mod.mcp = mcp
+    mod.echo = echo
+    sys.modules[name] = mod
+
+
+def test_transport_selection(monkeypatch):
+    _install_server("fake_colocated_server")
+    args = ["-u", "-m", "fake_colocated_server"]
+    monkeypatch.delenv("MCP_TRANSPORT", raising=False)
+    assert _select_transport("python", args) is None  # stdio unless asked otherwise
+    monkeypatch.setenv("MCP_TRANSPORT", "auto")
+    assert _select_transport("python", args) is not None
+    assert _select_transport("python", ["-u", "-m", "no.such.module"]) is None
+    assert _select_transport("/usr/bin/node", args) is None
+    assert _select_transport("/usr/bin/node", args, "inprocess") is not None
+    monkeypatch.setenv("MCP_TRANSPORT", "stdio")
+    assert _select_transport("python", args) is None
+
+
+def test_inprocess_calls_keep_auth_and_envelope():
+    _install_server("fake_colocated_server")
+    client = _MCPDataCollectorTools(args=["-u", "-m", "fake_colocated_server"], transport="inprocess")
+    assert client.transport == "inprocess"
+
+    async def run():
+        good = await client._call_tool("echo", {"value": 3, "capability_token": "secret"})
+        denied = await client._call_tool("echo", {"value": 3})
+        missing = await client._call_tool("nope", {})
+        return good, denied, missing
+
+    good, denied, missing = asyncio.run(run())
+    assert good[0] and good[1]["value"] == 3 and good[1]["_mcp_meta"]["transport"] == "inprocess"
+    assert denied[0] and denied[1]["error"] == "auth_error"
+    assert not missing[0] and missing[1]["error_code"] == "unknown_tool"
+    assert _MCPDataCollectorTools._pools == {}
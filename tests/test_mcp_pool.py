@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from core.agents.agent_sdk.mcp_client import _MCPConnectionPool, _PooledConnection
+
+
+class FakeStream:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def _pool(**kw):
+    spawned = []
+
+    async def connect(command, args):
+        await asyncio.sleep(0.01)
+        conn = _PooledConnection(FakeStream(), FakeStream())
+        spawned.append(conn)
+        return conn
+
+    kw.setdefault("min_idle", 0)
+    pool = _MCPConnectionPool(command="python", args=[], connect=connect, probe=lambda c: not c.write.closed, **kw)
+    return pool, spawned
+
+
+def test_waiters_are_served_fifo_without_busy_retry():
+    async def run():
+        pool, spawned = _pool(max_connections=1)
+        order = []
+        first = await pool.get_connection("python", [])
+
+        async def waiter(i):
+            read, write = await pool.get_connection("python", [])
+            order.append(i)
+            await asyncio.sleep(0.005)
+            await pool.return_connection(read, write)
+
+        tasks = [asyncio.create_task(waiter(i)) for i in range(20)]
+        await asyncio.sleep(0.02)
+        await pool.return_connection(*first)
+        await asyncio.gather(*tasks)
+        return pool, spawned, order
+
+    pool, spawned, order = asyncio.run(run())
+    assert order == list(range(20))
+    assert len(spawned) == 1
+    stats = pool.stats()
+    assert stats["waits"] == 20 and stats["reused"] == 20 and stats["creates"] == 1
+    assert stats["wait_time_s"] > 0
+
+
+def test_prewarm_and_background_refill_keep_spawns_off_request_path():
+    async def run():
+        pool, spawned = _pool(max_connections=3, min_idle=2)
+        assert await pool.prewarm() == 2
+        before = pool.metrics["creates"]
+        conn = await pool.get_connection("python", [])
+        reused = pool.metrics["creates"] == before
+        await asyncio.sleep(0.05)  # background refill tops idle back up
+        idle_after = pool.stats()["idle"]
+        await pool.return_connection(*conn)
+        await pool.close_all()
+        return reused, idle_after, spawned
+
+    reused, idle_after, spawned = asyncio.run(run())
+    assert reused
+    assert idle_after == 2
+    assert all(c.write.closed for c in spawned)
+
+
+def test_dead_and_failed_connections_are_evicted():
+    async def run():
+        pool, spawned = _pool(max_connections=2)
+        read, write = await pool.get_connection("python", [])
+        await pool.return_connection(read, write)
+        write.closed = True  # server went away while idle
+        conn2 = await pool.get_connection("python", [])
+        await pool.return_connection(*conn2, reusable=False)
+        return pool, spawned, conn2
+
+    pool, spawned, conn2 = asyncio.run(run())
+    assert len(spawned) == 2 and conn2[1] is spawned[1].write
+    assert pool.metrics["probe_failures"] == 1
+    assert pool.metrics["evictions"] == 2
+    assert pool.stats()["idle"] == 0
+
+
+def test_create_failure_releases_slot():
+    async def run():
+        async def boom(command, args):
+            raise OSError("spawn failed")
+
+        pool = _MCPConnectionPool(max_connections=1, min_idle=0, command="python", args=[], connect=boom)
+        for _ in range(3):
+            with pytest.raises(OSError):
+                await pool.get_connection("python", [])
+        return pool
+
+    pool = asyncio.run(run())
+    assert pool.metrics["create_failures"] == 3
+    assert not pool._sem.locked()
+
+
+def test_refill_counts_connections_still_being_created():
+    async def run():
+        pool, spawned = _pool(max_connections=2, min_idle=2)
+        checkouts = [asyncio.create_task(pool.get_connection("python", [])) for _ in range(2)]
+        await asyncio.sleep(0)  # both are now mid-spawn
+        await pool.prewarm()
+        conns = await asyncio.gather(*checkouts)
+        await asyncio.sleep(0.05)
+        stats = pool.stats()
+        for conn in conns:
+            await pool.return_connection(*conn)
+        await pool.close_all()
+        return spawned, stats
+
+    spawned, stats = asyncio.run(run())
+    assert len(spawned) == 2
+    assert stats["in_use"] == 2 and stats["idle"] == 0 and stats["creating"] == 0
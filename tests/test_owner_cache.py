@@ -0,0 +1,46 @@
+import asyncio
+
+from core.agents.data_collector.owner_cache import OwnerLookup, get_owner_lookup
+from core.agents.data_collector.repo import DataRepo
+
+
+def test_lookup_caches_and_invalidates_on_catalog_changes(tmp_path):
+    path = tmp_path / "data.db"
+
+    async def run():
+        repo = DataRepo(str(path))
+        await repo.init()
+        await repo.upsert_products([{"sku": "A"}, {"sku": "B"}], owner_id="u1")
+
+        lookup = get_owner_lookup()
+        lookup.clear()
+        lookup.db_path = path
+        try:
+            assert await lookup.preload() == 2
+            results = [await lookup.get("A") for _ in range(10)]
+            assert await lookup.get("NEW") is None
+            assert await lookup.get("NEW") is None
+            hits, misses = lookup.hits, lookup.misses
+
+            await repo.upsert_products([{"sku": "NEW"}], owner_id="u2")
+            new_owner = await lookup.get("NEW")
+            await repo.delete_product_by_owner("A", "u1")
+            after_delete = await lookup.get("A")
+            return results, hits, misses, new_owner, after_delete
+        finally:
+            lookup.clear()
+
+    results, hits, misses, new_owner, after_delete = asyncio.run(run())
+    assert results == ["u1"] * 10
+    assert (hits, misses) == (11, 1)
+    assert new_owner == "u2"  # cached miss dropped by the upload
+    assert after_delete is None
+
+
+def test_lru_is_bounded(tmp_path):
+    lookup = OwnerLookup(db_path=tmp_path / "none.db", max_entries=3)
+    for i in range(10):
+        lookup._put(f"s{i}", f"o{i % 2}")
+    assert len(lookup) == 3
+    lookup.invalidate_owner("o1")
+    assert len(lookup) == 1
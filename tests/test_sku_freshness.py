@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from core.agents.data_collector.repo import DataRepo
+from core.agents.data_collector.tools import Tools
+
+
+def _ago(minutes: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(minutes=minutes)).isoformat()
+
+
+def _make_repo(tmp_path) -> DataRepo:
+    repo = DataRepo(tmp_path / "data.db")
+    asyncio.run(repo.init())
+    # source_url is added to product_catalog by scripts/migrate_add_source_url.py
+    with sqlite3.connect(repo.path) as conn:
+        conn.execute("ALTER TABLE product_catalog ADD COLUMN source_url TEXT")
+    rows = [{"sku": s, "title": s.title(), "current_price": 10.0} for s in ("fresh", "old", "never")]
+    asyncio.run(repo.upsert_products(rows, "owner-1"))
+    asyncio.run(repo.insert_tick({"sku": "fresh", "our_price": 10.0, "ts": _ago(5)}))
+    asyncio.run(repo.insert_tick({"sku": "old", "our_price": 10.0, "ts": _ago(600)}))
+    asyncio.run(repo.insert_tick({"sku": "old", "our_price": 10.0, "ts": _ago(300)}))
+    return repo
+
+
+def test_freshness_maintained_on_ingest_and_job_completion(tmp_path):
+    repo = _make_repo(tmp_path)
+    job_id = asyncio.run(repo.create_job("old", "DEFAULT", "mock", 1))
+    asyncio.run(repo.mark_job_failed(job_id, "boom"))
+
+    with sqlite3.connect(repo.path) as conn:
+        rows = {
+            sku: (ts, n, status)
+            for sku, ts, n, status in conn.execute(
+                "SELECT sku, last_tick_ts, tick_count, last_job_status FROM sku_freshness"
+            )
+        }
+    assert rows["never"] == ("", 0, None)
+    assert rows["fresh"][1:] == (1, None)
+    assert rows["old"][1:] == (2, "FAILED")
+
+
+def test_stale_products_range_scan(tmp_path):
+    repo = _make_repo(tmp_path)
+    result = asyncio.run(Tools(repo).get_stale_products(threshold_minutes=60))
+    assert result["ok"]
+    assert [p["sku"] for p in result["stale_products"]] == ["never", "old"]
+    assert result["stale_products"][0]["last_update"] is None
+    assert 290 < result["stale_products"][1]["minutes_stale"] < 310
+
+    freshness = asyncio.run(Tools(repo).check_data_freshness("old"))
+    assert freshness["tick_count"] == 2 and freshness["is_stale"]
+
+    with sqlite3.connect(repo.path) as conn:
+        plan = " ".join(
+            str(r[-1])
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT sku FROM sku_freshness "
+                "WHERE market='DEFAULT' AND last_tick_ts < ? ORDER BY last_tick_ts LIMIT 5",
+                (_ago(60),),
+            )
+        )
+    assert "ix_sku_freshness_market_last_tick" in plan
+
+
+def test_backfill_for_existing_databases(tmp_path):
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE market_ticks (id INTEGER PRIMARY KEY AUTOINCREMENT, sku TEXT NOT NULL, "
+            "market TEXT NOT NULL, our_price REAL NOT NULL, competitor_price REAL, demand_index REAL, "
+            "ts TEXT NOT NULL, source TEXT, ingested_at TEXT NOT NULL)"
+        )
+        conn.executemany(
+            "INSERT INTO market_ticks (sku, market, our_price, ts, ingested_at) VALUES (?,?,?,?,?)",
+            [("A", "DEFAULT", 1.0, "2025-01-01", "x"), ("A", "DEFAULT", 1.0, "2025-01-02", "x")],
+        )
+
+    asyncio.run(DataRepo(path).init())
+    with sqlite3.connect(path) as conn:
+        row = conn.execute("SELECT last_tick_ts, tick_count FROM sku_freshness WHERE sku='A'").fetchone()
+    assert row == ("2025-01-02", 2)
+
+
+def test_check_stale_market_data_mixed_timestamp_formats(tmp_path, monkeypatch):
+    import sqlite3
+    from datetime import datetime, timedelta, timezone
+
+    from core.agents.user_interact import tools as ui_tools
+
+    market = tmp_path / "market.db"
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with sqlite3.connect(market) as conn:
+        conn.execute("CREATE TABLE market_data (id INTEGER PRIMARY KEY, product_name TEXT, price REAL, update_time TEXT)")
+        conn.executemany(
+            "INSERT INTO market_data (product_name, price, update_time) VALUES (?,?,?)",
+            [
+                ("old-iso", 1.0, (now - timedelta(minutes=90)).isoformat()),
+                ("old-sql", 2.0, (now - timedelta(minutes=120)).strftime("%Y-%m-%d %H:%M:%S")),
+                ("fresh", 3.0, (now - timedelta(minutes=5)).isoformat()),
+            ],
+        )
+    monkeypatch.setattr(ui_tools, "get_db_paths", lambda: {"app": tmp_path / "data.db", "market": market})
+
+    out = ui_tools.check_stale_market_data(60)
+    assert [r["product_name"] for r in out["stale_items"]] == ["old-sql", "old-iso"]
+    assert out["total_count"] == 3
+    assert set(out["stale_items"][0]) == {"id", "product_name", "price", "update_time", "age_minutes"}
@@ -0,0 +1,171 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from core.agents.data_collector.connectors.web_scraper import AsyncScraper, parse_price_html
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_parse_price_html():
+    html = '<html><body><span class="price">$1,234.50</span></body></html>'
+    assert parse_price_html(html, "u") == {"status": "success", "price": 1234.5, "source": "u"}
+    assert parse_price_html("<html></html>", "u")["status"] == "error"
+
+
+def test_fetch_many_is_concurrent_and_ordered():
+    async def run():
+        async def handler(request):
+            await asyncio.sleep(0.2)
+            n = request.match_info["name"]
+            return web.Response(text=f'<meta itemprop="price" content="{n}.00">', content_type="text/html")
+
+        runner, base = await _serve(handler)
+        scraper = AsyncScraper(concurrency=50, per_host=50, host_delay_s=0, retries=0)
+        try:
+            start = time.monotonic()
+            results = await scraper.fetch_many([f"{base}/{i}" for i in range(40)])
+            elapsed = time.monotonic() - start
+        finally:
+            await scraper.close()
+            await runner.cleanup()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(run())
+    assert [r["price"] for r in results] == [float(i) for i in range(40)]
+    # 40 sequential requests would take ~8s
+    assert elapsed < 2.0
+
+
+def test_fetch_retries_transient_errors():
+    calls = {"n": 0}
+
+    async def run():
+        async def handler(request):
+            calls["n"] += 1
+            if calls["n"] < 3:
+                return web.Response(status=503)
+            return web.Response(text='<span class="price">9.99</span>', content_type="text/html")
+
+        runner, base = await _serve(handler)
+        scraper = AsyncScraper(host_delay_s=0, retries=2, backoff_s=0.01)
+        try:
+            ok = await scraper.fetch(f"{base}/item")
+            calls["n"] = -10
+            failed = await scraper.fetch(f"{base}/item")
+        finally:
+            await scraper.close()
+            await runner.cleanup()
+        return ok, failed
+
+    ok, failed = asyncio.run(run())
+    assert ok["status"] == "success" and ok["price"] == 9.99
+    assert failed == {"status": "error", "message": "HTTP 503"}
+
+
+def test_scrape_cache_conditional_and_hash_reuse(tmp_path):
+    from core.agents.data_collector.connectors.scrape_cache import ScrapeCache
+
+    seen_headers = []
+
+    async def run():
+        async def handler(request):
+            seen_headers.append(request.headers.get("If-None-Match"))
+            body = '<span class="price">12.00</span>'
+            if request.match_info["name"] == "etag":
+                if request.headers.get("If-None-Match") == '"v1"':
+                    return web.Response(status=304)
+                return web.Response(text=body, content_type="text/html", headers={"ETag": '"v1"'})
+            return web.Response(text=body, content_type="text/html")
+
+        runner, base = await _serve(handler)
+        cache = ScrapeCache(str(tmp_path / "scrape.db"))
+        scraper = AsyncScraper(host_delay_s=0, retries=0, cache=cache)
+        try:
+            results = [await scraper.fetch(f"{base}/{name}") for name in ("etag", "etag", "plain", "plain")]
+            stats = cache.stats()
+        finally:
+            await scraper.close()
+            await runner.cleanup()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+    assert all(r["price"] == 12.0 for r in results)
+    assert seen_headers[:2] == [None, '"v1"']
+    assert stats == {"hits": 1, "revalidated": 1, "misses": 2, "entries": 2}
+
+
+def test_scrape_cache_lru_eviction(tmp_path):
+    from core.agents.data_collector.connectors.scrape_cache import ScrapeCache
+
+    cache = ScrapeCache(str(tmp_path / "scrape.db"), max_entries=2)
+    cache.put("a", {"status": "success", "price": 1.0}, "h1")
+    cache.put("b", {"status": "success", "price": 2.0}, "h2")
+    time.sleep(0.01)
+    assert cache.get("a")["result"]["price"] == 1.0
+    cache.put("c", {"status": "success", "price": 3.0}, "h3")
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    cache.close()
+
+
+def test_scrape_cache_hits_do_not_write(tmp_path):
+    from core.agents.data_collector.connectors.scrape_cache import ScrapeCache
+
+    cache = ScrapeCache(str(tmp_path / "scrape.db"), access_flush_batch=3)
+    for url in ("a", "b", "c"):
+        cache.put(url, {"status": "success", "price": 1.0}, "h")
+    db = cache._db()
+    written = db.total_changes
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    assert db.total_changes == written
+    cache.get("c")  # third buffered URL flushes the batch
+    assert db.total_changes == written + 3
+    cache.close()
+
+
+def test_close_async_scraper_closes_shared_session(monkeypatch):
+    from core.agents.data_collector.connectors import web_scraper
+
+    monkeypatch.setattr(web_scraper, "_SCRAPER", None)
+
+    async def run():
+        scraper = web_scraper.get_async_scraper()
+        session = await scraper._ensure_session()
+        await web_scraper.close_async_scraper()
+        assert session.closed
+        assert web_scraper._SCRAPER is None
+        await web_scraper.close_async_scraper()  # idempotent
+
+    asyncio.run(run())
+
+
+def test_selector_memo_tries_last_hit_first():
+    from core.agents.data_collector.connectors.web_scraper import SelectorMemo
+
+    memo = SelectorMemo()
+    page = '<div class="product-price">$5.00</div>'
+    assert parse_price_html(page, "https://shop.example.com/a", parser="html.parser", memo=memo)["price"] == 5.0
+    assert memo.get("shop.example.com") == ".product-price"
+    assert (memo.hits, memo.misses) == (0, 1)
+
+    assert parse_price_html(page, "https://shop.example.com/b", parser="html.parser", memo=memo)["price"] == 5.0
+    assert (memo.hits, memo.misses) == (1, 1)
+
+    # Layout change on the domain: falls back to the full list and re-learns
+    moved = '<meta itemprop="price" content="7.50">'
+    assert parse_price_html(moved, "https://shop.example.com/c", parser="html.parser", memo=memo)["price"] == 7.5
+    assert memo.get("shop.example.com") == "[itemprop='price']"